@@ -1,23 +1,23 @@
 """ATS readability self-check.
 
-Renders the resume HTML to a real PDF (the same WeasyPrint path used for
-export), then extracts the text back out with pdfminer — the same library an
-ATS uses — and reports whether the important content survives extraction
-cleanly, in order, and with spaces intact.
+Renders the resume HTML to a real PDF (the same WeasyPrint path and page
+settings used for export, so a check right after an export is served from the
+render cache), then extracts the text back out with pdfminer — the same
+library an ATS uses — and reports whether the important content survives
+extraction cleanly, in order, and with spaces intact.
 """
+import base64
 import re
-from io import BytesIO
 
 from fastapi import APIRouter, HTTPException
-from pdfminer.high_level import extract_text
-from pydantic import BaseModel
-from weasyprint import HTML
+
+from app.pdf import PDFRequest, render_with_text
+from app.phrase_match import PhraseMatcher
 
 router = APIRouter()
 
 
-class AtsCheckRequest(BaseModel):
-    html: str
+class AtsCheckRequest(PDFRequest):
     # Phrases that should survive extraction verbatim (name, title, section
     # titles, a sample of each section's content). Multi-word phrases also
     # catch lost word-spacing: "Software Developer" won't be found if the PDF
@@ -29,32 +29,35 @@ def _normalize(s: str) -> str:
     return re.sub(r"\s+", " ", s or "").strip().lower()
 
 
-@router.post("/ats-check")
-async def ats_check(req: AtsCheckRequest):
-    buf = BytesIO()
+async def _render(req: AtsCheckRequest) -> tuple[bytes, str]:
     try:
-        HTML(string=req.html).write_pdf(buf)
+        return await render_with_text(req)
+    except HTTPException:
+        raise
     except Exception as e:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"Could not render PDF for ATS check: {e}")
-    buf.seek(0)
-    text = extract_text(buf) or ""
-    buf.close()
 
+
+def _report(text: str, expected: list[str]) -> dict:
     norm = _normalize(text)
     words = text.split()
 
+    # One pass over the text finds every expected phrase (see PhraseMatcher);
+    # the earliest occurrence drives the reading-order check.
+    hits = PhraseMatcher(_normalize(item) for item in expected).scan(norm)
+
     found, missing = [], []
     last_pos = -1
     order_ok = True
-    for item in req.expected:
+    for item in expected:
         n = _normalize(item)
         if not n:
             continue
-        pos = norm.find(n)
-        if pos == -1:
+        if not hits[n]:
             missing.append(item)
         else:
             found.append(item)
+            pos = hits[n][0]
             if pos < last_pos:
                 order_ok = False
             last_pos = pos
@@ -63,7 +66,7 @@ async def ats_check(req: AtsCheckRequest):
     # Kept conservative (>40) so tech terms like "PostgreSQL" don't false-flag.
     glued = [w for w in words if len(w) > 40]
 
-    total_expected = len([e for e in req.expected if e.strip()])
+    total_expected = len([e for e in expected if e.strip()])
     passed = bool(text.strip()) and not missing and order_ok and not glued
 
     return {
@@ -79,3 +82,17 @@ async def ats_check(req: AtsCheckRequest):
         },
         "extracted_text": text[:6000],
     }
+
+
+@router.post("/ats-check")
+async def ats_check(req: AtsCheckRequest):
+    _, text = await _render(req)
+    return _report(text, req.expected)
+
+
+@router.post("/render-and-verify")
+async def render_and_verify(req: AtsCheckRequest):
+    """Export and ATS-check in one go: a single WeasyPrint layout pass whose
+    in-memory PDF is both returned (base64) and read back by pdfminer."""
+    pdf_bytes, text = await _render(req)
+    return {"pdf": base64.b64encode(pdf_bytes).decode("ascii"), **_report(text, req.expected)}
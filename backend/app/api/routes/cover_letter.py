@@ -1,30 +1,161 @@
-from fastapi import APIRouter, Body, HTTPException
+import json
+import re
 
-from app.llm import generate_text
+from fastapi import APIRouter, Body, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.llm import generate_text_async, stream_text
+from app.prompts import build
 
 router = APIRouter()
 
 
+COVER_LETTER_PROMPT = (
+    "Write a professional cover letter for the following job description, using the provided resume as background. "
+    "Be concise, highlight relevant experience, and address the employer directly. "
+    "The letter signature block should be formatted as follows:\n\n"
+    "Name\n"
+    "Location\n   - If available in the resume"
+    "Phone Number\n   - If available in the resume\n"
+    "Email\n      - If available in the resume\n"
+    "LinkedIn: [LinkedIn URL]\n      - If available in the resume\n"
+    "GitHub: [GitHub URL]\n    - If available in the resume\n"
+    "Return ONLY the cover letter text, with no explanation or extra text.\n\n"
+    "Job Description:\n{jd}\n\nResume (JSON):\n{resume}"
+)
+
+
+def _prompt(jd: str, resume: dict) -> str:
+    # The resume is only background here, so it may be trimmed to fit.
+    return build("cover_letter", COVER_LETTER_PROMPT, trim=("resume",), clip=("jd",), jd=jd, resume=resume)
+
+
 @router.post("/generate-cover-letter-ai")
-async def generate_cover_letter(jd: str = Body(...), resume: dict = Body(...)):
-    prompt = (
-        "Write a professional cover letter for the following job description, using the provided resume as background. "
-        "Be concise, highlight relevant experience, and address the employer directly. "
-        "The letter signature block should be formatted as follows:\n\n"
-        "Name\n"
-        "Location\n   - If available in the resume"
-        "Phone Number\n   - If available in the resume\n"
-        "Email\n      - If available in the resume\n"
-        "LinkedIn: [LinkedIn URL]\n      - If available in the resume\n"
-        "GitHub: [GitHub URL]\n    - If available in the resume\n"
-        "Return ONLY the cover letter text, with no explanation or extra text.\n\n"
-        f"Job Description:\n{jd}\n\nResume:\n{resume}"
-    )
+async def generate_cover_letter(
+    request: Request,
+    jd: str = Body(...),
+    resume: dict = Body(...),
+    regenerate: bool = False,
+):
     try:
-        cover_letter = generate_text(prompt)
+        cover_letter = await generate_text_async(_prompt(jd, resume), request=request, cache=not regenerate)
     except RuntimeError as e:
         raise HTTPException(status_code=502, detail=f"Failed to generate cover letter: {e}")
 
     if cover_letter.startswith("```"):
         cover_letter = cover_letter.strip("`").strip()
     return {"cover_letter": cover_letter}
+
+
+_TAIL = re.compile(r"\s*`*\s*\Z")
+
+
+class _FenceStripper:
+    """Streaming version of the fence handling above.
+
+    Equivalent to ``text.strip()`` and, when the text opens with a code fence,
+    ``.strip("`").strip()`` — applied as chunks arrive. Leading whitespace and
+    the opening fence are dropped; a trailing run of whitespace and backticks
+    that may turn out to be the closing fence is held back until more text
+    follows. If the stream ends first, the part the strips would remove is
+    dropped and the rest (e.g. a backtick before trailing spaces) is kept.
+    """
+
+    def __init__(self):
+        self._phase = "start"  # start -> (ticks -> space ->) body
+        self._opening = ""  # backticks seen before we know if it's a fence
+        self._held = ""
+        self._fenced = False
+
+    def feed(self, chunk: str) -> str:
+        out = []
+        for ch in chunk:
+            if self._phase == "start":
+                if ch.isspace() and not self._opening:
+                    continue
+                if ch == "`" and len(self._opening) < 3:
+                    self._opening += ch
+                    if len(self._opening) == 3:
+                        self._fenced = True
+                        self._phase = "ticks"
+                    continue
+                self._phase = "body"
+                pending, self._opening = self._opening, ""
+                for c in pending + ch:
+                    self._body(c, out)
+            elif self._phase == "ticks":
+                if ch != "`":
+                    self._phase = "space"
+                    self._space(ch, out)
+            elif self._phase == "space":
+                self._space(ch, out)
+            else:
+                self._body(ch, out)
+        return "".join(out)
+
+    def _space(self, ch: str, out: list):
+        if not ch.isspace():
+            self._phase = "body"
+            self._body(ch, out)
+
+    def _body(self, ch: str, out: list):
+        if ch.isspace() or (self._fenced and ch == "`"):
+            self._held += ch
+        else:
+            out.append(self._held + ch)
+            self._held = ""
+
+    def flush(self) -> str:
+        if self._phase == "start":
+            return self._opening  # a too-short run of backticks ("``")
+        # What the strips remove is trailing whitespace, then backticks, then
+        # whitespace again; anything held before that is text.
+        return self._held[:_TAIL.search(self._held).start()] if self._fenced else ""
+
+
+def _sse(data, event: str | None = None) -> str:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
+
+
+@router.post("/generate-cover-letter-ai/stream")
+async def stream_cover_letter(
+    jd: str = Body(...),
+    resume: dict = Body(...),
+    regenerate: bool = False,
+):
+    """Server-sent events: ``data`` events carry JSON-encoded text chunks,
+    then a final ``done`` event. Provider failures before the first chunk are
+    a normal 502; a failure mid-letter arrives as an ``error`` event."""
+    chunks = stream_text(_prompt(jd, resume), cache=not regenerate)
+    try:
+        # Wait for the first chunk here so provider fallback (and a clean 502
+        # if every provider fails) happens before the response starts.
+        first = await anext(chunks, "")
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=f"Failed to generate cover letter: {e}")
+
+    async def events():
+        stripper = _FenceStripper()
+        try:
+            text = stripper.feed(first)
+            if text:
+                yield _sse(text)
+            async for chunk in chunks:
+                text = stripper.feed(chunk)
+                if text:
+                    yield _sse(text)
+            tail = stripper.flush()
+            if tail:
+                yield _sse(tail)
+            yield _sse({}, event="done")
+        except Exception as e:  # noqa: BLE001 - the response has started; report it in-band
+            yield _sse({"detail": f"Failed to generate cover letter: {e}"}, event="error")
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -8,6 +8,8 @@ from docx.shared import Mm, Pt, RGBColor
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import Response
 
+from app.workers import run_cpu
+
 router = APIRouter()
 
 # A4 (210mm) minus 15mm side margins — used to right-align dates via a tab stop.
@@ -211,7 +213,9 @@ def build_docx(resume: dict) -> bytes:
 @router.post("/generate-docx")
 async def generate_docx(resume: dict):
     try:
-        data = build_docx(resume)
+        data = await run_cpu(build_docx, resume)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DOCX generation failed: {e}")
 
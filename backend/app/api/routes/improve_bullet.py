@@ -1,47 +1,156 @@
-from fastapi import APIRouter, Body, HTTPException
+import asyncio
 
-from app.llm import generate_text
+from fastapi import APIRouter, Body, HTTPException, Request
+from pydantic import BaseModel
+
+from app.llm import generate_json_async, generate_text_async
+from app.prompts import estimate_tokens, record
 
 router = APIRouter()
 
-IMPROVE_PROMPT = """You are a resume-writing coach. Rewrite the single resume bullet below so it is stronger:
-- Start with a strong past-tense action verb (Built, Led, Reduced, Automated, Shipped…).
+# Rough prompt budget per batched model call, in tokens (~4 characters each).
+BATCH_TOKEN_BUDGET = 3000
+BATCH_MAX_BULLETS = 20
+
+# What makes a good bullet; shared so /improve-bullet and /improve-bullets
+# can't drift apart.
+REWRITE_RULES = """- Start with a strong past-tense action verb (Built, Led, Reduced, Automated, Shipped…).
 - Be specific and concise — ideally one line, under ~30 words.
 - Emphasise impact and outcome. If the original states a measurable result, make it prominent.
 - Do NOT invent numbers, percentages, names, or facts that are not in the original. Keep it truthful.
 - Do not use the word "I"; write it as a resume bullet.
-{context_line}{jd_line}
+"""
+
+IMPROVE_PROMPT = """You are a resume-writing coach. Rewrite the single resume bullet below so it is stronger:
+""" + REWRITE_RULES + """{context_line}{jd_line}
 Return ONLY the rewritten bullet text — no surrounding quotes, no leading bullet symbol, no explanation.
 
 Original bullet:
 {bullet}
 """
 
+BATCH_PROMPT = """You are a resume-writing coach. Rewrite EACH numbered resume bullet below so it is stronger:
+""" + REWRITE_RULES + """- "Context" says which role or project a bullet belongs to; use it only to understand the bullet.
+{jd_line}
+Return ONLY a JSON object {{"improved": ["<bullet 1>", "<bullet 2>", ...]}} with exactly {count} strings, in the same order as the input.
+Each string is just the rewritten bullet text — no numbering, no surrounding quotes, no leading bullet symbol.
+
+Bullets:
+{bullets}
+"""
+
+
+class BulletIn(BaseModel):
+    bullet: str
+    context: str = ""
+
+
+class BulletBatch(BaseModel):
+    bullets: list[BulletIn]
+    jd: str = ""
+
 
 @router.post("/improve-bullet")
 async def improve_bullet(
+    request: Request,
     bullet: str = Body(...),
     jd: str = Body(""),
     context: str = Body(""),
+    regenerate: bool = False,
 ):
     text = (bullet or "").strip()
     if not text:
         raise HTTPException(status_code=400, detail="Bullet is empty.")
 
     context_line = f"- Context — this bullet belongs to: {context.strip()}\n" if context.strip() else ""
-    jd_line = (
+    prompt = IMPROVE_PROMPT.format(context_line=context_line, jd_line=_jd_line(jd), bullet=text)
+    record("improve_bullet", prompt)
+
+    try:
+        improved = await generate_text_async(prompt, request=request, cache=not regenerate)
+        return {"improved": _clean(improved) or text}
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=502, detail=f"Failed to improve bullet: {e}")
+
+
+def _clean(improved) -> str:
+    """Strip common wrappers the model sometimes adds. Empty means unusable."""
+    if not isinstance(improved, str):
+        return ""
+    return improved.strip().strip('"').strip("'").lstrip("-•*").strip()
+
+
+def _jd_line(jd: str) -> str:
+    return (
         f"- Where honest to do so, align wording with this job description:\n{jd.strip()}\n"
         if jd.strip()
         else ""
     )
-    prompt = IMPROVE_PROMPT.format(context_line=context_line, jd_line=jd_line, bullet=text)
 
-    try:
-        improved = generate_text(prompt).strip()
-        # Strip common wrappers the model sometimes adds.
-        improved = improved.strip('"').strip("'").lstrip("-•*").strip()
-        if not improved:
-            improved = text
-        return {"improved": improved}
-    except (ValueError, RuntimeError) as e:
-        raise HTTPException(status_code=502, detail=f"Failed to improve bullet: {e}")
+
+def _pack(items: list[tuple[int, BulletIn]], overhead: int) -> list[list[tuple[int, BulletIn]]]:
+    """Group bullets into as few calls as fit ``BATCH_TOKEN_BUDGET``."""
+    groups, current, used = [], [], overhead
+    for idx, item in items:
+        cost = estimate_tokens(item.bullet) + estimate_tokens(item.context) + 8
+        if current and (used + cost > BATCH_TOKEN_BUDGET or len(current) >= BATCH_MAX_BULLETS):
+            groups.append(current)
+            current, used = [], overhead
+        current.append((idx, item))
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _improve_group(group, jd: str, request: Request, regenerate: bool) -> list:
+    lines = []
+    for n, (_, item) in enumerate(group, 1):
+        context = f" (Context: {item.context.strip()})" if item.context.strip() else ""
+        lines.append(f"{n}. {item.bullet.strip()}{context}")
+    prompt = BATCH_PROMPT.format(jd_line=_jd_line(jd), count=len(group), bullets="\n".join(lines))
+    record("improve_bullets", prompt)
+    result = await generate_json_async(prompt, request=request, cache=not regenerate)
+    improved = result.get("improved") if isinstance(result, dict) else None
+    return improved if isinstance(improved, list) else []
+
+
+@router.post("/improve-bullets")
+async def improve_bullets(body: BulletBatch, request: Request, regenerate: bool = False):
+    """Improve many bullets at once. Results are aligned with the input by
+    index; any bullet whose rewrite is missing or unusable (including every
+    bullet of a call that returned the wrong number of rewrites) keeps its
+    original text and is listed in ``unchanged``."""
+    results = [b.bullet for b in body.bullets]
+    todo = [(i, b) for i, b in enumerate(body.bullets) if b.bullet.strip()]
+    if not todo:
+        return {"improved": results, "unchanged": list(range(len(results)))}
+
+    overhead = estimate_tokens(BATCH_PROMPT) + estimate_tokens(body.jd)
+    groups = _pack(todo, overhead)
+    outcomes = await asyncio.gather(
+        *(_improve_group(g, body.jd, request, regenerate) for g in groups),
+        return_exceptions=True,
+    )
+    errors = [o for o in outcomes if isinstance(o, BaseException)]
+    for error in errors:
+        if not isinstance(error, (ValueError, RuntimeError)):
+            raise error
+    if len(errors) == len(groups):
+        raise HTTPException(status_code=502, detail=f"Failed to improve bullets: {errors[0]}")
+
+    improved_idx = set()
+    for group, outcome in zip(groups, outcomes):
+        # Rewrites are matched to bullets by position. If the model merged
+        # or dropped one, that can't be trusted for any of them.
+        if isinstance(outcome, BaseException) or len(outcome) != len(group):
+            continue
+        for pos, (idx, _) in enumerate(group):
+            cleaned = _clean(outcome[pos])
+            if cleaned:
+                results[idx] = cleaned
+                improved_idx.add(idx)
+    return {
+        "improved": results,
+        "unchanged": [i for i in range(len(results)) if i not in improved_idx],
+    }
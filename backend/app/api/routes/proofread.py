@@ -1,9 +1,32 @@
-from fastapi import APIRouter, HTTPException
+"""Spelling and grammar check.
 
-from app.llm import generate_json
+Resumes are proofread per text fragment (a paragraph, a bullet, an education
+detail). Each fragment's issues are cached by a hash of its text, so after an
+edit only new or changed fragments go to the model. Those are packed into
+chunks that are proofread concurrently, and every issue is checked against
+the fragment it came from, so it can be mapped back to that bullet.
+"""
+import asyncio
+import hashlib
+import os
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.cache import LRUCache
+from app.llm import generate_json_async
+from app.prompts import record
 
 router = APIRouter()
 
+PROOFREAD_CACHE_SIZE = int(os.getenv("PROOFREAD_CACHE_SIZE", "4096"))
+# Rough size of one model call. Small enough that a long resume fans out into
+# several concurrent calls, large enough that a short one is a single call.
+CHUNK_CHARS = 2500
+CHUNK_FRAGMENTS = 25
+
+# fragment hash -> issues found in that fragment (possibly none)
+_fragment_cache = LRUCache(max_items=PROOFREAD_CACHE_SIZE)
+
 PROOFREAD_PROMPT = """You are a meticulous proofreader for resumes. Find ONLY genuine spelling mistakes and grammar errors in the text below.
 
 Rules:
@@ -11,9 +34,10 @@ Rules:
 - DO NOT flag correct technical terms, product names, acronyms, or proper nouns as misspelled (e.g. FastAPI, Kubernetes, PostgreSQL, CI/CD, Nginx, Pydantic).
 - DO NOT rewrite for style, tone, wording, or conciseness. Only fix outright errors.
 - For each error, copy the SMALLEST original phrase that contains it EXACTLY as written (so it can be found and replaced), and give the corrected phrase.
+- The text is a list of numbered fragments like "[3] ...". For each error, give the number of the fragment it is in.
 
 Return ONLY a JSON object of this shape:
-{"issues": [{"original": "<exact snippet from the text>", "suggestion": "<corrected snippet>", "reason": "<short reason>"}]}
+{"issues": [{"fragment": <number>, "original": "<exact snippet from the text>", "suggestion": "<corrected snippet>", "reason": "<short reason>"}]}
 If there are no errors, return {"issues": []}.
 
 Text to proofread:
@@ -38,31 +62,100 @@ def _collect_texts(resume: dict) -> list[str]:
     return parts
 
 
+def _fragment_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _chunks(fragments: list[str]) -> list[list[str]]:
+    chunks, current, size = [], [], 0
+    for frag in fragments:
+        if current and (size + len(frag) > CHUNK_CHARS or len(current) >= CHUNK_FRAGMENTS):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(frag)
+        size += len(frag)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _valid(issue, fragment: str) -> bool:
+    """Keep only issues whose original appears verbatim in its fragment and
+    actually changes something."""
+    return (
+        isinstance(issue, dict)
+        and bool(issue.get("original"))
+        and bool(issue.get("suggestion"))
+        and issue["original"] in fragment
+        and issue["original"] != issue["suggestion"]
+    )
+
+
+async def _proofread_chunk(chunk: list[str], request: Request, regenerate: bool) -> dict[str, list]:
+    """Proofread one chunk; return ``{fragment text: issues}`` for all of it."""
+    numbered = "\n".join(f"[{i}] {frag}" for i, frag in enumerate(chunk, 1))
+    record("proofread", PROOFREAD_PROMPT + numbered)
+    result = await generate_json_async(
+        PROOFREAD_PROMPT + numbered, request=request, cache=not regenerate
+    )
+    raw = result.get("issues", []) if isinstance(result, dict) else []
+
+    found: dict[str, list] = {frag: [] for frag in chunk}
+    for issue in raw:
+        if not isinstance(issue, dict):
+            continue
+        # Trust the model's fragment number when the snippet is really there;
+        # otherwise attribute it to the first fragment that contains it.
+        idx = issue.get("fragment")
+        candidates = [chunk[idx - 1]] if isinstance(idx, int) and 1 <= idx <= len(chunk) else []
+        candidates += chunk
+        frag = next((f for f in candidates if _valid(issue, f)), None)
+        if frag is None:
+            continue
+        found[frag].append({
+            "original": issue["original"],
+            "suggestion": issue["suggestion"],
+            "reason": issue.get("reason", ""),
+        })
+    return found
+
+
 @router.post("/proofread")
-async def proofread(resume: dict):
-    parts = _collect_texts(resume)
-    text = "\n".join(parts).strip()
-    if not text:
+async def proofread(resume: dict, request: Request, regenerate: bool = False):
+    parts = [p for p in _collect_texts(resume) if p.strip()]
+    if not parts:
         return {"issues": []}
 
-    try:
-        result = generate_json(PROOFREAD_PROMPT + text)
-    except (ValueError, RuntimeError) as e:
-        raise HTTPException(status_code=502, detail=f"Proofreading failed: {e}")
+    results: dict[str, list] = {}
+    if not regenerate:
+        for frag in parts:
+            cached = _fragment_cache.get(_fragment_key(frag))
+            if cached is not None:
+                results[frag] = cached
+    todo = list(dict.fromkeys(f for f in parts if f not in results))
 
-    raw = result.get("issues", []) if isinstance(result, dict) else []
-    # Keep only issues whose original actually appears verbatim and changes something.
+    outcomes = await asyncio.gather(
+        *(_proofread_chunk(c, request, regenerate) for c in _chunks(todo)),
+        return_exceptions=True,
+    )
+    # Cache every chunk that succeeded before reporting a failed one, so the
+    # retry only re-sends what is still missing.
+    failures = [o for o in outcomes if isinstance(o, BaseException)]
+    for found in outcomes:
+        if isinstance(found, dict):
+            for frag, issues in found.items():
+                _fragment_cache.put(_fragment_key(frag), issues)
+                results[frag] = issues
+    for failure in failures:
+        if not isinstance(failure, (ValueError, RuntimeError)):
+            raise failure
+    if failures:
+        raise HTTPException(status_code=502, detail=f"Proofreading failed: {failures[0]}")
+
+    # "fragment" is the index into the resume's proofreadable texts, in order.
     issues = [
-        {
-            "original": i["original"],
-            "suggestion": i["suggestion"],
-            "reason": i.get("reason", ""),
-        }
-        for i in raw
-        if isinstance(i, dict)
-        and i.get("original")
-        and i.get("suggestion")
-        and i["original"] in text
-        and i["original"] != i["suggestion"]
+        {**issue, "fragment": i}
+        for i, frag in enumerate(parts)
+        for issue in results[frag]
     ]
     return {"issues": issues}
@@ -1,11 +1,53 @@
-from fastapi import APIRouter, File, HTTPException, UploadFile
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Any, Literal
 
-from app.database import db
-from app.llm import generate_json
-from app.text_extraction import extract_text_from_file
+from fastapi import APIRouter, File, HTTPException, Request, Response, UploadFile
+from pydantic import BaseModel
+
+from app import share_artifacts
+from app.cache import LRUCache
+from app.database import CachedDoc, StaleRevisionError, db
+from app.jsonpatch import PatchError
+from app.llm import generate_json_async
+from app.prompts import record
+from app.resume_parser import PARSER_VERSION, merge_resolved, parse_resume_text
+from app.text_extraction import extract_upload_text, read_upload
 
 router = APIRouter()
 
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "256"))
+PARSE_CACHE_TTL = int(os.getenv("PARSE_CACHE_TTL", str(7 * 24 * 3600)))
+PARSE_CACHE_PERSIST = os.getenv("PARSE_CACHE_PERSIST", "").lower() in ("1", "true", "yes")
+
+SECTION_RULES = """SECTION TYPES
+1. "paragraph": one descriptive block (e.g. summary/objective). Put the text in "content"; leave "items" empty.
+2. "bullet_points": a list such as Skills or Certifications. Put each point in "items" (array of strings); leave "content" empty.
+   - Skills that are CATEGORISED: output ONE item per category, formatted as "Category: value1, value2, ...".
+   - Skills laid out in MULTIPLE COLUMNS often extract in a scrambled order (all the category labels grouped together, then all the value lists grouped together, sometimes with a later heading mixed in). Re-pair each category label with the value list that belongs to it as best you can, and drop any heading that clearly belongs to a different section.
+   - Skills listed inline (comma/pipe/dot separated and uncategorised): use a "paragraph" with a comma-separated string in "content".
+3. "experience": jobs / work history only. "items" is an array of:
+   {"position": "", "company": "", "start_month": "", "start_year": "", "end_month": "", "end_year": "", "end_type": "", "bullet_points": []}
+4. "education": schooling only. "items" is an array of:
+   {"degree": "", "institution": "", "start_month": "", "start_year": "", "end_month": "", "end_year": "", "end_type": "", "details": ""}
+5. "project": personal, academic, or side projects. "items" is an array of:
+   {"name": "", "tech": "", "github": "", "link": "", "start_month": "", "start_year": "", "end_month": "", "end_year": "", "end_type": "", "bullet_points": []}
+   - "tech": the tech stack (often written as a "Stack: ..." line).
+   - "github": any github.com URL for the project. "link": any other live/demo URL. Leave "" if absent.
+   - Put projects under "project", NEVER under "experience". Likewise put education under "education", never under "experience".
+
+DATES (apply to experience, education, and project entries)
+- Use full month names with 4-digit years, e.g. "March 2022".
+- "end_type": "Present" if the entry is ongoing; "Specific Month" if there is a real end date; "None" if there is no end date at all.
+- Preserve the original granularity:
+    "03/2022 - Present" -> start_month "March", start_year "2022", end_type "Present"
+    "03/2022 - 03/2023" -> start "March 2022", end "March 2023", end_type "Specific Month"
+    "2020 - 2023"       -> start_year "2020", end_year "2023", months "", end_type "Specific Month"
+    "May 2025"          -> start_month "May", start_year "2025", end_type "None"
+    no date             -> all date fields "", end_type "None"
+"""
+
 PARSE_PROMPT = """You are an expert resume parser. Read the resume text below and return ONLY a JSON object with this exact shape:
 
 {
@@ -32,58 +74,213 @@ GENERAL RULES
 - contact_info: combine phone, email, location, and links into one string separated by " | ".
 - If a section has content but no clear title, infer a sensible one (e.g. "Summary").
 
-SECTION TYPES
-1. "paragraph": one descriptive block (e.g. summary/objective). Put the text in "content"; leave "items" empty.
-2. "bullet_points": a list such as Skills or Certifications. Put each point in "items" (array of strings); leave "content" empty.
-   - Skills that are CATEGORISED: output ONE item per category, formatted as "Category: value1, value2, ...".
-   - Skills laid out in MULTIPLE COLUMNS often extract in a scrambled order (all the category labels grouped together, then all the value lists grouped together, sometimes with a later heading mixed in). Re-pair each category label with the value list that belongs to it as best you can, and drop any heading that clearly belongs to a different section.
-   - Skills listed inline (comma/pipe/dot separated and uncategorised): use a "paragraph" with a comma-separated string in "content".
-3. "experience": jobs / work history only. "items" is an array of:
-   {"position": "", "company": "", "start_month": "", "start_year": "", "end_month": "", "end_year": "", "end_type": "", "bullet_points": []}
-4. "education": schooling only. "items" is an array of:
-   {"degree": "", "institution": "", "start_month": "", "start_year": "", "end_month": "", "end_year": "", "end_type": "", "details": ""}
-5. "project": personal, academic, or side projects. "items" is an array of:
-   {"name": "", "tech": "", "github": "", "link": "", "start_month": "", "start_year": "", "end_month": "", "end_year": "", "end_type": "", "bullet_points": []}
-   - "tech": the tech stack (often written as a "Stack: ..." line).
-   - "github": any github.com URL for the project. "link": any other live/demo URL. Leave "" if absent.
-   - Put projects under "project", NEVER under "experience". Likewise put education under "education", never under "experience".
+""" + SECTION_RULES
 
-DATES (apply to experience, education, and project entries)
-- Use full month names with 4-digit years, e.g. "March 2022".
-- "end_type": "Present" if the entry is ongoing; "Specific Month" if there is a real end date; "None" if there is no end date at all.
-- Preserve the original granularity:
-    "03/2022 - Present" -> start_month "March", start_year "2022", end_type "Present"
-    "03/2022 - 03/2023" -> start "March 2022", end "March 2023", end_type "Specific Month"
-    "2020 - 2023"       -> start_year "2020", end_year "2023", months "", end_type "Specific Month"
-    "May 2025"          -> start_month "May", start_year "2025", end_type "None"
-    no date             -> all date fields "", end_type "None"
-"""
+FRAGMENT_PROMPT = """You are an expert resume parser. The numbered fragments below are sections of one resume (heading, if any, then text) that need classifying. Return ONLY a JSON object with this shape:
+
+{"sections": [{"fragment": 1, "type": "", "title": "", "content": "", "items": []}]}
+
+- "fragment" is the number of the fragment a section came from. A fragment may yield several sections, or none if it holds no resume content.
+- Do not invent information. Use only what is present in the text. Never output an empty section.
+- Keep the fragment's heading as the title when it has one; otherwise infer a sensible one.
+
+""" + SECTION_RULES
+
+
+def cached_json(request: Request, entry: CachedDoc, cache_control: str = "no-cache") -> Response:
+    """``entry`` as a JSON response with its ETag, or a bodyless 304 when
+    the client already has it (``If-None-Match``)."""
+    headers = {"ETag": entry.etag, "Cache-Control": cache_control}
+    tags = request.headers.get("if-none-match", "")
+    if tags.strip() == "*" or entry.etag in (t.strip() for t in tags.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
 
 
 @router.get("/resume/{email}")
-async def get_resume(email: str):
-    resume = db.get_resume(email)
-    if not resume:
+async def get_resume(email: str, request: Request):
+    entry = await db.get_resume_entry(email)
+    if not entry:
         raise HTTPException(status_code=404, detail="Resume not found")
-    return resume
+    return cached_json(request, entry)
 
 
 @router.post("/resume/{email}")
 async def save_resume(email: str, resume_data: dict):
     try:
-        db.save_resume(email, resume_data)
-        return {"message": "Resume saved successfully"}
+        rev = await db.save_resume(email, resume_data)
+        share_artifacts.schedule(email)  # refreshes the public link's artifacts if it's live
+        return {"message": "Resume saved successfully", "rev": rev}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/parse-resume")
-async def parse_resume(file: UploadFile = File(...)):
-    text = extract_text_from_file(file)
-    if not text.strip():
-        raise HTTPException(status_code=400, detail="Could not extract text from file.")
+class ResumePatch(BaseModel):
+    rev: int  # the revision the edit was made against
+    ops: list[dict] = []  # RFC 6902 operations
+    changes: dict[str, Any] = {}  # path -> value (None removes)
 
+
+@router.patch("/resume/{email}")
+async def patch_resume(email: str, body: ResumePatch):
+    """Partial save: only the edited paths are sent and written. 409 (with
+    the current ``rev``) if the resume changed since ``rev``; the client
+    should then reload or fall back to a full save."""
     try:
-        return generate_json(PARSE_PROMPT + "\nInput resume:\n" + text)
+        rev = await db.patch_resume(email, body.rev, body.ops, body.changes)
+    except StaleRevisionError as e:
+        raise HTTPException(status_code=409, detail={"message": "Resume has changed", "rev": e.rev})
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if rev is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    share_artifacts.schedule(email)
+    return {"rev": rev}
+
+
+class ParseCache:
+    """Extracted text and parsed JSON per uploaded file, keyed by content hash.
+
+    Text entries are keyed by the file hash alone; parsed entries also by a
+    digest of ``PARSE_PROMPT`` so a prompt change doesn't serve stale output.
+    The MongoDB tier is opt-in (PARSE_CACHE_PERSIST=1), since it keeps
+    uploaded personal data for days. Like the LLM response cache, it is best
+    effort: any error just means a miss.
+    """
+
+    def __init__(self, size: int = PARSE_CACHE_SIZE, ttl: int = PARSE_CACHE_TTL,
+                 persist: bool = PARSE_CACHE_PERSIST):
+        self.memory = LRUCache(max_items=size, ttl=ttl)
+        self.ttl = ttl
+        self.persist = persist
+        self.persistent_hits = 0
+        self.persistent_errors = 0
+
+    def _persistent(self) -> bool:
+        return self.persist and db.configured()
+
+    async def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None or not self._persistent():
+            return value
+        try:
+            doc = await (await db.cache_collection("parse_cache", self.ttl)).find_one({"_id": key})
+        except Exception:  # noqa: BLE001 - persistent tier is optional
+            self.persistent_errors += 1
+            return None
+        if doc is None:
+            return None
+        self.persistent_hits += 1
+        self.memory.put(key, doc["value"])
+        return doc["value"]
+
+    async def put(self, key: str, value) -> None:
+        self.memory.put(key, value)
+        if not self._persistent():
+            return
+        try:
+            doc = {"_id": key, "value": value, "created_at": datetime.now(timezone.utc)}
+            col = await db.cache_collection("parse_cache", self.ttl)
+            await col.replace_one({"_id": key}, doc, upsert=True)
+        except Exception:  # noqa: BLE001
+            self.persistent_errors += 1
+
+    def stats(self) -> dict:
+        return {
+            **self.memory.stats(),
+            "persistent": self._persistent(),
+            "persistent_hits": self.persistent_hits,
+            "persistent_errors": self.persistent_errors,
+        }
+
+
+parse_cache = ParseCache()
+_PROMPT_DIGEST = hashlib.sha256((PARSE_PROMPT + FRAGMENT_PROMPT).encode()).hexdigest()[:12]
+
+
+async def _parse_with_model(text: str, request: Request, regenerate: bool) -> dict:
+    prompt = PARSE_PROMPT + "\nInput resume:\n" + text
+    record("parse_resume", prompt)
+    try:
+        return await generate_json_async(prompt, request=request, cache=not regenerate)
     except (ValueError, RuntimeError) as e:
         raise HTTPException(status_code=502, detail=f"Failed to parse resume: {e}")
+
+
+async def _parse_hybrid(text: str, request: Request, regenerate: bool,
+                        local_only: bool) -> tuple[dict, list[int]]:
+    """Local rules first; the model only sees the fragments they couldn't
+    classify. If the rules found no usable section at all, the whole text
+    goes to the model as before.
+
+    Returns the resume and the indices of sections left as plain paragraphs
+    because the model call failed (empty when it succeeded or wasn't
+    needed)."""
+    parsed, unresolved = parse_resume_text(text)
+    if not unresolved or local_only:
+        return parsed, []
+    if len(unresolved) == len(parsed["sections"]):
+        return await _parse_with_model(text, request, regenerate), []
+
+    fragments = "\n\n".join(
+        f"Fragment {n}:\n{u['title'] or '(no heading)'}\n{u['text']}"
+        for n, u in enumerate(unresolved, 1)
+    )
+    prompt = FRAGMENT_PROMPT + "\nFragments:\n" + fragments
+    # Baseline: what the whole-text parse would have sent.
+    record("parse_resume", prompt, baseline=PARSE_PROMPT + "\nInput resume:\n" + text)
+    try:
+        result = await generate_json_async(prompt, request=request, cache=not regenerate)
+    except (ValueError, RuntimeError):
+        return parsed, [u["index"] for u in unresolved]  # they stay plain paragraphs
+    return merge_resolved(parsed, unresolved, result.get("sections") if isinstance(result, dict) else None), []
+
+
+@router.post("/parse-resume")
+async def parse_resume(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    regenerate: bool = False,
+    mode: Literal["auto", "local", "llm"] = "auto",
+):
+    """Parse an uploaded resume.
+
+    ``mode``: "auto" parses with local rules and asks the model only about
+    sections they can't classify; "local" never calls the model (sections
+    it can't classify come back as paragraphs); "llm" sends the whole text
+    to the model. Re-uploading the same file is served from the parse cache
+    without re-extracting or calling the model, unless ``regenerate`` is set
+    (which only re-runs the parse).
+
+    If the model call for the unclassified sections fails, the local parse is
+    returned with those sections as paragraphs, their indices are listed in
+    the ``X-Unresolved-Sections`` header, and nothing is cached, so the next
+    upload of the file tries the model again."""
+    data, ext = await read_upload(file)
+    digest = hashlib.sha256(data).hexdigest()
+    text_key = f"text:{digest}"
+    parsed_key = f"parsed:{mode}:{_PROMPT_DIGEST}:{PARSER_VERSION}:{digest}"
+
+    if not regenerate:
+        parsed = await parse_cache.get(parsed_key)
+        if parsed is not None:
+            return parsed
+
+    text = await parse_cache.get(text_key)
+    if text is None:
+        text = await extract_upload_text(data, ext)
+        await parse_cache.put(text_key, text)
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Could not extract text from file.")
+
+    failed: list[int] = []
+    if mode == "llm":
+        parsed = await _parse_with_model(text, request, regenerate)
+    else:
+        parsed, failed = await _parse_hybrid(text, request, regenerate, local_only=mode == "local")
+    if failed:
+        response.headers["X-Unresolved-Sections"] = ",".join(map(str, failed))
+    else:
+        await parse_cache.put(parsed_key, parsed)
+    return parsed
@@ -1,19 +1,112 @@
-from fastapi import APIRouter, Body, HTTPException
+"""Whole-resume rewrite, fanned out per section.
 
-from app.llm import generate_json
+Each section is rewritten against the JD in its own model call, all
+concurrently, so the wall-clock time is that of the slowest section rather
+than one giant response. A section whose call fails or whose answer doesn't
+validate keeps its original content; the rest of the resume still gets
+rewritten. Fields outside ``sections`` (name, contact info, ...) are
+returned unchanged.
+"""
+import asyncio
+
+from fastapi import APIRouter, Body, HTTPException, Request, Response
+
+from app.llm import generate_json_async
+from app.prompts import build
 
 router = APIRouter()
 
+# Entry fields the rewrite must not change (the model is told to stay
+# truthful, but dates and links are facts, so they are restored regardless).
+_FIXED_ITEM_FIELDS = {
+    "start_month", "start_year", "end_month", "end_year", "end_type", "github", "link",
+}
+
+
+REWRITE_PROMPT = (
+    "Rewrite the following resume section to best match this job description. "
+    "Keep it truthful, but optimize for keywords, skills, and achievements relevant to the JD. "
+    "Output the section in the same JSON structure as before. "
+    "Return ONLY the rewritten section as a single JSON object, with no explanation or extra text.\n\n"
+    "Job Description:\n{jd}\n\nSection:\n{section}"
+)
+
+
+def _prompt(jd: str, section: dict) -> str:
+    # Formatting and empty fields are left out of the prompt; _merge keeps
+    # the original's, so the section comes back complete.
+    return build("rewrite_resume", REWRITE_PROMPT, clip=("jd",), jd=jd, section=section)
+
+
+def _merge(original: dict, rewritten) -> dict | None:
+    """The rewritten section with the original's structure enforced, or
+    ``None`` if the answer can't stand in for the original."""
+    if not isinstance(rewritten, dict):
+        return None
+    items = rewritten.get("items", original.get("items", []))
+    content = rewritten.get("content", original.get("content", ""))
+    if not isinstance(items, list) or not isinstance(content, str):
+        return None
+    original_items = original.get("items") or []
+    structured = any(isinstance(i, dict) for i in original_items)
+    if structured:
+        # Experience/education/project entries map one-to-one.
+        if len(items) != len(original_items) or not all(isinstance(i, dict) for i in items):
+            return None
+        items = [
+            {**old, **{k: v for k, v in new.items() if k not in _FIXED_ITEM_FIELDS}}
+            for old, new in zip(original_items, items)
+        ]
+    elif not all(isinstance(i, str) for i in items):
+        return None
+    if (original_items or original.get("content", "").strip()) and not (items or content.strip()):
+        return None
+    return {
+        **original,
+        "title": rewritten.get("title") if isinstance(rewritten.get("title"), str) else original.get("title", ""),
+        "content": content,
+        "items": items,
+    }
+
+
+async def _rewrite_section(jd: str, section: dict, request: Request, regenerate: bool):
+    return await generate_json_async(_prompt(jd, section), request=request, cache=not regenerate)
+
 
 @router.post("/rewrite-resume-ai")
-async def rewrite_resume_ai(jd: str = Body(...), resume: dict = Body(...)):
-    prompt = (
-        "Rewrite the following resume to best match this job description. "
-        "Keep it truthful, but optimize for keywords, skills, and achievements relevant to the JD. "
-        "Output in the same JSON structure as before keeping the formatting same as before.\n\n"
-        f"Job Description:\n{jd}\n\nResume:\n{resume}"
+async def rewrite_resume_ai(
+    request: Request,
+    response: Response,
+    jd: str = Body(...),
+    resume: dict = Body(...),
+    regenerate: bool = False,
+):
+    """Returns the rewritten resume. Indices of sections that kept their
+    original content are listed in the ``X-Unchanged-Sections`` header."""
+    sections = resume.get("sections")
+    if not isinstance(sections, list) or not sections:
+        raise HTTPException(status_code=400, detail="Resume has no sections to rewrite.")
+
+    targets = [i for i, s in enumerate(sections) if isinstance(s, dict)]
+    answers = await asyncio.gather(
+        *(_rewrite_section(jd, sections[i], request, regenerate) for i in targets),
+        return_exceptions=True,
     )
-    try:
-        return generate_json(prompt)
-    except (ValueError, RuntimeError) as e:
-        raise HTTPException(status_code=502, detail=f"Failed to rewrite resume: {e}")
+    errors = [a for a in answers if isinstance(a, BaseException)]
+    for error in errors:
+        if not isinstance(error, (ValueError, RuntimeError)):
+            raise error
+    if errors and len(errors) == len(targets):
+        raise HTTPException(status_code=502, detail=f"Failed to rewrite resume: {errors[0]}")
+
+    merged, unchanged = list(sections), []
+    for i, answer in zip(targets, answers):
+        section = None if isinstance(answer, BaseException) else _merge(sections[i], answer)
+        if section is None:
+            unchanged.append(i)
+        else:
+            merged[i] = section
+    unchanged += [i for i in range(len(sections)) if i not in targets]
+    if unchanged:
+        response.headers["X-Unchanged-Sections"] = ",".join(map(str, sorted(unchanged)))
+    return {**resume, "sections": merged}
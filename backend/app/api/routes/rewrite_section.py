@@ -1,28 +1,40 @@
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, HTTPException, Request
 
-from app.llm import generate_json
+from app.llm import generate_json_async
+from app.prompts import build, restore
 
 router = APIRouter()
 
+JD_PROMPT = (
+    "Rewrite this resume section to better match the following job description. "
+    "Keep the meaning, but optimize for relevance and clarity.\n\n"
+    "Keep the JSON structure the same as before.\n\n"
+    "Return ONLY the rewritten section as a single JSON object, with no explanation or extra text.\n\n"
+    "Job Description:\n{jd}\n\nSection:\n{section}"
+)
+
+IMPROVE_PROMPT = (
+    "Improve the following resume section for grammar, readability, and standardization. "
+    "Keep the meaning and the JSON structure the same as before.\n\n"
+    "Return ONLY the improved section as a single JSON object, with no explanation or extra text.\n\n"
+    "Section:\n{section}"
+)
+
 
 @router.post("/rewrite-section-ai")
-async def rewrite_section_ai(jd: str = Body(...), section: dict = Body(...)):
+async def rewrite_section_ai(
+    request: Request,
+    jd: str = Body(...),
+    section: dict = Body(...),
+    regenerate: bool = False,
+):
     if jd.strip():
-        prompt = (
-            "Rewrite this resume section to better match the following job description. "
-            "Keep the meaning, but optimize for relevance and clarity.\n\n"
-            "Keep the formatting same as before.\n\n"
-            "Return ONLY the rewritten section as a single JSON object, with no explanation or extra text.\n\n"
-            f"Job Description:\n{jd}\n\nSection:\n{section}"
-        )
+        prompt = build("rewrite_section", JD_PROMPT, clip=("jd",), jd=jd, section=section)
     else:
-        prompt = (
-            "Improve the following resume section for grammar, readability, and standardization. "
-            "Keep the meaning and formatting the same as before.\n\n"
-            "Return ONLY the improved section as a single JSON object, with no explanation or extra text.\n\n"
-            f"Section:\n{section}"
-        )
+        prompt = build("rewrite_section", IMPROVE_PROMPT, section=section)
     try:
-        return generate_json(prompt)
+        rewritten = await generate_json_async(prompt, request=request, cache=not regenerate)
     except (ValueError, RuntimeError) as e:
         raise HTTPException(status_code=502, detail=f"Failed to rewrite section: {e}")
+    # The prompt left out formatting and empty fields; put them back.
+    return restore(section, rewritten)
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
+from app import share_artifacts
+from app.api.routes.resume import cached_json
 from app.database import db
 
 router = APIRouter()
@@ -9,7 +11,7 @@ router = APIRouter()
 async def get_share(email: str):
     """Current sharing state (token + whether the public link is live)."""
     try:
-        return db.get_share_state(email)
+        return await db.get_share_state(email)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -17,34 +19,61 @@ async def get_share(email: str):
 @router.post("/resume/{email}/share")
 async def enable_share(email: str):
     """Turn on the public link (minting a token the first time)."""
-    state = db.set_share(email, enabled=True)
+    state = await db.set_share(email, enabled=True)
     if state is None:
         raise HTTPException(status_code=404, detail="Resume not found")
+    share_artifacts.schedule(email)
     return state
 
 
 @router.post("/resume/{email}/share/regenerate")
 async def regenerate_share(email: str):
     """Mint a fresh token, permanently invalidating the old link."""
-    state = db.set_share(email, enabled=True, regenerate=True)
+    state = await db.set_share(email, enabled=True, regenerate=True)
     if state is None:
         raise HTTPException(status_code=404, detail="Resume not found")
+    share_artifacts.schedule(email)
     return state
 
 
 @router.post("/resume/{email}/share/disable")
 async def disable_share(email: str):
     """Turn the public link off. The token is kept so re-enabling reuses it."""
-    state = db.set_share(email, enabled=False)
+    state = await db.set_share(email, enabled=False)
     if state is None:
         raise HTTPException(status_code=404, detail="Resume not found")
     return state
 
 
 @router.get("/r/{token}")
-async def public_resume(token: str):
-    """Public, read-only resume by share token. No account data is exposed."""
-    resume = db.get_shared_resume(token)
-    if not resume:
+async def public_resume(token: str, request: Request):
+    """Public, read-only resume by share token. No account data is exposed.
+    ``artifact``, once published, names the pre-rendered files below."""
+    entry = await db.get_shared_entry(token)
+    if not entry:
         raise HTTPException(status_code=404, detail="This shared resume is not available.")
-    return resume
+    return cached_json(request, entry)
+
+
+@router.get("/r/{token}/artifacts/{name}")
+async def public_artifact(token: str, name: str):
+    """Pre-rendered ``{version}.html`` or ``{version}.pdf`` of a shared
+    resume. The version is a content hash, so responses never change and
+    may be cached for good."""
+    version, _, kind = name.partition(".")
+    if kind not in share_artifacts.ARTIFACT_TYPES:
+        raise HTTPException(status_code=404, detail="Not found")
+    data = await db.get_share_artifact(token, version, kind)
+    if data is None:
+        raise HTTPException(status_code=404, detail="This shared resume is not available.")
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{version}"',
+        "X-Content-Type-Options": "nosniff",
+    }
+    if kind == "html":
+        # User content on the API's origin: no scripts, nothing loaded.
+        headers["Content-Security-Policy"] = "default-src 'none'; style-src 'unsafe-inline'; img-src data:"
+    else:
+        headers["Content-Disposition"] = 'inline; filename="resume.pdf"'
+    return Response(data, media_type=share_artifacts.ARTIFACT_TYPES[kind], headers=headers)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
-from app.database import db
+from app.database import VERSION_META_FIELDS, VERSION_PAGE_MAX, VERSION_PAGE_SIZE, db
+from app.resume_diff import diff_resumes
 
 router = APIRouter()
 
@@ -15,24 +16,66 @@ class VersionCreate(BaseModel):
 @router.post("/resume/{email}/versions")
 async def create_version(email: str, body: VersionCreate):
     try:
-        version_id = db.save_version(email, body.snapshot, body.source, body.protected)
+        version_id = await db.save_version(email, body.snapshot, body.source, body.protected)
         # version_id is None when the snapshot was identical to the last one.
         return {"id": version_id, "stored": version_id is not None}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _fields(fields: str | None, snapshot: bool) -> list[str] | None:
+    """Parse a comma-separated ``fields`` parameter (None means everything)."""
+    if fields is None:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    for name in names:
+        if name in VERSION_META_FIELDS or (snapshot and (name == "snapshot" or name.startswith("snapshot."))):
+            continue
+        raise HTTPException(status_code=400, detail=f"Unknown field: {name}")
+    return names
+
+
 @router.get("/resume/{email}/versions")
-async def list_versions(email: str):
+async def list_versions(
+    email: str,
+    limit: int = Query(VERSION_PAGE_SIZE, ge=1, le=VERSION_PAGE_MAX),
+    cursor: str | None = None,
+    source: str | None = None,
+    protected: bool | None = None,
+    fields: str | None = None,
+):
+    """A page of versions, newest first: ``{"versions", "next_cursor"}``."""
+    names = _fields(fields, snapshot=False)
     try:
-        return db.list_versions(email)
+        return await db.list_versions(email, limit, cursor, source, protected, names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/resume/{email}/versions/{version_id}")
-async def get_version(email: str, version_id: str):
-    version = db.get_version(email, version_id)
+async def get_version(email: str, version_id: str, fields: str | None = None):
+    version = await db.get_version(email, version_id, _fields(fields, snapshot=True))
     if not version:
         raise HTTPException(status_code=404, detail="Version not found")
     return version
+
+
+@router.get("/resume/{email}/versions/{version_id}/diff")
+async def diff_version(email: str, version_id: str, against: str = "current"):
+    """What changed from version ``version_id`` to ``against``: another
+    version id, or ``current`` for the saved resume."""
+    old = await db.get_version(email, version_id, ["snapshot"])
+    if not old:
+        raise HTTPException(status_code=404, detail="Version not found")
+    if against == "current":
+        new = await db.get_resume(email)
+        if not new:
+            raise HTTPException(status_code=404, detail="Resume not found")
+    else:
+        version = await db.get_version(email, against, ["snapshot"])
+        if not version:
+            raise HTTPException(status_code=404, detail="Version not found")
+        new = version["snapshot"]
+    return {"from": version_id, "to": against, **diff_resumes(old["snapshot"], new)}
@@ -0,0 +1,87 @@
+"""Small in-process caches shared by the rendering, LLM and data layers.
+
+Everything here is used from the event loop only, so no locking.
+"""
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Least-recently-used cache bounded by entry count and/or total size.
+
+    ``max_bytes`` is measured with ``sizeof`` (``len`` by default, which suits
+    ``bytes``/``str`` values). ``ttl`` (seconds) makes entries expire; expired
+    entries count as misses and are dropped on access.
+    """
+
+    def __init__(self, max_items: int | None = None, max_bytes: int | None = None,
+                 ttl: float | None = None, sizeof=len):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._data: "OrderedDict[str, tuple[object, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: str, default=None, count: bool = True):
+        entry = self._data.get(key)
+        if entry is not None and self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+            self.pop(key)
+            entry = None
+        if entry is None:
+            if count:
+                self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        if count:
+            self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, value) -> None:
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # would evict everything and still not fit
+        self.pop(key)
+        self._data[key] = (value, size, time.monotonic())
+        self._bytes += size
+        while self._data and (
+            (self.max_items is not None and len(self._data) > self.max_items)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, old_size, _) = self._data.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def pop(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return None
+        self._bytes -= entry[1]
+        return entry[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+_MISSING = object()
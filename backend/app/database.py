@@ -1,45 +1,255 @@
+import asyncio
+import base64
 import hashlib
 import json
 import os
 import secrets
+import zlib
 from datetime import datetime
+from typing import NamedTuple
 
 from bson import ObjectId
 from dotenv import load_dotenv
-from pymongo import MongoClient
-from pymongo.collection import Collection
+from pymongo import (ASCENDING, DESCENDING, AsyncMongoClient, DeleteMany, IndexModel, InsertOne,
+                     ReturnDocument, UpdateOne)
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from app import jsonpatch
+from app.cache import LRUCache
 
 load_dotenv()
 
+# Connection pool and timeouts (see pymongo's MongoClient options).
+MONGODB_DB = os.getenv("MONGODB_DB", "buildit")
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+MONGODB_TIMEOUT_MS = int(os.getenv("MONGODB_TIMEOUT_MS", "5000"))
+MONGODB_READ_PREFERENCE = os.getenv("MONGODB_READ_PREFERENCE", "primary")
+
 # Version-history retention. Auto snapshots are disposable (throttled autosave
 # checkpoints); protected snapshots are the ones the user or a destructive load
-# created and must not be evicted by auto churn. See save_version / _prune_versions.
+# created and must not be evicted by auto churn. See save_version.
 AUTO_VERSION_CAP = 30
 PROTECTED_VERSION_CAP = 50
+# Most versions one write may evict (only more than one after a cap is lowered).
+PRUNE_BATCH = 100
+# Versions are stored as reverse deltas (see save_version); every
+# VERSION_KEYFRAME_EVERY-th version in a bucket keeps its full snapshot so a
+# rebuild never applies more than VERSION_KEYFRAME_EVERY - 1 patches.
+VERSION_KEYFRAME_EVERY = 10
+# History listing page size (default and maximum).
+VERSION_PAGE_SIZE = 20
+VERSION_PAGE_MAX = 100
+# What list_versions / get_version can be asked to return; get_version also
+# takes "snapshot" and "snapshot.<key>" (one top-level resume field).
+VERSION_META_FIELDS = ("id", "source", "protected", "created_at")
+
+# Read-through cache for get_resume_entry / get_shared_entry. Per process:
+# writes through this process invalidate it at once; with several worker
+# processes, another worker's write is seen after at most the TTL.
+RESUME_CACHE_SIZE = int(os.getenv("RESUME_CACHE_SIZE", "1024"))
+RESUME_CACHE_TTL = float(os.getenv("RESUME_CACHE_TTL", "300"))
+
+# Every query in Database is served by one of these (see
+# tests/test_database.py::test_every_query_uses_an_index).
+INDEXES = {
+    "resumes": [
+        # One resume per account; every per-user lookup filters on email.
+        IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+        # Public shared resumes by token. Sparse so the many resumes without
+        # a token don't collide on a null value.
+        IndexModel([("share_token", ASCENDING)], name="share_token_1", unique=True, sparse=True),
+    ],
+    "resume_versions": [
+        # History listing (paged by created_at, then _id) and "latest version"
+        # lookups.
+        IndexModel(
+            [("email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="email_1_created_at_-1__id_-1",
+        ),
+        # Per-bucket head, pruning and delta chains (auto vs protected). Unique
+        # so two concurrent saves can't both become the head; versions written
+        # before delta storage have no seq and are left out.
+        IndexModel(
+            [("email", ASCENDING), ("protected", ASCENDING), ("seq", DESCENDING)],
+            name="email_1_protected_1_seq_-1",
+            unique=True,
+            partialFilterExpression={"seq": {"$exists": True}},
+        ),
+    ],
+    "share_artifacts": [
+        # Clearing a link's artifacts when it is regenerated or disabled.
+        # Serving them goes by _id ("{token}:{version}").
+        IndexModel([("token", ASCENDING)], name="token_1"),
+    ],
+}
+
+# Indexes earlier releases created that ``INDEXES`` has replaced. They'd
+# still cost every write, so ``ensure_indexes`` drops them.
+SUPERSEDED_INDEXES = {
+    "resume_versions": ["email_1_created_at_-1", "email_1_protected_1_created_at_-1"],
+}
+
+
+def _pack(value) -> bytes:
+    """Compressed JSON, as version snapshots and patches are stored."""
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+    return zlib.compress(data.encode("utf-8"), 6)
+
+
+def _unpack(data: bytes):
+    return json.loads(zlib.decompress(data))
+
+
+# Fields the server maintains on a resume document; a patch can't touch them.
+SERVER_KEYS = ("_id", "email", "rev", "last_updated", "share_token", "share_enabled", "share_artifact")
+# Left out of version snapshots and their dedupe hash.
+_SNAPSHOT_SKIP = ("_id", "email", "rev", "last_updated")
+
+
+class StaleRevisionError(Exception):
+    """The resume has changed since the revision a patch was made against."""
+
+    def __init__(self, rev: int):
+        super().__init__(f"Resume is at revision {rev}")
+        self.rev = rev
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class CachedDoc(NamedTuple):
+    """A serialized document and its strong ETag."""
+    body: bytes
+    etag: str
+
+
+class ReadCache:
+    """Serialized resumes (``resume:{email}``) and shared resumes
+    (``share:{token}``), invalidated per account.
+
+    ``invalidate`` bumps an epoch; a read that started before it doesn't
+    store what it read, so a save racing a cache miss can't leave the
+    pre-save document cached.
+    """
+
+    def __init__(self, max_items: int = RESUME_CACHE_SIZE, ttl: float = RESUME_CACHE_TTL):
+        self._lru = LRUCache(max_items=max_items, ttl=ttl)
+        self._tokens: dict[str, str] = {}  # email -> token cached under share:
+        self.epoch = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> CachedDoc | None:
+        return self._lru.get(key)
+
+    def put(self, key: str, doc: dict, epoch: int, email: str | None = None) -> CachedDoc:
+        body = json.dumps(doc, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+        entry = CachedDoc(body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+        if epoch == self.epoch:
+            self._lru.put(key, entry)
+            if email is not None:
+                self._tokens[email] = key.split(":", 1)[1]
+        return entry
+
+    def invalidate(self, email: str) -> None:
+        self.epoch += 1
+        self.invalidations += 1
+        self._lru.pop(f"resume:{email}")
+        token = self._tokens.pop(email, None)
+        if token is not None:
+            self._lru.pop(f"share:{token}")
+
+    def clear(self) -> None:
+        self._lru.clear()
+        self._tokens.clear()
+        self.epoch += 1
+
+    def stats(self) -> dict:
+        return {**self._lru.stats(), "invalidations": self.invalidations}
 
 
 class Database:
-    """Lazy MongoDB wrapper.
+    """Async MongoDB wrapper.
 
-    The connection is created on first use so the app can start (and serve
-    endpoints that don't touch the DB) even when MONGODB_URI is unset.
+    ``connect`` is called from the app's lifespan so the pool is warm before
+    the first request; if it wasn't (scripts, tests), the first query
+    connects. The app still starts, and serves endpoints that don't touch the
+    DB, when MONGODB_URI is unset.
     """
 
-    def __init__(self):
-        self._client: MongoClient | None = None
-        self._resumes: Collection | None = None
-
-    def _collection(self) -> Collection:
-        if self._resumes is None:
-            uri = os.getenv("MONGODB_URI")
-            if not uri:
-                raise RuntimeError("MONGODB_URI is not set. Add it to backend/.env.")
-            self._client = MongoClient(uri)
-            self._resumes = self._client.buildit.resumes
-            # Look up public shared resumes by token. Sparse so the many resumes
-            # without a token don't collide on a null value.
-            self._resumes.create_index("share_token", unique=True, sparse=True)
-        return self._resumes
+    def __init__(self, client: AsyncMongoClient | None = None, db_name: str = MONGODB_DB):
+        self._client = client
+        self._db_name = db_name
+        self._ready = False
+        self._caches: dict[str, AsyncCollection] = {}
+        self.index_errors: dict[str, str] = {}
+        self.read_cache = ReadCache()
+
+    def _make_client(self) -> AsyncMongoClient:
+        uri = os.getenv("MONGODB_URI")
+        if not uri:
+            raise RuntimeError("MONGODB_URI is not set. Add it to backend/.env.")
+        return AsyncMongoClient(
+            uri,
+            maxPoolSize=MONGODB_MAX_POOL_SIZE,
+            minPoolSize=MONGODB_MIN_POOL_SIZE,
+            serverSelectionTimeoutMS=MONGODB_TIMEOUT_MS,
+            connectTimeoutMS=MONGODB_TIMEOUT_MS,
+            timeoutMS=MONGODB_TIMEOUT_MS * 2,
+            readPreference=MONGODB_READ_PREFERENCE,
+        )
+
+    async def connect(self):
+        """Open the pool and ensure indexes. Safe to call more than once."""
+        if self._ready:
+            return
+        if self._client is None:
+            self._client = self._make_client()
+        await self._client.admin.command("ping")
+        await self.ensure_indexes()
+        self._ready = True
+
+    async def ensure_indexes(self) -> dict[str, str]:
+        """Create the ``INDEXES`` that don't exist yet (a no-op for those that
+        do) and drop the ``SUPERSEDED_INDEXES`` that still exist. An index
+        that can't be built or dropped — e.g. the unique email index over
+        existing duplicates — doesn't stop the app: its error is kept in
+        ``index_errors`` (and returned) so startup can report it."""
+        self.index_errors = {}
+        for collection, models in INDEXES.items():
+            for model in models:
+                try:
+                    await self._db()[collection].create_indexes([model])
+                except OperationFailure as e:
+                    self.index_errors[f"{collection}.{model.document['name']}"] = str(e)
+        for collection, names in SUPERSEDED_INDEXES.items():
+            existing = await self._db()[collection].index_information()
+            for name in names:
+                if name not in existing:
+                    continue
+                try:
+                    await self._db()[collection].drop_index(name)
+                except OperationFailure as e:
+                    self.index_errors[f"{collection}.{name}"] = str(e)
+        return self.index_errors
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+        self._client, self._ready = None, False
+        self._caches.clear()
+        self.read_cache.clear()
+
+    def _db(self):
+        return self._client[self._db_name]
+
+    async def _collection(self) -> AsyncCollection:
+        await self.connect()
+        return self._db().resumes
 
     def _convert_objectid(self, data):
         """Convert ObjectId to string in the document"""
@@ -57,101 +267,363 @@ class Database:
                     data[i] = self._convert_objectid(item)
         return data
 
-    def get_resume(self, email: str):
-        resume = self._collection().find_one({"email": email})
+    async def get_resume(self, email: str):
+        resume = await (await self._collection()).find_one({"email": email})
         if resume:
             return self._convert_objectid(resume)
         return None
 
-    def save_resume(self, email: str, resume_data: dict):
+    async def get_resume_entry(self, email: str) -> CachedDoc | None:
+        """``get_resume``, serialized, through the read cache."""
+        key = f"resume:{email}"
+        entry = self.read_cache.get(key)
+        if entry is None:
+            epoch = self.read_cache.epoch
+            resume = await self.get_resume(email)
+            entry = self.read_cache.put(key, resume, epoch) if resume else None
+        return entry
+
+    async def save_resume(self, email: str, resume_data: dict) -> int:
+        """Write the whole resume (last writer wins) and return its new
+        revision."""
         resume_data["last_updated"] = datetime.now()
         resume_data["email"] = email
         if "_id" in resume_data:
             del resume_data["_id"]
+        # Server-managed; a client echoing back what it loaded must not
+        # point the share link at an older artifact or set the revision.
+        resume_data.pop("share_artifact", None)
+        resume_data.pop("rev", None)
 
-        return self._collection().update_one(
-            {"email": email},
-            {"$set": resume_data},
-            upsert=True,
-        )
+        try:
+            doc = await (await self._collection()).find_one_and_update(
+                {"email": email},
+                {"$set": resume_data, "$inc": {"rev": 1}},
+                projection={"rev": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        finally:
+            self.read_cache.invalidate(email)
+        return doc["rev"]
+
+    @staticmethod
+    def _mongo_path(parts: list[str]) -> list[str]:
+        """``parts`` cut before the first key MongoDB can't address in a
+        dotted path (the caller then rewrites the whole container)."""
+        for i, part in enumerate(parts):
+            if not part or "." in part or part.startswith("$"):
+                return parts[:i]
+        return parts
+
+    async def patch_resume(self, email: str, rev: int, ops: list[dict] | None = None,
+                           changes: dict | None = None) -> int | None:
+        """Apply an edit to the stored resume if it is still at revision
+        ``rev``, and return the new revision (None if there's no resume).
+
+        ``ops`` are RFC 6902 operations; ``changes`` maps paths (JSON
+        pointers, or dotted like ``sections.0.title``) to new values, with
+        None removing the field. Both are applied to the fields they touch,
+        read from MongoDB, then written back as ``$set``/``$unset`` of just
+        the changed paths: the edited member itself, or the whole list when
+        an item is inserted, removed or moved. ``StaleRevisionError`` if the
+        resume moved on; ``jsonpatch.PatchError`` if the edit doesn't apply.
+        """
+        ops = list(ops or [])
+        pointers = {
+            (path if path.startswith("/") else jsonpatch.pointer(path.split("."))): value
+            for path, value in (changes or {}).items()
+        }
+        touched = [jsonpatch.tokens(p) for p in pointers]
+        for op in ops:
+            if not isinstance(op, dict) or not isinstance(op.get("path"), str):
+                raise jsonpatch.PatchError(f"Invalid operation {op!r}")
+            touched += [jsonpatch.tokens(op[key]) for key in ("path", "from") if isinstance(op.get(key), str)]
+        for parts in touched:
+            if not parts or parts[0] in SERVER_KEYS or not self._mongo_path(parts[:1]):
+                raise jsonpatch.PatchError(f"Can't patch {jsonpatch.pointer(parts) or 'the whole resume'}")
+
+        col = await self._collection()
+        projection = {parts[0]: 1 for parts in touched}
+        doc = await col.find_one({"email": email}, {**projection, "rev": 1})
+        if doc is None:
+            return None
+        current = doc.pop("rev", 0)
+        doc.pop("_id", None)
+        if current != rev:
+            raise StaleRevisionError(current)
+
+        for path, value in pointers.items():
+            if value is None:
+                try:
+                    jsonpatch.get(doc, path)
+                except jsonpatch.PatchError:
+                    continue  # already absent
+                ops.append({"op": "remove", "path": path})
+            else:
+                parts = jsonpatch.tokens(path)
+                try:
+                    in_list = isinstance(jsonpatch.get(doc, jsonpatch.pointer(parts[:-1])), list)
+                except jsonpatch.PatchError:
+                    in_list = False
+                ops.append({"op": "replace" if in_list else "add", "path": path, "value": value})
+
+        patched = jsonpatch.apply(doc, ops)
+
+        # Paths to write back: where each op landed, or the enclosing list
+        # for inserts/removals, minus any path inside another one.
+        writes = set()
+        for op in ops:
+            if op["op"] == "test":
+                continue
+            for key in ("path", "from") if op["op"] == "move" else ("path",):
+                parts = jsonpatch.tokens(op[key])
+                if op["op"] != "replace" or key == "from":
+                    try:
+                        if isinstance(jsonpatch.get(patched, jsonpatch.pointer(parts[:-1])), list):
+                            parts = parts[:-1]
+                    except jsonpatch.PatchError:
+                        pass  # the parent went too; an enclosing write covers it
+                writes.add(tuple(self._mongo_path(parts)))
+        kept = []
+        for w in sorted(writes, key=len):
+            if not any(w[:len(k)] == k for k in kept):
+                kept.append(w)
+
+        update = {"$set": {"last_updated": datetime.now()}, "$inc": {"rev": 1}}
+        for parts in kept:
+            try:
+                update["$set"][".".join(parts)] = jsonpatch.get(patched, jsonpatch.pointer(parts))
+            except jsonpatch.PatchError:
+                update.setdefault("$unset", {})[".".join(parts)] = ""
+        try:
+            result = await col.update_one(
+                {"email": email, "rev": rev if rev else {"$in": [0, None]}}, update
+            )
+        finally:
+            self.read_cache.invalidate(email)
+        if result.matched_count == 0:
+            latest = await col.find_one({"email": email}, {"rev": 1})
+            raise StaleRevisionError((latest or {}).get("rev", 0))
+        return rev + 1
+
+    def configured(self) -> bool:
+        """True when a MongoDB URI is available (optional tiers check this)."""
+        return self._client is not None or bool(os.getenv("MONGODB_URI"))
+
+    async def cache_collection(self, name: str, ttl_seconds: int) -> AsyncCollection:
+        """A cache collection whose documents expire ``ttl_seconds`` after
+        their ``created_at`` (MongoDB TTL index). Documents are keyed by
+        ``_id``; the index is ensured once per process."""
+        if name not in self._caches:
+            await self.connect()
+            col = self._db()[name]
+            try:
+                await col.create_index("created_at", expireAfterSeconds=int(ttl_seconds))
+            except OperationFailure:
+                # The TTL changed since the index was built; update it in place.
+                await self._db().command(
+                    "collMod", name,
+                    index={"keyPattern": {"created_at": 1}, "expireAfterSeconds": int(ttl_seconds)},
+                )
+            self._caches[name] = col
+        return self._caches[name]
 
     # ------------------------------------------------------------------ #
     # Version history
     # ------------------------------------------------------------------ #
 
-    def _versions(self) -> Collection:
-        self._collection()  # ensure the client is connected
-        return self._client.buildit.resume_versions
+    async def _versions(self) -> AsyncCollection:
+        await self.connect()
+        return self._db().resume_versions
 
     @staticmethod
     def _snapshot_hash(snapshot: dict) -> str:
-        clean = {k: v for k, v in (snapshot or {}).items()
-                 if k not in ("_id", "email", "last_updated")}
+        clean = {k: v for k, v in (snapshot or {}).items() if k not in _SNAPSHOT_SKIP}
         return hashlib.sha256(
             json.dumps(clean, sort_keys=True, default=str).encode("utf-8")
         ).hexdigest()
 
-    def save_version(self, email: str, snapshot: dict, source: str = "auto",
-                     protected: bool = False):
+    async def save_version(self, email: str, snapshot: dict, source: str = "auto",
+                           protected: bool = False):
         """Store a point-in-time copy of a resume. Skips writing when the
-        snapshot is identical to the most recent version (dedupe), then prunes
-        old versions so auto churn can never evict protected checkpoints."""
-        clean = {k: v for k, v in dict(snapshot or {}).items()
-                 if k not in ("_id", "email", "last_updated")}
+        snapshot is identical to the most recent version (dedupe), and prunes
+        the bucket it wrote to so auto churn can never evict protected
+        checkpoints.
+
+        Versions are reverse deltas within their bucket: the newest (the
+        head) holds the full snapshot, compressed; when a new head arrives,
+        the old one is rewritten as the patch that turns the new snapshot
+        back into it, unless its ``seq`` makes it a keyframe. Pruning drops
+        the oldest versions, which nothing depends on. ``get_version``
+        rebuilds from the nearest newer full snapshot.
+
+        Cost doesn't grow with history size: three concurrent, index-ordered
+        reads fetch the latest hash, the bucket head and the ids the insert
+        will push out of the bucket, then one ordered bulk write inserts the
+        version, turns the old head into a patch and deletes those ids. If a
+        concurrent save took the same ``seq`` first, the write stops at the
+        insert and is retried.
+        """
+        clean = {k: v for k, v in dict(snapshot or {}).items() if k not in _SNAPSHOT_SKIP}
         digest = self._snapshot_hash(clean)
+        protected = bool(protected)
+        for attempt in range(3):
+            try:
+                return await self._write_version(email, clean, digest, source, protected)
+            except BulkWriteError as e:
+                duplicate = all(err.get("code") == 11000 for err in e.details.get("writeErrors", []))
+                if not duplicate or attempt == 2:
+                    raise
 
-        col = self._versions()
-        latest = col.find_one({"email": email}, sort=[("created_at", -1)])
+    async def _write_version(self, email: str, clean: dict, digest: str, source: str,
+                             protected: bool):
+        cap = PROTECTED_VERSION_CAP if protected else AUTO_VERSION_CAP
+        col = await self._versions()
+        bucket = {"email": email, "protected": protected, "seq": {"$exists": True}}
+        # Each read is served, in order, by an index and only returns small
+        # fields; the one full snapshot fetched is the bucket head's.
+        latest, head, evict = await asyncio.gather(
+            col.find_one({"email": email}, {"hash": 1}, sort=[("created_at", -1), ("_id", -1)]),
+            col.find_one(bucket, {"seq": 1, "snapshot_z": 1}, sort=[("seq", -1)]),
+            # After the insert, everything from the cap-th newest on is extra.
+            col.find(bucket, {"_id": 1}).sort("seq", -1).skip(max(cap - 1, 0)).limit(PRUNE_BATCH)
+            .to_list(None),
+        )
         if latest and latest.get("hash") == digest:
             return None  # identical to the last version — nothing to store
 
-        result = col.insert_one({
+        evict = [d["_id"] for d in evict]
+        head_seq = head["seq"] if head else 0
+        if head_seq < cap:
+            # Versions from before delta storage (no seq) are older than every
+            # seq'd one and go first. While any are left, no seq'd version has
+            # been pruned, so the bucket holds head_seq seq'd versions. Once it
+            # reaches the cap they are all gone, so this read stops happening.
+            legacy = col.find(
+                {"email": email, "protected": protected, "seq": {"$exists": False}}, {"_id": 1},
+            ).sort([("created_at", -1), ("_id", -1)]).skip(max(cap - 1 - head_seq, 0)).limit(PRUNE_BATCH)
+            evict += [d["_id"] async for d in legacy]
+
+        seq = head_seq + 1
+        version_id = ObjectId()
+        ops = [InsertOne({
+            "_id": version_id,
             "email": email,
-            "snapshot": clean,
+            "snapshot_z": _pack(clean),
             "source": source,
-            "protected": bool(protected),
+            "protected": protected,
             "hash": digest,
+            "seq": seq,
             "created_at": datetime.now(),
-        })
-        self._prune_versions(email)
-        return str(result.inserted_id)
-
-    def _prune_versions(self, email: str):
-        col = self._versions()
-        for is_protected, cap in ((False, AUTO_VERSION_CAP), (True, PROTECTED_VERSION_CAP)):
-            extra = list(
-                col.find({"email": email, "protected": is_protected})
-                .sort("created_at", -1)
-                .skip(cap)
-            )
-            if extra:
-                col.delete_many({"_id": {"$in": [d["_id"] for d in extra]}})
+        })]
+        if head and "snapshot_z" in head and head["seq"] % VERSION_KEYFRAME_EVERY:
+            patch = jsonpatch.diff(clean, _unpack(head["snapshot_z"]))
+            ops.append(UpdateOne(
+                {"_id": head["_id"], "seq": head["seq"]},
+                {"$set": {"patch_z": _pack(patch)}, "$unset": {"snapshot_z": ""}},
+            ))
+        if evict:
+            ops.append(DeleteMany({"_id": {"$in": evict}}))
+        await col.bulk_write(ops, ordered=True)
+        return str(version_id)
+
+    async def _rebuild(self, col: AsyncCollection, doc: dict) -> dict:
+        """The full snapshot of version ``doc``."""
+        if "patch_z" not in doc:
+            return _unpack(doc["snapshot_z"]) if "snapshot_z" in doc else doc.get("snapshot", {})
+        newer = col.find(
+            {"email": doc["email"], "protected": doc["protected"], "seq": {"$gt": doc["seq"]}},
+            {"patch_z": 1, "snapshot_z": 1},
+        ).sort("seq", 1).limit(VERSION_KEYFRAME_EVERY)
+        chain = [doc]
+        async for d in newer:
+            if "patch_z" not in d:
+                snapshot = _unpack(d["snapshot_z"])
+                break
+            chain.append(d)
+        else:
+            raise RuntimeError(f"Version {doc['_id']} has no full snapshot to rebuild from")
+        for d in reversed(chain):
+            snapshot = jsonpatch.apply(snapshot, _unpack(d["patch_z"]))
+        return snapshot
 
     @staticmethod
-    def _version_meta(doc: dict) -> dict:
+    def _version_meta(doc: dict, fields=None) -> dict:
         created = doc.get("created_at")
-        return {
+        meta = {
             "id": str(doc["_id"]),
             "source": doc.get("source", "auto"),
             "protected": bool(doc.get("protected", False)),
             "created_at": created.isoformat() if created else None,
         }
+        return meta if fields is None else {k: v for k, v in meta.items() if k in fields}
 
-    def list_versions(self, email: str):
-        col = self._versions()
-        docs = col.find({"email": email}, {"snapshot": 0}).sort("created_at", -1)
-        return [self._version_meta(d) for d in docs]
+    @staticmethod
+    def _encode_cursor(doc: dict) -> str:
+        raw = f"{doc['created_at'].isoformat()}|{doc['_id']}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-    def get_version(self, email: str, version_id: str):
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+        """``ValueError`` for anything ``_encode_cursor`` didn't produce."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            created, oid = raw.split("|")
+            return datetime.fromisoformat(created), ObjectId(oid)
+        except Exception:
+            raise ValueError("Invalid cursor") from None
+
+    async def list_versions(self, email: str, limit: int = VERSION_PAGE_SIZE, cursor: str | None = None,
+                            source: str | None = None, protected: bool | None = None,
+                            fields=None) -> dict:
+        """One page of version metadata, newest first:
+        ``{"versions": [...], "next_cursor": str | None}``. Pass
+        ``next_cursor`` back as ``cursor`` for the following page; it stays
+        valid while versions are added or pruned. ``fields`` limits each
+        entry to those ``VERSION_META_FIELDS``."""
+        query = {"email": email}
+        if source is not None:
+            query["source"] = source
+        if protected is not None:
+            query["protected"] = bool(protected)
+        if cursor:
+            created, oid = self._decode_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": created}},
+                {"created_at": created, "_id": {"$lt": oid}},
+            ]
+        limit = max(1, min(int(limit), VERSION_PAGE_MAX))
+        col = await self._versions()
+        docs = await col.find(query, {"source": 1, "protected": 1, "created_at": 1}).sort(
+            [("created_at", -1), ("_id", -1)]
+        ).limit(limit + 1).to_list(limit + 1)
+        return {
+            "versions": [self._version_meta(d, fields) for d in docs[:limit]],
+            "next_cursor": self._encode_cursor(docs[limit - 1]) if len(docs) > limit else None,
+        }
+
+    async def get_version(self, email: str, version_id: str, fields=None):
+        """A version's metadata and snapshot. ``fields`` narrows that to the
+        named ``VERSION_META_FIELDS`` plus ``snapshot`` or individual
+        ``snapshot.<key>`` fields; without any of those the snapshot isn't
+        rebuilt at all."""
         try:
             oid = ObjectId(version_id)
         except Exception:
             return None
-        doc = self._versions().find_one({"_id": oid, "email": email})
+        col = await self._versions()
+        doc = await col.find_one({"_id": oid, "email": email})
         if not doc:
             return None
-        meta = self._version_meta(doc)
-        meta["snapshot"] = self._convert_objectid(doc.get("snapshot", {}))
+        meta = self._version_meta(doc, fields)
+        keys = None if fields is None or "snapshot" in fields else \
+            [f.split(".", 1)[1] for f in fields if f.startswith("snapshot.")]
+        if keys != []:
+            snapshot = await self._rebuild(col, doc)
+            if keys is not None:
+                snapshot = {k: snapshot[k] for k in keys if k in snapshot}
+            meta["snapshot"] = self._convert_objectid(snapshot)
         return meta
 
     # ------------------------------------------------------------------ #
@@ -159,46 +631,114 @@ class Database:
     # ------------------------------------------------------------------ #
 
     # Fields that must never leak on a publicly shared resume.
-    _PRIVATE_KEYS = ("_id", "email", "share_token", "share_enabled", "last_updated")
+    _PRIVATE_KEYS = ("_id", "email", "rev", "share_token", "share_enabled", "share_artifact", "last_updated")
 
-    def get_share_state(self, email: str):
+    async def get_share_state(self, email: str):
         """Return the current sharing state for a user's resume."""
-        doc = self._collection().find_one(
+        doc = await (await self._collection()).find_one(
             {"email": email}, {"share_token": 1, "share_enabled": 1}
         )
         if not doc:
             return {"token": None, "enabled": False}
         return {"token": doc.get("share_token"), "enabled": bool(doc.get("share_enabled", False))}
 
-    def set_share(self, email: str, enabled: bool = True, regenerate: bool = False):
+    async def set_share(self, email: str, enabled: bool = True, regenerate: bool = False):
         """Enable/disable public sharing for a user's resume. Mints a random
         token the first time it's enabled (or when regenerate is set, which
         invalidates any previously shared link). Returns None if no resume."""
-        col = self._collection()
-        doc = col.find_one({"email": email}, {"share_token": 1})
+        col = await self._collection()
+        doc = await col.find_one({"email": email}, {"share_token": 1})
         if not doc:
             return None
-        token = doc.get("share_token")
+        token = old_token = doc.get("share_token")
         if enabled and (regenerate or not token):
             token = secrets.token_urlsafe(9)
-        update = {"share_enabled": enabled}
+        update = {"$set": {"share_enabled": enabled}}
         if token:
-            update["share_token"] = token
-        col.update_one({"email": email}, {"$set": update})
+            update["$set"]["share_token"] = token
+        if old_token and (token != old_token or not enabled):
+            update["$unset"] = {"share_artifact": ""}
+        try:
+            await col.update_one({"email": email}, update)
+        finally:
+            self.read_cache.invalidate(email)
+        if "$unset" in update:
+            await (await self._artifacts()).delete_many({"token": old_token})
         return {"token": token, "enabled": enabled}
 
-    def get_shared_resume(self, token: str):
-        """Look up a resume by its public token. Returns None if the token is
-        unknown or sharing is disabled. Strips account-private fields."""
-        if not token:
-            return None
-        doc = self._collection().find_one({"share_token": token, "share_enabled": True})
-        if not doc:
+    async def _artifacts(self) -> AsyncCollection:
+        await self.connect()
+        return self._db().share_artifacts
+
+    async def _shared(self, query: dict):
+        """``(email, token, public document)`` for the live shared resume
+        matching ``query``, else None. The current artifact version, if
+        any, is the document's ``artifact``."""
+        doc = await (await self._collection()).find_one({**query, "share_enabled": True})
+        if not doc or not doc.get("share_token"):
             return None
         doc = self._convert_objectid(doc)
+        email, token, artifact = doc.get("email"), doc.get("share_token"), doc.get("share_artifact")
         for key in self._PRIVATE_KEYS:
             doc.pop(key, None)
-        return doc
+        if artifact:
+            doc["artifact"] = artifact
+        return email, token, doc
+
+    async def share_source(self, email: str):
+        """``(token, public document)`` if ``email``'s resume is shared."""
+        shared = await self._shared({"email": email})
+        return shared[1:] if shared else None
+
+    async def get_shared_resume(self, token: str):
+        """Look up a resume by its public token. Returns None if the token is
+        unknown or sharing is disabled. Strips account-private fields."""
+        shared = await self._shared({"share_token": token}) if token else None
+        return shared[2] if shared else None
+
+    async def get_shared_entry(self, token: str) -> CachedDoc | None:
+        """``get_shared_resume``, serialized, through the read cache."""
+        key = f"share:{token}"
+        entry = self.read_cache.get(key)
+        if entry is None:
+            epoch = self.read_cache.epoch
+            shared = await self._shared({"share_token": token}) if token else None
+            entry = self.read_cache.put(key, shared[2], epoch, email=shared[0]) if shared else None
+        return entry
+
+    async def put_share_artifact(self, email: str, token: str, version: str, artifacts: dict[str, bytes]) -> bool:
+        """Store pre-rendered ``artifacts`` (``{"html": ..., "pdf": ...}``)
+        for ``token`` and make ``version`` the current one. False (and
+        nothing kept) if the link was disabled or regenerated meanwhile.
+        The previous version is kept for visitors still loading it; older
+        ones are deleted."""
+        artifacts_col = await self._artifacts()
+        artifact_id = f"{token}:{version}"
+        await artifacts_col.replace_one(
+            {"_id": artifact_id},
+            {"token": token, "version": version, **artifacts, "created_at": datetime.now()},
+            upsert=True,
+        )
+        try:
+            before = await (await self._collection()).find_one_and_update(
+                {"email": email, "share_token": token, "share_enabled": True},
+                {"$set": {"share_artifact": version}},
+                projection={"share_artifact": 1},
+            )
+        finally:
+            self.read_cache.invalidate(email)
+        if before is None:
+            await artifacts_col.delete_one({"_id": artifact_id})
+            return False
+        keep = [artifact_id, f"{token}:{before.get('share_artifact')}"]
+        await artifacts_col.delete_many({"token": token, "_id": {"$nin": keep}})
+        return True
+
+    async def get_share_artifact(self, token: str, version: str, kind: str) -> bytes | None:
+        """One stored artifact (``kind`` is ``html`` or ``pdf``): a single
+        ``_id`` lookup returning just that field."""
+        doc = await (await self._artifacts()).find_one({"_id": f"{token}:{version}"}, {kind: 1})
+        return doc.get(kind) if doc else None
 
 
 db = Database()
@@ -0,0 +1,191 @@
+"""Structural JSON diff and RFC 6902 JSON Patch application.
+
+``diff(a, b)`` returns a list of ``add`` / ``remove`` / ``replace``
+operations that turn ``a`` into ``b``; ``apply(doc, ops)`` applies any
+RFC 6902 operation list (``add``, ``remove``, ``replace``, ``move``,
+``copy``, ``test``) to a copy of ``doc``.
+
+Lists are diffed by trimming their common prefix and suffix and pairing the
+rest up by position, so the usual resume edits (typing in a bullet, adding
+or removing one bullet or section) produce a handful of small operations
+rather than a rewrite of everything after the edit.
+"""
+import copy
+
+
+class PatchError(ValueError):
+    """An operation list that can't be applied to the document."""
+
+
+def _escape(token) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def pointer(tokens) -> str:
+    """The JSON pointer for a sequence of keys/indices."""
+    return "".join(f"/{_escape(t)}" for t in tokens)
+
+
+def tokens(pointer: str) -> list[str]:
+    """The unescaped reference tokens of a JSON pointer."""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer {pointer!r}")
+    return [t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/")]
+
+
+def equal(a, b) -> bool:
+    """JSON equality: like ``==``, but ``True`` isn't ``1`` and ``1.0`` isn't ``1``."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(equal(v, b[k]) for k, v in a.items())
+    if isinstance(a, list):
+        return len(a) == len(b) and all(equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def diff(src, dst, path: str = "") -> list[dict]:
+    """Operations that turn ``src`` into ``dst``."""
+    if equal(src, dst):
+        return []
+    if isinstance(src, dict) and isinstance(dst, dict):
+        ops = []
+        for key in src:
+            if key not in dst:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in dst.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in src:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops += diff(src[key], value, child)
+        return ops
+    if isinstance(src, list) and isinstance(dst, list):
+        return _diff_list(src, dst, path)
+    return [{"op": "replace", "path": path, "value": dst}]
+
+
+def _diff_list(src: list, dst: list, path: str) -> list[dict]:
+    start = 0
+    while start < len(src) and start < len(dst) and equal(src[start], dst[start]):
+        start += 1
+    end_src, end_dst = len(src), len(dst)
+    while end_src > start and end_dst > start and equal(src[end_src - 1], dst[end_dst - 1]):
+        end_src, end_dst = end_src - 1, end_dst - 1
+    middle_src, middle_dst = src[start:end_src], dst[start:end_dst]
+
+    ops = []
+    paired = min(len(middle_src), len(middle_dst))
+    for i in range(paired):
+        ops += diff(middle_src[i], middle_dst[i], f"{path}/{start + i}")
+    at = start + paired
+    for value in middle_dst[paired:]:
+        ops.append({"op": "add", "path": f"{path}/{at}", "value": value})
+        at += 1
+    for _ in middle_src[paired:]:
+        ops.append({"op": "remove", "path": f"{path}/{at}"})
+    return ops
+
+
+def _parent(doc, pointer: str):
+    parts = tokens(pointer)
+    if not parts:
+        raise PatchError("An operation on the whole document needs a non-empty path")
+    node = doc
+    for token in parts[:-1]:
+        node = _child(node, token, pointer)
+    return node, parts[-1]
+
+
+def _index(container: list, token: str, pointer: str, allow_end: bool = False) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not (token.isascii() and token.isdigit()) or (len(token) > 1 and token.startswith("0")):
+        raise PatchError(f"Invalid list index in {pointer!r}")
+    i = int(token)
+    if i > len(container) or (i == len(container) and not allow_end):
+        raise PatchError(f"List index out of range in {pointer!r}")
+    return i
+
+
+def _child(node, token: str, pointer: str):
+    if isinstance(node, dict):
+        if token not in node:
+            raise PatchError(f"Path {pointer!r} does not exist")
+        return node[token]
+    if isinstance(node, list):
+        return node[_index(node, token, pointer)]
+    raise PatchError(f"Path {pointer!r} does not exist")
+
+
+def get(doc, pointer: str):
+    """The value at ``pointer``; ``PatchError`` if there is none."""
+    node = doc
+    for token in tokens(pointer):
+        node = _child(node, token, pointer)
+    return node
+
+
+def _add(doc, pointer: str, value):
+    if pointer == "":
+        return value
+    parent, token = _parent(doc, pointer)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, token, pointer, allow_end=True), value)
+    else:
+        raise PatchError(f"Path {pointer!r} does not exist")
+    return doc
+
+
+def _remove(doc, pointer: str):
+    parent, token = _parent(doc, pointer)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"Path {pointer!r} does not exist")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, token, pointer))
+    raise PatchError(f"Path {pointer!r} does not exist")
+
+
+def apply(doc, ops: list[dict]):
+    """Apply RFC 6902 ``ops`` to a copy of ``doc`` and return the result."""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        if not isinstance(op, dict) or "path" not in op:
+            raise PatchError(f"Invalid operation {op!r}")
+        kind, path = op.get("op"), op["path"]
+        if kind in ("add", "replace", "test") and "value" not in op:
+            raise PatchError(f"{kind!r} needs a value")
+        if kind == "add":
+            doc = _add(doc, path, copy.deepcopy(op["value"]))
+        elif kind == "remove":
+            _remove(doc, path)
+        elif kind == "replace":
+            if path == "":
+                doc = copy.deepcopy(op["value"])
+            else:
+                get(doc, path)  # must exist
+                parent, token = _parent(doc, path)
+                if isinstance(parent, list):
+                    parent[_index(parent, token, path)] = copy.deepcopy(op["value"])
+                else:
+                    parent[token] = copy.deepcopy(op["value"])
+        elif kind in ("move", "copy"):
+            source = op.get("from")
+            if source is None:
+                raise PatchError(f"{kind!r} needs a 'from' path")
+            if kind == "move" and (path + "/").startswith(source + "/") and path != source:
+                raise PatchError("Cannot move a value into one of its children")
+            value = _remove(doc, source) if kind == "move" else copy.deepcopy(get(doc, source))
+            doc = _add(doc, path, value)
+        elif kind == "test":
+            if not equal(get(doc, path), op["value"]):
+                raise PatchError(f"Test failed at {path!r}")
+        else:
+            raise PatchError(f"Unknown operation {kind!r}")
+    return doc
@@ -8,45 +8,95 @@ Each public call tries the configured providers in order and returns the
 first success. If Gemini fails (e.g. free-tier quota 429) and a
 ``GROQ_API_KEY`` is set, the call transparently falls back to Groq. Set
 only ``GROQ_API_KEY`` (and no ``GOOGLE_API_KEY``) to run on Groq alone.
+
+Calls go through the providers' async clients over pooled keep-alive
+connections, so a several-second generation doesn't block the event loop. Each provider attempt has a deadline
+(``LLM_TIMEOUT``), and passing the route's ``request`` cancels the call as
+soon as the HTTP client disconnects. Answers are cached (see
+``ResponseCache``); pass ``cache=False`` to force a fresh generation.
 """
+import asyncio
+import hashlib
 import json
 import os
+import re
+import time
+from datetime import datetime, timezone
 
+import httpx
 from google import genai
 from google.genai import types
 
+from app.cache import LRUCache
+
 GEMINI_MODEL = "gemini-flash-latest"
 # Groq model is env-overridable so it can be updated without a code change.
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+# Per-attempt deadline in seconds, and the keep-alive pool size per provider.
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+# How often a waiting call checks whether its HTTP client has gone away.
+DISCONNECT_POLL_SECONDS = 0.5
 
 _JSON_SYSTEM = (
     "You are a precise assistant. Respond with a single valid JSON object and nothing else."
 )
 
 _gemini_client: "genai.Client | None" = None
-_groq_client = None
+_async_groq_client = None
+
+
+class ClientDisconnected(RuntimeError):
+    """The HTTP client went away before the model answered."""
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+        keepalive_expiry=60,
+    )
 
 
 def _get_gemini() -> genai.Client:
+    """Gemini client; ``.aio`` on it is the async client sharing its config."""
     global _gemini_client
     if _gemini_client is None:
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
             raise RuntimeError("GOOGLE_API_KEY is not set.")
-        _gemini_client = genai.Client(api_key=api_key)
+        _gemini_client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                timeout=int(LLM_TIMEOUT * 1000),
+                async_client_args={"limits": _pool_limits()},
+            ),
+        )
     return _gemini_client
 
 
-def _get_groq():
-    global _groq_client
-    if _groq_client is None:
+def _get_async_groq():
+    global _async_groq_client
+    if _async_groq_client is None:
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             raise RuntimeError("GROQ_API_KEY is not set.")
-        from groq import Groq
+        from groq import AsyncGroq
+
+        _async_groq_client = AsyncGroq(
+            api_key=api_key,
+            timeout=LLM_TIMEOUT,
+            http_client=httpx.AsyncClient(limits=_pool_limits(), timeout=LLM_TIMEOUT),
+        )
+    return _async_groq_client
 
-        _groq_client = Groq(api_key=api_key)
-    return _groq_client
+
+async def aclose():
+    """Close pooled async connections (called on app shutdown)."""
+    global _async_groq_client
+    if _async_groq_client is not None:
+        await _async_groq_client.close()
+        _async_groq_client = None
 
 
 def _extract_json(raw: str) -> dict:
@@ -76,13 +126,13 @@ def _extract_json(raw: str) -> dict:
 # --- Provider implementations (each returns raw text) ---
 
 
-def _gemini_text(prompt: str) -> str:
-    response = _get_gemini().models.generate_content(model=GEMINI_MODEL, contents=prompt)
+async def _gemini_text_async(prompt: str) -> str:
+    response = await _get_gemini().aio.models.generate_content(model=GEMINI_MODEL, contents=prompt)
     return response.text or ""
 
 
-def _gemini_json(prompt: str) -> str:
-    response = _get_gemini().models.generate_content(
+async def _gemini_json_async(prompt: str) -> str:
+    response = await _get_gemini().aio.models.generate_content(
         model=GEMINI_MODEL,
         contents=prompt,
         config=types.GenerateContentConfig(response_mime_type="application/json"),
@@ -90,16 +140,16 @@ def _gemini_json(prompt: str) -> str:
     return response.text or ""
 
 
-def _groq_text(prompt: str) -> str:
-    resp = _get_groq().chat.completions.create(
+async def _groq_text_async(prompt: str) -> str:
+    resp = await _get_async_groq().chat.completions.create(
         model=GROQ_MODEL,
         messages=[{"role": "user", "content": prompt}],
     )
     return resp.choices[0].message.content or ""
 
 
-def _groq_json(prompt: str) -> str:
-    resp = _get_groq().chat.completions.create(
+async def _groq_json_async(prompt: str) -> str:
+    resp = await _get_async_groq().chat.completions.create(
         model=GROQ_MODEL,
         messages=[
             {"role": "system", "content": _JSON_SYSTEM},
@@ -110,13 +160,48 @@ def _groq_json(prompt: str) -> str:
     return resp.choices[0].message.content or ""
 
 
+async def _gemini_text_stream(prompt: str):
+    stream = await _get_gemini().aio.models.generate_content_stream(
+        model=GEMINI_MODEL, contents=prompt
+    )
+    async for chunk in stream:
+        if chunk.text:
+            yield chunk.text
+
+
+async def _groq_text_stream(prompt: str):
+    stream = await _get_async_groq().chat.completions.create(
+        model=GROQ_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+_IMPLEMENTATIONS = {
+    "Gemini": {
+        "text_async": _gemini_text_async, "json_async": _gemini_json_async,
+        "text_stream": _gemini_text_stream,
+    },
+    "Groq": {
+        "text_async": _groq_text_async, "json_async": _groq_json_async,
+        "text_stream": _groq_text_stream,
+    },
+}
+
+
 def _providers(text_fn: str):
-    """Yield (name, fn) for each configured provider, Gemini first."""
+    """Yield (name, fn) for each configured provider, Gemini first.
+
+    ``text_fn`` is one of "text_async", "json_async", "text_stream".
+    """
     providers = []
     if os.getenv("GOOGLE_API_KEY"):
-        providers.append(("Gemini", _gemini_text if text_fn == "text" else _gemini_json))
+        providers.append(("Gemini", _IMPLEMENTATIONS["Gemini"][text_fn]))
     if os.getenv("GROQ_API_KEY"):
-        providers.append(("Groq", _groq_text if text_fn == "text" else _groq_json))
+        providers.append(("Groq", _IMPLEMENTATIONS["Groq"][text_fn]))
     if not providers:
         raise RuntimeError(
             "No LLM provider configured. Set GOOGLE_API_KEY and/or GROQ_API_KEY in backend/.env."
@@ -124,27 +209,339 @@ def _providers(text_fn: str):
     return providers
 
 
-def generate_text(prompt: str) -> str:
-    """Return the model's plain-text response, trying each provider in turn."""
+# --- Provider circuit breakers ---
+#
+# When Gemini's quota runs out, trying it first on every call just adds a
+# failed round trip before the Groq fallback. Each provider gets a breaker:
+# after LLM_BREAKER_THRESHOLD consecutive failures (or at once, when the
+# provider sends Retry-After) it is skipped for a cooldown, then a single
+# half-open probe decides whether it comes back.
+
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "3"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "60"))
+_MAX_RETRY_AFTER = 3600.0
+
+
+def _retry_after(exc: Exception) -> float | None:
+    """Seconds the provider asked us to wait, if it said (header or body)."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            value = headers.get("retry-after")
+            if value is not None:
+                return min(float(value), _MAX_RETRY_AFTER)
+        except (TypeError, ValueError):
+            pass
+    # Gemini puts it in the error body: {"@type": ".../RetryInfo", "retryDelay": "37s"}
+    details = getattr(exc, "details", None)
+    if details:
+        match = re.search(r'"retryDelay":\s*"(\d+(?:\.\d+)?)s"', json.dumps(details, default=str))
+        if match:
+            return min(float(match.group(1)), _MAX_RETRY_AFTER)
+    return None
+
+
+class CircuitBreaker:
+    """closed -> open (skip) -> half_open (one probe) -> closed or open again."""
+
+    def __init__(self, threshold: int = LLM_BREAKER_THRESHOLD, cooldown: float = LLM_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.last_error: str | None = None
+
+    def allow(self) -> bool:
+        """Whether a call may go to this provider now. In half-open state
+        only one caller (the probe) gets True until it reports back."""
+        if self.state == "open":
+            if time.monotonic() < self.open_until:
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self.probing:
+                return False
+            self.probing = True
+        return True
+
+    def success(self):
+        self.state = "closed"
+        self.failures = 0
+        self.probing = False
+
+    def failure(self, exc: Exception):
+        self.failures += 1
+        self.last_error = str(exc)[:200]
+        self.probing = False
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            self._trip(retry_after)
+        elif self.state == "half_open" or self.failures >= self.threshold:
+            self._trip(self.cooldown)
+
+    def release(self):
+        """The call was abandoned (client left) without a verdict."""
+        self.probing = False
+
+    def _trip(self, seconds: float):
+        self.state = "open"
+        self.open_until = time.monotonic() + seconds
+        self.trips += 1
+
+    def stats(self) -> dict:
+        retry_in = max(0.0, self.open_until - time.monotonic()) if self.state == "open" else 0.0
+        return {
+            "state": "half_open" if self.state == "open" and not retry_in else self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "retry_in_seconds": round(retry_in, 1),
+            "last_error": self.last_error,
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def _breaker(name: str) -> CircuitBreaker:
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker()
+    return _breakers[name]
+
+
+def breaker_stats() -> dict:
+    """Breaker state per provider that has been called in this process."""
+    return {name: b.stats() for name, b in _breakers.items()}
+
+
+def _skipped(name: str) -> str:
+    b = _breaker(name)
+    return f"{name}: skipped, cooling down for {b.stats()['retry_in_seconds']:g}s after: {b.last_error}"
+
+
+# --- Response cache ---
+#
+# Users click "improve" on the same bullet, or "rewrite" with the same JD,
+# over and over. Answers are cached per provider/model and normalized prompt:
+# an in-memory LRU, plus (LLM_CACHE_PERSIST=1) a MongoDB collection whose TTL
+# index expires entries after LLM_CACHE_TTL seconds.
+
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "").lower() in ("1", "true", "yes")
+
+_MODELS = {"Gemini": GEMINI_MODEL, "Groq": GROQ_MODEL}
+
+
+def _cache_key(provider: str, kind: str, prompt: str) -> str:
+    normalized = " ".join(prompt.split())
+    raw = f"{provider}|{_MODELS.get(provider, '')}|{kind}|{normalized}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache of raw model responses. The persistent tier is best
+    effort: any MongoDB error just means a miss (or an unsaved entry)."""
+
+    def __init__(self, size: int = LLM_CACHE_SIZE, ttl: int = LLM_CACHE_TTL,
+                 persist: bool = LLM_CACHE_PERSIST):
+        self.memory = LRUCache(max_items=size, ttl=ttl)
+        self.ttl = ttl
+        self.persist = persist
+        self.persistent_hits = 0
+        self.persistent_errors = 0
+
+    async def _collection(self):
+        from app.database import db
+
+        return await db.cache_collection("llm_cache", self.ttl)
+
+    async def get(self, keys: list[str]) -> str | None:
+        """First cached answer for ``keys`` (one per provider, in order)."""
+        for key in keys:
+            value = self.memory.get(key)
+            if value is not None:
+                return value
+        if not (self.persist and keys):
+            return None
+        try:
+            col = await self._collection()
+            docs = {d["_id"]: d["response"] async for d in col.find({"_id": {"$in": keys}})}
+        except Exception:  # noqa: BLE001 - persistent tier is optional
+            self.persistent_errors += 1
+            return None
+        for key in keys:
+            if key in docs:
+                self.persistent_hits += 1
+                self.memory.put(key, docs[key])
+                return docs[key]
+        return None
+
+    async def put(self, key: str, response: str) -> None:
+        self.memory.put(key, response)
+        if not self.persist:
+            return
+        try:
+            doc = {"_id": key, "response": response, "created_at": datetime.now(timezone.utc)}
+            await (await self._collection()).replace_one({"_id": key}, doc, upsert=True)
+        except Exception:  # noqa: BLE001
+            self.persistent_errors += 1
+
+    def stats(self) -> dict:
+        return {
+            **self.memory.stats(),
+            "persistent": self.persist,
+            "persistent_hits": self.persistent_hits,
+            "persistent_errors": self.persistent_errors,
+        }
+
+
+response_cache = ResponseCache()
+
+
+async def _until_disconnect(request, coro):
+    """Await ``coro``, cancelling it if ``request``'s client disconnects first."""
+    if request is None:
+        return await coro
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected("Client disconnected before the model answered.")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def _attempt(fn, prompt: str, timeout: float | None, request):
+    try:
+        return await _until_disconnect(request, asyncio.wait_for(fn(prompt), timeout or LLM_TIMEOUT))
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"no response within {timeout or LLM_TIMEOUT:g}s")
+
+
+async def _generate_async(kind: str, prompt: str, parse, timeout, request, cache: bool):
+    """Shared provider loop for the async API, with the response cache.
+
+    ``parse`` turns raw model text into the return value; a parse failure
+    falls back to the next provider (without counting against the breaker).
+    Only raw text that parsed is cached, and every hit is parsed afresh so
+    callers can mutate what they get.
+    """
+    providers = _providers(kind + "_async")
+    keys = [_cache_key(name, kind, prompt) for name, _ in providers]
+    if cache:
+        cached = await response_cache.get(keys)
+        if cached is not None:
+            return parse(cached)
+
     errors = []
-    for name, fn in _providers("text"):
+    for (name, fn), key in zip(providers, keys):
+        breaker = _breaker(name)
+        if not breaker.allow():
+            errors.append(_skipped(name))
+            continue
         try:
-            return (fn(prompt) or "").strip()
+            raw = (await _attempt(fn, prompt, timeout, request)) or ""
+        except (ClientDisconnected, asyncio.CancelledError):
+            breaker.release()
+            raise
         except Exception as e:  # noqa: BLE001 - fall back to the next provider
+            breaker.failure(e)
+            errors.append(f"{name}: {e}")
+            continue
+        breaker.success()
+        try:
+            result = parse(raw)
+        except Exception as e:  # noqa: BLE001
             errors.append(f"{name}: {e}")
+            continue
+        await response_cache.put(key, raw)
+        return result
     raise RuntimeError("All LLM providers failed. " + " | ".join(errors))
 
 
-def generate_json(prompt: str) -> dict:
-    """Return the model's response parsed as a JSON object, with fallback.
+async def generate_text_async(prompt: str, *, timeout: float | None = None, request=None,
+                              cache: bool = True) -> str:
+    """Async ``generate_text``: each provider attempt gets ``timeout`` seconds
+    (default ``LLM_TIMEOUT``); pass the route's ``request`` to cancel the call
+    when the client disconnects. ``cache=False`` skips the cached answer (a
+    "regenerate") but still stores the fresh one."""
+    return await _generate_async("text", prompt, str.strip, timeout, request, cache)
+
+
+async def generate_json_async(prompt: str, *, timeout: float | None = None, request=None,
+                              cache: bool = True) -> dict:
+    """Async ``generate_json``; see ``generate_text_async`` for the options."""
+    return await _generate_async("json", prompt, _extract_json, timeout, request, cache)
 
-    Requests JSON output mode from each provider so the payload is far less
-    likely to be wrapped in prose, then parses defensively.
+
+async def stream_text(prompt: str, *, timeout: float | None = None, cache: bool = True):
+    """Async generator of text chunks as the model produces them.
+
+    Falls back to the next provider only if the current one fails before
+    emitting anything; once text has gone out, a failure is raised to the
+    consumer. ``timeout`` bounds the wait for each chunk. A completed,
+    non-empty stream is cached like ``generate_text_async`` (same key), so a
+    cached letter is yielded in one piece.
     """
+    providers = _providers("text_stream")
+    keys = [_cache_key(name, "text", prompt) for name, _ in providers]
+    if cache:
+        cached = await response_cache.get(keys)
+        if cached is not None:
+            yield cached.strip()
+            return
+
+    limit = timeout or LLM_TIMEOUT
     errors = []
-    for name, fn in _providers("json"):
+    for (name, fn), key in zip(providers, keys):
+        breaker = _breaker(name)
+        if not breaker.allow():
+            errors.append(_skipped(name))
+            continue
+        chunks = []
+        stream = fn(prompt)
         try:
-            return _extract_json(fn(prompt))
-        except Exception as e:  # noqa: BLE001 - fall back to the next provider
+            try:
+                first = await asyncio.wait_for(anext(stream), limit)
+            except StopAsyncIteration:
+                first = ""
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"no response within {limit:g}s")
+        except asyncio.CancelledError:
+            breaker.release()
+            await stream.aclose()
+            raise
+        except Exception as e:  # noqa: BLE001 - nothing sent yet; try the next provider
+            breaker.failure(e)
             errors.append(f"{name}: {e}")
+            await stream.aclose()
+            continue
+        breaker.success()
+
+        try:
+            if first:
+                chunks.append(first)
+                yield first
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(stream), limit)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise RuntimeError(f"{name}: stream stalled for {limit:g}s")
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+        text = "".join(chunks)
+        if text.strip():  # an empty completion isn't worth replaying
+            await response_cache.put(key, text)
+        return
     raise RuntimeError("All LLM providers failed. " + " | ".join(errors))
@@ -1,6 +1,8 @@
+import logging
 import os
 import platform
 import time
+from contextlib import asynccontextmanager
 
 import psutil
 from dotenv import load_dotenv
@@ -11,10 +13,33 @@ from fastapi.responses import HTMLResponse
 from app.api.routes import (ats_check, cover_letter, docx_export,
                             improve_bullet, pdf, proofread, resume,
                             rewrite_resume, rewrite_section, share, versions)
+from app import llm, prompts, share_artifacts
+from app.pdf import render_cache, text_cache
+from app.database import db
+from app.workers import cpu_pool
 
 load_dotenv()
 
-app = FastAPI()
+logger = logging.getLogger("uvicorn.error")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if db.configured():
+        try:
+            await db.connect()
+        except Exception as e:  # noqa: BLE001 - serve non-DB endpoints anyway
+            logger.warning("MongoDB is not reachable at startup (%s); will retry on first use.", e)
+        for index, error in db.index_errors.items():
+            logger.warning("Could not build MongoDB index %s: %s", index, error)
+    yield
+    await share_artifacts.aclose()
+    cpu_pool.shutdown()
+    await llm.aclose()
+    await db.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow CORS for local development and deployed frontends
 app.add_middleware(
@@ -32,6 +57,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Unchanged-Sections", "X-Unresolved-Sections"],
 )
 
 # Include routers
@@ -56,7 +82,7 @@ async def wake():
 
 ENDPOINT_GROUPS = [
     ("Resume", [
-        ("POST", "/api/parse-resume", "Parse an uploaded PDF/DOCX into structured resume data"),
+        ("POST", "/api/parse-resume", "Parse an uploaded PDF/DOCX into structured resume data (?mode=auto|local|llm)"),
         ("GET", "/api/resume/{email}", "Fetch a saved resume"),
         ("POST", "/api/resume/{email}", "Save a resume"),
     ]),
@@ -64,9 +90,12 @@ ENDPOINT_GROUPS = [
         ("POST", "/api/rewrite-resume-ai", "Rewrite the whole resume for a job description"),
         ("POST", "/api/rewrite-section-ai", "Rewrite a single section"),
         ("POST", "/api/improve-bullet", "Improve one bullet point"),
+        ("POST", "/api/improve-bullets", "Improve many bullets in one request"),
         ("POST", "/api/generate-cover-letter-ai", "Draft a cover letter"),
+        ("POST", "/api/generate-cover-letter-ai/stream", "Draft a cover letter, streamed as server-sent events"),
         ("POST", "/api/proofread", "Find spelling and grammar issues"),
         ("POST", "/api/ats-check", "Score the generated PDF for ATS readability"),
+        ("POST", "/api/render-and-verify", "Render the PDF and its ATS report in one pass"),
     ]),
     ("Export", [
         ("POST", "/api/generate-pdf", "Render the resume HTML to PDF"),
@@ -157,6 +186,7 @@ async def root():
             <a href="/redoc">ReDoc</a>
             <a href="/health">Health</a>
             <a href="/info">Info</a>
+            <a href="/stats">Stats</a>
         </div>
         """ + groups + """
     </body>
@@ -170,6 +200,22 @@ async def health_check():
     return {"status": "healthy", "timestamp": time.time()}
 
 
+@app.get("/stats")
+async def stats():
+    """Return cache, worker-pool and AI-provider health counters for this process"""
+    return {
+        "cpu_pool": cpu_pool.stats(),
+        "render_cache": render_cache.stats(),
+        "text_cache": text_cache.stats(),
+        "parse_cache": resume.parse_cache.stats(),
+        "resume_cache": db.read_cache.stats(),
+        "share_artifacts": share_artifacts.stats(),
+        "llm_cache": llm.response_cache.stats(),
+        "llm_providers": llm.breaker_stats(),
+        "prompt_tokens": prompts.token_stats(),
+    }
+
+
 @app.get("/info")
 async def api_info():
     """Return information about the API and environment"""
@@ -0,0 +1,292 @@
+"""HTML -> PDF rendering with WeasyPrint.
+
+``render_pdf`` runs inside the CPU worker pool (see ``app.workers``), so it
+takes and returns plain picklable values.
+
+Rendered PDFs are content-addressed: the cache key is a hash of the HTML plus
+every option that affects layout, so the preview, the export and the ATS
+check of the same resume share one WeasyPrint run. The in-memory tier is an
+LRU bounded by bytes; set ``RENDER_CACHE_DIR`` to add an on-disk tier that
+survives restarts.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from io import BytesIO
+
+from pydantic import BaseModel
+from weasyprint import CSS, HTML
+
+from app.cache import LRUCache
+from app.text_extraction import extract_pdf_text
+from app.workers import run_cpu
+
+RENDER_CACHE_BYTES = int(os.getenv("RENDER_CACHE_BYTES", str(64 * 1024 * 1024)))
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR") or None
+RENDER_CACHE_DISK_BYTES = int(os.getenv("RENDER_CACHE_DISK_BYTES", str(512 * 1024 * 1024)))
+
+
+class PDFRequest(BaseModel):
+    html: str
+    margins: dict = {"top": "8mm", "right": "8mm", "bottom": "8mm", "left": "8mm"}
+    scale: float = 1.0
+    page_size: str = "A4"
+    zoom: float = 1.0
+    spacing: float = 1.0
+
+
+def page_css(req: PDFRequest) -> str:
+    """Stylesheet carrying the user's page settings (margins, size, zoom...)."""
+    top = req.margins.get("top", "8mm")
+    right = req.margins.get("right", "8mm")
+    bottom = req.margins.get("bottom", "8mm")
+    left = req.margins.get("left", "8mm")
+    # Continuation pages get a top margin (matched to the bottom margin) so the
+    # content doesn't butt against the top edge and looks intentional. The first
+    # page keeps the user's configured top margin (often 0mm) so the name/header
+    # stays where they placed it.
+    return f"""
+        .resume-container {{
+            margin: 0 !important;
+            padding: 0 !important;
+        }}
+
+        h1 {{
+            margin: 0 !important;
+        }}
+
+        @page {{
+            size: {req.page_size};
+            margin: {bottom} {right} {bottom} {left};
+        }}
+        @page :first {{
+            margin-top: {top};
+        }}
+        body {{
+            zoom: {req.zoom};
+            line-height: {req.spacing};
+            transform: scale({req.scale});
+            transform-origin: top left;
+        }}
+        """
+
+
+def render_pdf(html: str, css: str | None = None) -> bytes:
+    """Render HTML to PDF bytes. With ``css``, applies it on top of the
+    document's own styles (presentational hints on, as for export)."""
+    buf = BytesIO()
+    try:
+        if css:
+            HTML(string=html).write_pdf(
+                buf,
+                presentational_hints=True,
+                stylesheets=[CSS(string=css)],
+            )
+        else:
+            HTML(string=html).write_pdf(buf)
+        return buf.getvalue()
+    finally:
+        buf.close()
+
+
+def render_key(req: PDFRequest) -> str:
+    """Content hash of the HTML plus every layout-affecting option.
+
+    Only ``PDFRequest`` fields count, so subclasses (the ATS check) that add
+    non-rendering fields share keys with plain exports.
+    """
+    options = req.model_dump(include=set(PDFRequest.model_fields))
+    payload = json.dumps(options, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _DiskTier:
+    """One file per key under ``root``, evicted oldest-first past ``max_bytes``.
+
+    Reads touch the file's mtime so eviction order approximates LRU.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._bytes: int | None = None  # lazily measured on first write
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".pdf")
+
+    def _files(self):
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # atomic: readers never see a partial PDF
+        if self._bytes is None:
+            self._bytes = sum(size for _, size, _ in self._files())
+        else:
+            self._bytes += len(data)
+        if self._bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        files = sorted(self._files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9  # leave headroom so we don't evict on every write
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._bytes = total
+
+
+class RenderCache:
+    """Two-tier cache of rendered PDFs keyed by ``render_key``."""
+
+    def __init__(self, max_bytes: int = RENDER_CACHE_BYTES, disk_dir: str | None = RENDER_CACHE_DIR,
+                 disk_max_bytes: int = RENDER_CACHE_DISK_BYTES):
+        self.memory = LRUCache(max_bytes=max_bytes)
+        self.disk = _DiskTier(disk_dir, disk_max_bytes) if disk_dir else None
+        self.disk_hits = 0
+        self.renders = 0
+
+    async def get(self, key: str) -> bytes | None:
+        data = self.memory.get(key)
+        if data is None and self.disk is not None:
+            data = await asyncio.to_thread(self.disk.get, key)
+            if data is not None:
+                self.disk_hits += 1
+                self.memory.put(key, data)
+        return data
+
+    async def put(self, key: str, data: bytes) -> None:
+        self.memory.put(key, data)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, key, data)
+
+    def stats(self) -> dict:
+        return {
+            **self.memory.stats(),
+            "disk_enabled": self.disk is not None,
+            "disk_hits": self.disk_hits,
+            "renders": self.renders,
+        }
+
+
+render_cache = RenderCache()
+# pdfminer text of cached renders, keyed like render_cache, so repeat ATS
+# checks skip extraction as well as layout.
+text_cache = LRUCache(max_bytes=RENDER_CACHE_BYTES // 8)
+# Renders in flight, so concurrent identical requests wait for one WeasyPrint
+# run instead of each starting their own.
+_inflight: dict[str, asyncio.Task] = {}
+
+
+async def _single_flight(key: str, make):
+    """Await ``make()`` once per key; concurrent callers share its result.
+
+    ``make()`` runs in its own task, which every caller (the first included)
+    awaits through ``shield``: a caller that is cancelled stops waiting, but
+    the render goes on for the others and still fills the cache.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(make())
+        _inflight[key] = task
+
+        def done(t: asyncio.Task):
+            if _inflight.get(key) is t:
+                del _inflight[key]
+            if not t.cancelled():
+                t.exception()  # retrieved even if every caller stopped waiting
+
+        task.add_done_callback(done)
+    return await asyncio.shield(task)
+
+
+async def render_cached(req: PDFRequest) -> bytes:
+    """Return the PDF for ``req``, rendering on the worker pool only on a miss."""
+    key = render_key(req)
+    data = await render_cache.get(key)
+    if data is not None:
+        return data
+
+    async def make():
+        pdf = await run_cpu(render_pdf, req.html, page_css(req))
+        render_cache.renders += 1
+        await render_cache.put(key, pdf)
+        return pdf
+
+    return await _single_flight("pdf:" + key, make)
+
+
+def render_and_extract(html: str, css: str) -> tuple[bytes, str]:
+    """Render once and read the text back from the same in-memory buffer.
+
+    Saves a second render and a pickle round trip of the PDF compared with
+    ``render_pdf`` followed by ``extract_pdf_text`` as separate jobs.
+    """
+    from pdfminer.high_level import extract_text
+
+    buf = BytesIO()
+    try:
+        HTML(string=html).write_pdf(
+            buf,
+            presentational_hints=True,
+            stylesheets=[CSS(string=css)],
+        )
+        pdf = buf.getvalue()
+        buf.seek(0)
+        return pdf, extract_text(buf) or ""
+    finally:
+        buf.close()
+
+
+async def render_with_text(req: PDFRequest) -> tuple[bytes, str]:
+    """Return ``(pdf_bytes, extracted_text)`` for ``req`` with one layout pass.
+
+    Reuses whatever is cached: both halves, just the PDF (then only pdfminer
+    runs), or nothing (then one combined worker job does both).
+    """
+    key = render_key(req)
+    pdf = await render_cache.get(key)
+    text = text_cache.get(key)
+    if pdf is not None and text is not None:
+        return pdf, text
+
+    async def make():
+        if pdf is not None:
+            extracted = await run_cpu(extract_pdf_text, pdf)
+            rendered = pdf
+        else:
+            rendered, extracted = await run_cpu(render_and_extract, req.html, page_css(req))
+            render_cache.renders += 1
+            await render_cache.put(key, rendered)
+        text_cache.put(key, extracted)
+        return rendered, extracted
+
+    return await _single_flight("text:" + key, make)
@@ -0,0 +1,83 @@
+"""Find many phrases in one text with a single left-to-right scan.
+
+The ATS check looks for hundreds of expected phrases in the extracted PDF
+text. Calling ``text.find(phrase)`` per phrase is O(phrases x text). Here the
+phrases are compiled into one trie-shaped regular expression (the same
+automaton idea as Aho-Corasick, executed by the C regex engine), so each
+text position is tried against the trie once:
+
+- At every position the lookahead captures the *longest* phrase starting
+  there (greedy optional branches walk as deep into the trie as possible).
+- Any shorter phrase that also starts there must be a prefix of that one, so
+  a precomputed prefix table recovers all of them.
+
+The result is every start position of every phrase from one pass. Compiling
+the pattern is the expensive part; ``re`` caches compiled patterns, so
+re-checking the same expected-phrase set (the usual ATS flow) only pays for
+the scan. See ``benchmarks/bench_phrase_match.py``.
+
+The pattern nests one group per character, and both building and compiling
+it recurse that deep, so phrases longer than ``TRIE_MAX_LEN`` (whole
+bullets, usually only a few) are found with ``str.find`` instead.
+"""
+import re
+
+TRIE_MAX_LEN = 200
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex for a trie node. ``""`` marks the end of a phrase."""
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in node.items() if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # A phrase ends here: going deeper is optional, and greedy so the longest
+    # phrase wins. Siblings start with distinct characters, so at most one
+    # branch can match and no ordering is needed.
+    return f"(?:{body})?" if "" in node else body
+
+
+class PhraseMatcher:
+    """Compiled set of literal phrases. Build once, ``scan`` many texts.
+
+    Matching is exact and case-sensitive; normalize phrases and text the same
+    way beforehand.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = list(dict.fromkeys(p for p in phrases if p))
+        self._long = [p for p in self.phrases if len(p) > TRIE_MAX_LEN]
+        short = [p for p in self.phrases if len(p) <= TRIE_MAX_LEN]
+        trie: dict = {}
+        for phrase in short:
+            node = trie
+            for ch in phrase:
+                node = node.setdefault(ch, {})
+            node[""] = True
+
+        # For each phrase, itself plus every shorter phrase that is its prefix.
+        self._prefixes: dict[str, list[str]] = {}
+        for phrase in short:
+            node, found = trie, []
+            for i, ch in enumerate(phrase, 1):
+                node = node[ch]
+                if "" in node:
+                    found.append(phrase[:i])
+            self._prefixes[phrase] = found
+
+        self._regex = re.compile(f"(?=({_trie_pattern(trie)}))") if short else None
+
+    def scan(self, text: str) -> dict[str, list[int]]:
+        """Return ``{phrase: [start positions, ascending]}`` for every phrase."""
+        hits: dict[str, list[int]] = {p: [] for p in self.phrases}
+        if self._regex is not None:
+            for m in self._regex.finditer(text):
+                start = m.start()
+                for phrase in self._prefixes[m.group(1)]:
+                    hits[phrase].append(start)
+        for phrase in self._long:
+            i = text.find(phrase)
+            while i != -1:
+                hits[phrase].append(i)
+                i = text.find(phrase, i + 1)
+        return hits
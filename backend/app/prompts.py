@@ -0,0 +1,171 @@
+"""Compact, budgeted prompts for the AI routes.
+
+Resumes used to go into prompts as Python reprs (``f"Resume:\\n{resume}"``),
+with every formatting blob, empty field and quote style the model doesn't
+need. Here they are serialized as compact JSON with presentation-only keys
+and empty values removed; ``restore`` puts those back into the model's
+answer. ``build`` fills a prompt template, trims it to a token budget in
+priority order, and records per-route token counts (against the old repr
+baseline) for ``/stats``.
+"""
+import json
+import os
+from collections import defaultdict
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+
+# Keys the renderer needs but the model doesn't.
+PRESENTATION_KEYS = frozenset({
+    "title_formatting", "content_formatting", "formatting", "pdf_settings", "template",
+    "_id", "email", "rev", "last_updated", "share_token", "share_enabled", "share_artifact",
+})
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgets."""
+    return len(text) // 4 + 1
+
+
+def strip(value):
+    """``value`` without presentation keys or empty strings/lists/dicts."""
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            if key in PRESENTATION_KEYS:
+                continue
+            item = strip(item)
+            if item not in ("", [], {}, None):
+                out[key] = item
+        return out
+    if isinstance(value, list):
+        return [strip(v) for v in value]
+    return value.strip() if isinstance(value, str) else value
+
+
+def compact(value) -> str:
+    """Canonical compact JSON for a prompt (stripped, no whitespace)."""
+    return json.dumps(strip(value), ensure_ascii=False, separators=(",", ":"))
+
+
+def restore(original, answer):
+    """Fill keys the model never saw (or dropped) back in from ``original``.
+
+    Dicts are merged recursively, with the answer winning; lists of the same
+    length are merged element by element. Anything else is the answer's.
+    """
+    if isinstance(original, dict) and isinstance(answer, dict):
+        merged = dict(original)
+        for key, value in answer.items():
+            merged[key] = restore(original[key], value) if key in original else value
+        return merged
+    if isinstance(original, list) and isinstance(answer, list) and len(original) == len(answer):
+        return [restore(o, a) for o, a in zip(original, answer)]
+    return answer
+
+
+# ---------------------------------------------------------------------- #
+# Trimming. Each step returns a smaller copy of a resume (or None when it
+# has nothing left to remove); steps run in order until the prompt fits.
+# ---------------------------------------------------------------------- #
+
+def _cap_bullets(limit: int):
+    def step(resume: dict):
+        changed, sections = False, []
+        for section in resume.get("sections", []):
+            items = []
+            for item in section.get("items", []):
+                bullets = item.get("bullet_points") if isinstance(item, dict) else None
+                if isinstance(bullets, list) and len(bullets) > limit:
+                    item, changed = {**item, "bullet_points": bullets[:limit]}, True
+                items.append(item)
+            sections.append({**section, "items": items} if "items" in section else section)
+        return {**resume, "sections": sections} if changed else None
+    return step
+
+
+def _cap_entries(limit: int):
+    def step(resume: dict):
+        changed, sections = False, []
+        for section in resume.get("sections", []):
+            items = section.get("items")
+            if isinstance(items, list) and len(items) > limit and any(isinstance(i, dict) for i in items):
+                section, changed = {**section, "items": items[:limit]}, True
+            sections.append(section)
+        return {**resume, "sections": sections} if changed else None
+    return step
+
+
+def _drop_minor_section(resume: dict):
+    """Drop the last section that isn't experience or the summary."""
+    sections = resume.get("sections", [])
+    for i in range(len(sections) - 1, -1, -1):
+        if sections[i].get("type") not in ("experience", "paragraph"):
+            return {**resume, "sections": sections[:i] + sections[i + 1:]}
+    return None
+
+
+TRIM_STEPS = [_cap_bullets(4), _cap_entries(3), _cap_bullets(2), _drop_minor_section]
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    max_chars = max(0, (max_tokens - 1) * 4)
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + " …"
+
+
+_stats: dict[str, dict] = defaultdict(lambda: {"calls": 0, "tokens": 0, "baseline_tokens": 0, "trimmed": 0})
+
+
+def record(route: str, prompt: str, baseline: str | None = None, trimmed: bool = False) -> None:
+    """Count a prompt sent by ``route``; ``baseline`` is what it would have
+    been before compaction (defaults to the prompt itself)."""
+    entry = _stats[route]
+    entry["calls"] += 1
+    entry["tokens"] += estimate_tokens(prompt)
+    entry["baseline_tokens"] += estimate_tokens(baseline if baseline is not None else prompt)
+    entry["trimmed"] += int(trimmed)
+
+
+def token_stats() -> dict:
+    out = {}
+    for route, entry in _stats.items():
+        saved = 1 - entry["tokens"] / entry["baseline_tokens"] if entry["baseline_tokens"] else 0.0
+        out[route] = {**entry, "saved_ratio": round(saved, 3)}
+    return out
+
+
+def build(route: str, template: str, *, budget: int = PROMPT_TOKEN_BUDGET,
+          trim: tuple[str, ...] = (), clip: tuple[str, ...] = (), **fields) -> str:
+    """Fill ``template`` (``str.format`` placeholders) with ``fields``.
+
+    Dict/list fields are serialized with ``compact``; strings go in as they
+    are. If the prompt is over ``budget`` tokens, the resume fields named in
+    ``trim`` are cut down by ``TRIM_STEPS`` in order, then the string fields
+    named in ``clip`` are shortened. Anything not named is never altered, so
+    a section that is being rewritten is always sent whole.
+    """
+    def render(values: dict) -> str:
+        return template.format(**{k: v if isinstance(v, str) else compact(v) for k, v in values.items()})
+
+    values = dict(fields)
+    prompt = render(values)
+    trimmed = False
+    steps = iter(TRIM_STEPS)
+    while estimate_tokens(prompt) > budget and trim:
+        step = next(steps, None)
+        if step is None:
+            break
+        for name in trim:
+            smaller = step(values[name]) if isinstance(values[name], dict) else None
+            if smaller is not None:
+                values[name], trimmed = smaller, True
+        prompt = render(values)
+    if estimate_tokens(prompt) > budget and clip:
+        over = estimate_tokens(prompt) - budget
+        for name in clip:
+            share = over // len(clip) + 1
+            values[name] = _clip(values[name], max(1, estimate_tokens(values[name]) - share))
+        prompt, trimmed = render(values), True
+
+    baseline = template.format(**{k: v if isinstance(v, str) else str(v) for k, v in fields.items()})
+    record(route, prompt, baseline, trimmed)
+    return prompt
@@ -0,0 +1,169 @@
+"""Structural diff between two resumes, for "what changed" views.
+
+Sections are compared by content hash first, so unchanged ones (the usual
+case) cost one hash each and never reach the deep comparison or the
+response. The remaining sections are matched as moved (same hash, new
+place) or paired up by type and title, then diffed at item level and, for
+entries with ``bullet_points``, at bullet level. Lists are aligned with
+``difflib`` on item hashes, so an inserted bullet shows up as one addition
+rather than everything after it changing.
+
+The result only lists changes::
+
+    {
+      "fields": {"name": {"old": ..., "new": ...}},
+      "sections": [
+        {"status": "added" | "removed" | "moved" | "changed",
+         "old_index": ..., "new_index": ..., "title": ...,
+         # "changed" only:
+         "fields": {...}, "items": [item change, ...]},
+      ],
+      "unchanged_sections": 4,
+    }
+
+Item changes are ``added`` / ``removed`` (with ``value``) or ``changed``
+(``fields`` and ``bullets`` for entries, ``old``/``new`` for plain bullets);
+bullet changes follow the same shape with ``text``.
+"""
+import difflib
+import hashlib
+import json
+
+# Top-level keys that aren't resume content.
+IGNORED_KEYS = frozenset({
+    "_id", "email", "rev", "last_updated", "share_token", "share_enabled", "share_artifact",
+})
+
+
+def content_hash(value) -> str:
+    """Canonical hash of a JSON value (key order doesn't matter)."""
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _field_changes(old: dict, new: dict, skip=()) -> dict:
+    return {
+        key: {"old": old.get(key), "new": new.get(key)}
+        for key in sorted(set(old) | set(new), key=str)
+        if key not in skip and old.get(key) != new.get(key)
+    }
+
+
+def _align(old: list, new: list):
+    """``difflib`` opcodes for two lists, compared by content hash."""
+    matcher = difflib.SequenceMatcher(
+        None, [content_hash(v) for v in old], [content_hash(v) for v in new], autojunk=False
+    )
+    return matcher.get_opcodes()
+
+
+def _list_changes(old: list, new: list, changed) -> list[dict]:
+    """Added/removed/changed entries of a list; ``changed(i, j)`` describes
+    a replaced pair."""
+    out = []
+    for tag, i1, i2, j1, j2 in _align(old, new):
+        if tag == "equal":
+            continue
+        paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for k in range(paired):
+            out.append(changed(i1 + k, j1 + k))
+        for i in range(i1 + paired, i2):
+            out.append({"status": "removed", "old_index": i, "value": old[i]})
+        for j in range(j1 + paired, j2):
+            out.append({"status": "added", "new_index": j, "value": new[j]})
+    return out
+
+
+def _bullet_changes(old: list, new: list) -> list[dict]:
+    changes = _list_changes(old, new, lambda i, j: {
+        "status": "changed", "old_index": i, "new_index": j, "old": old[i], "new": new[j],
+    })
+    for change in changes:
+        if "value" in change:
+            change["text"] = change.pop("value")
+    return changes
+
+
+def _item_change(old, new, i: int, j: int) -> dict:
+    change = {"status": "changed", "old_index": i, "new_index": j}
+    if isinstance(old, dict) and isinstance(new, dict):
+        change["fields"] = _field_changes(old, new, skip=("bullet_points",))
+        old_bullets, new_bullets = old.get("bullet_points") or [], new.get("bullet_points") or []
+        if isinstance(old_bullets, list) and isinstance(new_bullets, list):
+            change["bullets"] = _bullet_changes(old_bullets, new_bullets)
+        elif old_bullets != new_bullets:
+            change["fields"]["bullet_points"] = {"old": old_bullets, "new": new_bullets}
+    else:
+        change.update(old=old, new=new)
+    return change
+
+
+def _section_change(old: dict, new: dict, i: int, j: int) -> dict:
+    old_items, new_items = old.get("items") or [], new.get("items") or []
+    return {
+        "status": "changed", "old_index": i, "new_index": j, "title": new.get("title", ""),
+        "fields": _field_changes(old, new, skip=("items",)),
+        "items": _list_changes(old_items, new_items,
+                               lambda a, b: _item_change(old_items[a], new_items[b], a, b)),
+    }
+
+
+def _sections(resume: dict) -> list:
+    sections = resume.get("sections")
+    return [s if isinstance(s, dict) else {} for s in sections] if isinstance(sections, list) else []
+
+
+def diff_resumes(old: dict, new: dict) -> dict:
+    """Changes from ``old`` to ``new`` (see the module docstring)."""
+    old, new = old or {}, new or {}
+    old_sections, new_sections = _sections(old), _sections(new)
+    old_hashes = [content_hash(s) for s in old_sections]
+    new_hashes = [content_hash(s) for s in new_sections]
+
+    # Sections in the same relative order with the same hash are unchanged;
+    # only what's left is looked at further.
+    matcher = difflib.SequenceMatcher(None, old_hashes, new_hashes, autojunk=False)
+    unchanged = 0
+    unmatched_old, unmatched_new = [], []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            unchanged += i2 - i1
+        else:
+            unmatched_old += range(i1, i2)
+            unmatched_new += range(j1, j2)
+
+    changes = []
+    for j in list(unmatched_new):
+        same = [i for i in unmatched_old if old_hashes[i] == new_hashes[j]]
+        if same:
+            unmatched_old.remove(same[0])
+            unmatched_new.remove(j)
+            changes.append({"status": "moved", "old_index": same[0], "new_index": j,
+                            "title": new_sections[j].get("title", "")})
+
+    def key(section: dict):
+        return (section.get("type"), (section.get("title") or "").strip().lower())
+
+    for j in list(unmatched_new):
+        for match_by in (key, lambda s: s.get("type")):
+            candidates = [i for i in unmatched_old if match_by(old_sections[i]) == match_by(new_sections[j])]
+            if candidates:
+                i = candidates[0]
+                unmatched_old.remove(i)
+                unmatched_new.remove(j)
+                changes.append(_section_change(old_sections[i], new_sections[j], i, j))
+                break
+    for j in unmatched_new:
+        changes.append({"status": "added", "new_index": j, "title": new_sections[j].get("title", ""),
+                        "value": new_sections[j]})
+    for i in unmatched_old:
+        changes.append({"status": "removed", "old_index": i, "title": old_sections[i].get("title", ""),
+                        "value": old_sections[i]})
+    changes.sort(key=lambda c: (c.get("new_index", c.get("old_index")), c["status"] != "removed"))
+
+    return {
+        "fields": _field_changes(old, new, skip=IGNORED_KEYS | {"sections"}),
+        "sections": changes,
+        "unchanged_sections": unchanged,
+    }
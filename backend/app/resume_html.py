@@ -0,0 +1,210 @@
+"""Server-side copy of the frontend's resume HTML (``frontend/lib/resumeTemplates.ts``).
+
+The editor renders resumes in the browser; this module produces the same
+markup and CSS so the backend can pre-render public share artifacts without
+a browser. Keep the two in step, as ``docx_export.TEMPLATE_STYLES`` is kept
+in step with the templates' look.
+"""
+import html
+import re
+
+DEFAULT_TEMPLATE = "original"
+
+
+def _escape(s) -> str:
+    return html.escape(str(s or ""), quote=True)
+
+
+def _linkify(escaped: str) -> str:
+    return re.sub(
+        r"(https?://[^\s|]+)",
+        r'<a href="\1" target="_blank" rel="noopener noreferrer">\1</a>',
+        escaped,
+    )
+
+
+def _strip_proto(url: str) -> str:
+    return re.sub(r"/$", "", re.sub(r"^https?://", "", (url or "").strip()))
+
+
+def _link(url: str) -> str:
+    u = url.strip()
+    href = u if re.match(r"^https?://", u) else f"https://{u}"
+    return (f'<a href="{_escape(href)}" target="_blank" rel="noopener noreferrer">'
+            f"{_escape(_strip_proto(u))}</a>")
+
+
+def _present(value) -> bool:
+    return bool(value) and value not in ("", "None")
+
+
+def format_date_range(item: dict) -> str:
+    item = item or {}
+    start_year = item.get("start_year")
+    if not _present(start_year):
+        return ""
+    start_month = item.get("start_month")
+    start = f"{start_month} {start_year}" if _present(start_month) else start_year
+    if item.get("end_type") == "Present":
+        return f"{start} - Present"
+    end_year, end_month = item.get("end_year"), item.get("end_month")
+    if item.get("end_type") == "Specific Month" and _present(end_year):
+        end = f"{end_month} {end_year}" if _present(end_month) else end_year
+        return f"{start} - {end}"
+    return f"{start}"
+
+
+def _entry_head(title: str, org: str, dates: str) -> str:
+    org_html = f'<span class="org">, {_escape(org)}</span>' if org else ""
+    date_html = f'<span class="dates">{_escape(dates)}</span>' if dates else ""
+    return f'<p class="entry-head"><strong class="role">{_escape(title)}</strong>{org_html}{date_html}</p>'
+
+
+def _bullets(points) -> str:
+    items = "".join(f"<li>{_escape(b)}</li>" for b in points or [] if b and str(b).strip())
+    return f'<ul class="bullets">{items}</ul>' if items else ""
+
+
+def _render_section(section: dict) -> str:
+    title = f'<h2 class="section-title">{_escape(section["title"])}</h2>' if section.get("title") else ""
+    kind, items = section.get("type"), section.get("items") or []
+
+    if kind == "paragraph":
+        return f'<section class="block">{title}<p class="para">{_escape(section.get("content"))}</p></section>'
+
+    if kind == "bullet_points":
+        lis = "".join(f"<li>{_escape(i)}</li>" for i in items if i and str(i).strip())
+        return f'<section class="block">{title}<ul class="bullets">{lis}</ul></section>'
+
+    if kind == "experience":
+        entries = "".join(
+            f'<div class="entry">{_entry_head(e.get("position", ""), e.get("company", ""), format_date_range(e))}'
+            f'{_bullets(e.get("bullet_points"))}</div>'
+            for e in items if isinstance(e, dict)
+        )
+        return f'<section class="block">{title}{entries}</section>'
+
+    if kind == "education":
+        entries = []
+        for e in items:
+            if not isinstance(e, dict):
+                continue
+            details = f'<p class="details">{_escape(e["details"])}</p>' if e.get("details") else ""
+            head = _entry_head(e.get("degree", ""), e.get("institution", ""), format_date_range(e))
+            entries.append(f'<div class="entry">{head}{details}</div>')
+        return f'<section class="block">{title}{"".join(entries)}</section>'
+
+    if kind == "project":
+        entries = []
+        for p in items:
+            if not isinstance(p, dict):
+                continue
+            links = [_link(p[k]) for k in ("github", "link") if (p.get(k) or "").strip()]
+            links_html = f'<span class="links"> · {" · ".join(links)}</span>' if links else ""
+            dates = format_date_range(p)
+            date_html = f'<span class="dates">{_escape(dates)}</span>' if dates else ""
+            head = (f'<p class="entry-head"><strong class="role">{_escape(p.get("name", ""))}</strong>'
+                    f"{links_html}{date_html}</p>")
+            tech = f'<p class="tech">Stack: {_escape(p["tech"])}</p>' if (p.get("tech") or "").strip() else ""
+            entries.append(f'<div class="entry">{head}{tech}{_bullets(p.get("bullet_points"))}</div>')
+        return f'<section class="block">{title}{"".join(entries)}</section>'
+
+    return ""
+
+
+BASE_CSS = """
+.resume { color: #000; background: #fff; max-width: 800px; margin: 0 auto; }
+.resume * { box-sizing: border-box; }
+.resume .name { margin: 0 0 2px; font-size: 24px; }
+.resume .title { margin: 0 0 6px; font-size: 15px; font-weight: normal; color: #222; }
+.resume .contact { font-size: 13px; color: #222; }
+.resume .contact a { color: inherit; text-decoration: none; }
+.resume .block { margin-top: 16px; }
+.resume .section-title { font-size: 14px; margin: 0 0 6px; }
+.resume .entry { margin-bottom: 8px; }
+.resume .entry-head { margin: 4px 0 2px; }
+.resume .dates { float: right; font-weight: normal; }
+.resume .para, .resume .details { margin: 4px 0; }
+.resume .tech { margin: 2px 0; font-style: italic; color: #333; }
+.resume .links { font-weight: normal; font-size: 12px; }
+.resume .links a { color: inherit; text-decoration: none; }
+.resume ul.bullets { margin: 4px 0 4px; padding-left: 20px; list-style-type: disc; list-style-position: outside; }
+.resume ul.bullets li { display: list-item; margin: 2px 0; }
+
+/* Pagination control for the PDF: keep entries whole, don't strand a heading
+   at the bottom of a page, and never leave a single dangling line of a
+   paragraph across a page break. */
+.resume .entry { break-inside: avoid; page-break-inside: avoid; }
+.resume ul.bullets li { break-inside: avoid; page-break-inside: avoid; }
+.resume .section-title { break-after: avoid; page-break-after: avoid; }
+.resume .entry-head { break-after: avoid; page-break-after: avoid; }
+.resume .para, .resume .details { orphans: 2; widows: 2; }
+"""
+
+TEMPLATE_CSS = {
+    "original": """
+.resume { font-family: Arial, Helvetica, sans-serif; line-height: 1.3; }
+.resume .resume-header { text-align: center; margin-bottom: 8px; }
+.resume .name { font-weight: bold; font-size: 24px; }
+.resume .title { font-size: 16px; font-weight: normal; color: #000; }
+.resume .contact { text-align: center; }
+.resume .section-title { font-weight: bold; border-bottom: 1px solid #000; padding-bottom: 3px; }
+""",
+    "modern": """
+.resume { font-family: "Helvetica Neue", Arial, sans-serif; line-height: 1.35; }
+.resume .resume-header { text-align: left; margin-bottom: 6px; }
+.resume .name { font-weight: 700; color: #1f2937; }
+.resume .title { color: #2563eb; font-weight: 600; }
+.resume .section-title { text-transform: uppercase; letter-spacing: 0.06em; font-weight: 700;
+  color: #1f2937; border-bottom: 2px solid #2563eb; padding-bottom: 3px; }
+""",
+    "classic": """
+.resume { font-family: Georgia, "Times New Roman", serif; line-height: 1.4; }
+.resume .resume-header { text-align: center; margin-bottom: 8px; }
+.resume .name { font-weight: 700; }
+.resume .section-title { font-weight: 700; border-bottom: 1px solid #000; padding-bottom: 3px; }
+""",
+    "compact": """
+.resume { font-family: Arial, Helvetica, sans-serif; line-height: 1.15; font-size: 13px; }
+.resume .resume-header { text-align: left; margin-bottom: 4px; }
+.resume .name { font-size: 21px; font-weight: 700; }
+.resume .block { margin-top: 10px; }
+.resume .section-title { font-size: 13px; font-weight: 700; border-bottom: 1px solid #444;
+  padding-bottom: 2px; text-transform: uppercase; letter-spacing: 0.03em; }
+.resume .entry { margin-bottom: 5px; }
+.resume ul.bullets li { margin: 1px 0; }
+""",
+}
+
+
+def render_resume_html(data: dict, template: str | None = None) -> str:
+    """The resume as a self-contained HTML fragment (style + markup), as the
+    editor's preview and PDF export produce it."""
+    css = BASE_CSS + TEMPLATE_CSS.get(template or DEFAULT_TEMPLATE, TEMPLATE_CSS[DEFAULT_TEMPLATE])
+    sections = "".join(_render_section(s) for s in data.get("sections") or [] if isinstance(s, dict))
+    contact = f'<p class="contact">{_linkify(_escape(data["contact_info"]))}</p>' if data.get("contact_info") else ""
+    return f"""<style>{css}</style>
+<div class="resume">
+  <header class="resume-header">
+    <h1 class="name">{_escape(data.get("name"))}</h1>
+    <p class="title">{_escape(data.get("title"))}</p>
+    {contact}
+  </header>
+  {sections}
+</div>"""
+
+
+def render_public_page(data: dict) -> str:
+    """A standalone page for a shared resume."""
+    name = (data.get("name") or "").strip()
+    title = f"{_escape(name)} – Resume" if name and name != "Full Name" else "Resume"
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+        '<meta name="robots" content="noindex">\n'
+        f"<title>{title}</title>\n"
+        "<style>body { margin: 0; padding: 24px 16px; background: #fff; }</style>\n"
+        "</head>\n<body>\n"
+        f"{render_resume_html(data, data.get('template'))}\n"
+        "</body>\n</html>\n"
+    )
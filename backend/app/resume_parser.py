@@ -0,0 +1,456 @@
+"""Rule-based resume parser that runs before (and often instead of) the LLM.
+
+Turns extracted resume text into the same JSON shape ``/parse-resume``
+returns. Contact details, section headings, bullets and date ranges are
+regular enough to handle with patterns; dates are normalized exactly as
+``PARSE_PROMPT`` specifies. A section whose heading isn't recognized, or
+whose body doesn't fit the expected layout, is returned as a plain
+paragraph and listed as *unresolved* so the caller can send only those
+fragments to the model.
+"""
+import re
+
+# Bump when the parser's output changes, so cached local parses are redone.
+PARSER_VERSION = 1
+
+SECTION_TYPES = ("paragraph", "bullet_points", "experience", "education", "project")
+
+TITLE_FORMATTING = {"alignment": "left", "font_size": 16, "font_weight": "bold"}
+CONTENT_FORMATTING = {"alignment": "left", "font_size": 14, "font_weight": "normal"}
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+_MONTH_LOOKUP = {m[:3].lower(): m for m in MONTHS}
+
+_MONTH = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+          r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?")
+_YEAR = r"(?:19|20)\d{2}"
+_DATE = rf"(?:{_MONTH}\s*,?\s*{_YEAR}|\d{{1,2}}\s*/\s*{_YEAR}|{_YEAR})"
+_PRESENT = r"(?:present|current(?:ly)?|now|ongoing|today|to date|till date)"
+_DATE_RANGE = re.compile(
+    rf"(?<![\w/])(?P<start>{_DATE})"
+    rf"(?:\s*(?:[-–—]+|\bto\b|\buntil\b|\btill\b)\s*(?P<end>{_DATE}|{_PRESENT}))?(?![\w/])",
+    re.I,
+)
+
+_BULLET = re.compile(r"^\s*[•●▪■◦○‣∙·\-–*]\s*")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_URL = re.compile(r"(?:https?://|www\.)\S+|\b(?:linkedin|github)\.com/\S+", re.I)
+_LOCATION = re.compile(r"^[A-Z][A-Za-z .'-]+,\s*[A-Z][A-Za-z .'-]+$")
+_SEPARATORS = re.compile(r"\s+[|•·–—]\s+|\s+-\s+|\s*\|\s*|\s{2,}|\t")
+_TECH_LINE = re.compile(r"^(?:tech(?:nologies|\s*stack)?|stack|built with|tools)\s*:\s*(?P<tech>.+)$", re.I)
+
+# Normalized heading -> section type. Exact matches are always headings;
+# keyword matches only count for short, heading-like lines (see _heading).
+_HEADINGS = {
+    "summary": "paragraph", "professional summary": "paragraph", "profile": "paragraph",
+    "objective": "paragraph", "career objective": "paragraph", "about me": "paragraph",
+    "about": "paragraph",
+    "skills": "bullet_points", "technical skills": "bullet_points", "key skills": "bullet_points",
+    "core competencies": "bullet_points", "certifications": "bullet_points",
+    "certificates": "bullet_points", "awards": "bullet_points", "achievements": "bullet_points",
+    "honors and awards": "bullet_points", "languages": "bullet_points", "interests": "bullet_points",
+    "experience": "experience", "work experience": "experience",
+    "professional experience": "experience", "employment": "experience",
+    "employment history": "experience", "work history": "experience",
+    "internships": "experience", "internship experience": "experience",
+    "education": "education", "academic background": "education", "qualifications": "education",
+    "projects": "project", "personal projects": "project", "academic projects": "project",
+    "key projects": "project", "side projects": "project",
+}
+_HEADING_KEYWORDS = [
+    ("project", "project"), ("education", "education"), ("experience", "experience"),
+    ("employment", "experience"), ("skill", "bullet_points"), ("certification", "bullet_points"),
+    ("award", "bullet_points"), ("summary", "paragraph"), ("objective", "paragraph"),
+]
+_DEGREE = re.compile(
+    r"\b(?:bachelor|master|doctor|ph\.?\s?d|b\.?\s?(?:s|a|e|sc|tech|com)|m\.?\s?(?:s|a|e|sc|tech|ba)"
+    r"|mba|associate|diploma|degree|certificate|high school|secondary|a-levels?)\b\.?",
+    re.I,
+)
+_INSTITUTION = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic)\b", re.I)
+
+
+def new_section(type_: str, title: str, content: str = "", items: list | None = None) -> dict:
+    return {
+        "type": type_,
+        "title": title,
+        "content": content,
+        "items": items or [],
+        "title_formatting": dict(TITLE_FORMATTING),
+        "content_formatting": dict(CONTENT_FORMATTING),
+    }
+
+
+def normalize_section(section) -> dict | None:
+    """Coerce a model-produced section into the parse shape; ``None`` if empty."""
+    if not isinstance(section, dict):
+        return None
+    type_ = section.get("type") if section.get("type") in SECTION_TYPES else "paragraph"
+    items = section.get("items") if isinstance(section.get("items"), list) else []
+    content = section.get("content") if isinstance(section.get("content"), str) else ""
+    if not items and not content.strip():
+        return None
+    out = new_section(type_, str(section.get("title") or ""), content, items)
+    for key in ("title_formatting", "content_formatting"):
+        if isinstance(section.get(key), dict):
+            out[key] = section[key]
+    return out
+
+
+# ---------------------------------------------------------------------- #
+# Dates
+# ---------------------------------------------------------------------- #
+
+def _parse_date(token: str) -> tuple[str, str]:
+    """``(month, year)`` for one date token; month is "" for a bare year."""
+    token = token.strip()
+    year = re.search(_YEAR, token).group(0)
+    numeric = re.match(r"(\d{1,2})\s*/", token)
+    if numeric:
+        n = int(numeric.group(1))
+        return (MONTHS[n - 1] if 1 <= n <= 12 else ""), year
+    word = re.match(r"[a-z]+", token, re.I)
+    return (_MONTH_LOOKUP.get(word.group(0)[:3].lower(), "") if word else ""), year
+
+
+def date_fields(text: str) -> dict:
+    """The five date fields for the first date or date range in ``text``.
+
+    Follows the ``PARSE_PROMPT`` rules: full month names, 4-digit years, the
+    original granularity kept, and ``end_type`` one of "Present",
+    "Specific Month" or "None".
+    """
+    fields = {"start_month": "", "start_year": "", "end_month": "", "end_year": "", "end_type": "None"}
+    m = _DATE_RANGE.search(text or "")
+    if not m:
+        return fields
+    fields["start_month"], fields["start_year"] = _parse_date(m.group("start"))
+    end = m.group("end")
+    if end and re.fullmatch(_PRESENT, end.strip(), re.I):
+        fields["end_type"] = "Present"
+    elif end:
+        fields["end_month"], fields["end_year"] = _parse_date(end)
+        fields["end_type"] = "Specific Month"
+    return fields
+
+
+def _split_date(line: str) -> tuple[str, dict | None]:
+    """Remove the first date range from ``line``; return the rest and its fields."""
+    m = _DATE_RANGE.search(line)
+    if not m:
+        return line, None
+    rest = (line[:m.start()] + " " + line[m.end():]).strip(" ,|–—-()\t")
+    return rest, date_fields(m.group(0))
+
+
+# ---------------------------------------------------------------------- #
+# Lines, headings and the header block
+# ---------------------------------------------------------------------- #
+
+def _is_bullet(line: str) -> bool:
+    # "-" only counts when followed by a space ("- Built"), not "-2022".
+    return bool(_BULLET.match(line)) and not re.match(r"^\s*-\S", line)
+
+
+def _strip_bullet(line: str) -> str:
+    return _BULLET.sub("", line, count=1).strip() if _is_bullet(line) else line.strip()
+
+
+def _heading(line: str) -> tuple[str, str | None] | None:
+    """``(title, type)`` if ``line`` is a section heading; type ``None`` means
+    it looks like a heading but isn't one we know."""
+    title = line.strip().rstrip(":").strip()
+    words = title.split()
+    if not words or len(words) > 4 or re.search(r"[\d@/]", title) or _is_bullet(line):
+        return None
+    key = re.sub(r"[^a-z ]", "", title.lower().replace("&", "and")).strip()
+    key = re.sub(r"\s+", " ", key)
+    if key in _HEADINGS:
+        return title, _HEADINGS[key]
+    heading_like = title.isupper() or line.strip().endswith(":")
+    if not heading_like or len(title) < 3:
+        return None
+    for keyword, type_ in _HEADING_KEYWORDS:
+        if keyword in key:
+            return title, type_
+    # Unknown headings must be upper case: "Backend:" inside a skills list
+    # is a category label, not a new section.
+    return (title, None) if title.isupper() else None
+
+
+def _has_contact(line: str) -> bool:
+    return bool(_EMAIL.search(line) or _PHONE.search(line) or _URL.search(line))
+
+
+def _parse_header(lines: list[str]) -> tuple[str, str, str, list[str]]:
+    """``(name, title, contact_info, leftover lines)`` from the lines above the
+    first heading. Long leftover lines are an untitled summary."""
+    name, title, contact, leftover = "", "", [], []
+    for i, line in enumerate(lines):
+        if i == 0 and not _has_contact(line):
+            name = line.strip()
+        elif _has_contact(line) or (_LOCATION.match(line.strip()) and len(line.split()) <= 4):
+            contact += [p.strip() for p in _SEPARATORS.split(line) if p and p.strip()]
+        elif not title and not leftover and len(line.split()) <= 10:
+            title = line.strip()
+        else:
+            leftover.append(line)
+    return name, title, " | ".join(contact), leftover
+
+
+# ---------------------------------------------------------------------- #
+# Section bodies. Each returns a section dict, or None when the body
+# doesn't fit the expected layout and should go to the model instead.
+# ---------------------------------------------------------------------- #
+
+def _merge_continuations(lines: list[str]) -> list[tuple[bool, str]]:
+    """``(is_bullet, text)`` per logical line; wrapped bullet text (a
+    non-bullet line starting in lowercase) is joined onto its bullet."""
+    out: list[tuple[bool, str]] = []
+    for line in lines:
+        text = _strip_bullet(line)
+        if not text:
+            continue
+        if out and out[-1][0] and not _is_bullet(line) and (text[0].islower() or text[0] in ",;&("):
+            out[-1] = (True, f"{out[-1][1]} {text}")
+        else:
+            out.append((_is_bullet(line), text))
+    return out
+
+
+def _paragraph(title: str, lines: list[str]) -> dict:
+    return new_section("paragraph", title, " ".join(t for _, t in _merge_continuations(lines)))
+
+
+def _bullet_points(title: str, lines: list[str]) -> dict | None:
+    logical = _merge_continuations(lines)
+    texts = [t for _, t in logical]
+    # A category label on its own line means a multi-column layout whose
+    # labels and values were extracted apart; re-pairing them needs the model.
+    if any(t.endswith(":") for t in texts):
+        return None
+    if not any(b for b, _ in logical) and not any(":" in t for t in texts):
+        joined = ", ".join(texts)
+        if len(texts) <= 3 and re.search(r"[,|•·]", joined):
+            values = [v.strip() for v in re.split(r"\s*[,|•·]\s*", joined) if v.strip()]
+            return new_section("paragraph", title, ", ".join(values))
+    items = []
+    for text in texts:
+        label, sep, values = text.partition(":")
+        if sep and values.strip() and len(label.split()) <= 4:
+            parts = [v.strip() for v in re.split(r"\s*[,|•·]\s*", values) if v.strip()]
+            items.append(f"{label.strip()}: {', '.join(parts)}")
+        else:
+            items.append(text)
+    return new_section("bullet_points", title, items=items)
+
+
+def _pieces(line: str) -> list[str]:
+    return [p.strip(" ,") for p in _SEPARATORS.split(line) if p and p.strip(" ,")]
+
+
+def _entries(lines: list[str]) -> list[tuple[list[str], list[str]]] | None:
+    """Split a section into ``(header lines, bullets)`` entries. ``None`` if
+    the body has no bullets to anchor on or a header block is too long to be
+    an entry heading."""
+    logical = _merge_continuations(lines)
+    if not any(b for b, _ in logical):
+        return None
+    entries: list[tuple[list[str], list[str]]] = []
+    for is_bullet, text in logical:
+        if not is_bullet and entries and entries[-1][1] and _TECH_LINE.match(text):
+            is_bullet = True  # a "Stack: ..." line after a project's bullets
+        if is_bullet:
+            if not entries:
+                return None
+            entries[-1][1].append(text)
+        elif not entries or entries[-1][1]:
+            entries.append(([text], []))
+        else:
+            entries[-1][0].append(text)
+    if any(len(header) > 3 for header, _ in entries):
+        return None
+    return entries
+
+
+def _header_fields(header: list[str]) -> tuple[list[str], dict, list[str]]:
+    """Text pieces, date fields and URLs from an entry's header lines."""
+    pieces, dates, urls = [], None, []
+    for line in header:
+        urls += _URL.findall(line)
+        line = _URL.sub("", line)
+        rest, found = _split_date(line)
+        dates = dates or found
+        pieces += _pieces(rest)
+    return pieces, dates or date_fields(""), urls
+
+
+def _experience(title: str, lines: list[str]) -> dict | None:
+    entries = _entries(lines)
+    if not entries:
+        return None
+    items = []
+    for header, bullets in entries:
+        pieces, dates, _ = _header_fields(header)
+        if len(pieces) == 1:
+            # "Engineer at Acme" / "Engineer, Acme"
+            pieces = [p.strip() for p in re.split(r"\s+at\s+|,\s+", pieces[0], maxsplit=1)]
+        if not pieces or (len(pieces) < 2 and not dates["start_year"]):
+            return None
+        items.append({
+            "position": pieces[0],
+            "company": pieces[1] if len(pieces) > 1 else "",
+            **dates,
+            "bullet_points": bullets,
+        })
+    return new_section("experience", title, items=items)
+
+
+def _project(title: str, lines: list[str]) -> dict | None:
+    entries = _entries(lines)
+    if not entries:
+        return None
+    items = []
+    for header, bullets in entries:
+        tech = ""
+        kept = []
+        for line in header + bullets:
+            m = _TECH_LINE.match(line)
+            if m:
+                tech = m.group("tech").strip()
+            elif line in header:
+                kept.append(line)
+        body = [b for b in bullets if not _TECH_LINE.match(b)]
+        pieces, dates, urls = _header_fields(kept)
+        urls += [u for b in body for u in _URL.findall(b)]
+        if not pieces:
+            return None
+        if not tech and len(pieces) > 1:
+            tech = pieces[1]
+        github = next((u for u in urls if "github.com" in u.lower()), "")
+        link = next((u for u in urls if "github.com" not in u.lower()), "")
+        items.append({
+            "name": pieces[0], "tech": tech, "github": github, "link": link,
+            **dates, "bullet_points": body,
+        })
+    return new_section("project", title, items=items)
+
+
+def _education(title: str, lines: list[str]) -> dict | None:
+    items: list[dict] = []
+
+    def empty():
+        return {"degree": "", "institution": "", **date_fields(""), "details": ""}
+
+    current = empty()
+    for _, text in _merge_continuations(lines):
+        rest, dates = _split_date(text)
+        pieces = []
+        for piece in _pieces(rest):
+            # "B.S. Computer Science, Stanford University"
+            if _DEGREE.search(piece) and _INSTITUTION.search(piece) and ", " in piece:
+                pieces += [p.strip() for p in piece.split(", ")]
+            else:
+                pieces.append(piece)
+        for piece in pieces:
+            field = ("degree" if _DEGREE.search(piece)
+                     else "institution" if _INSTITUTION.search(piece) else "details")
+            if field != "details" and current[field]:
+                items.append(current)
+                current = empty()
+            if field == "details":
+                current["details"] = f"{current['details']} {piece}".strip()
+            else:
+                current[field] = piece
+        if dates:
+            if current["start_year"] and (current["degree"] or current["institution"]):
+                items.append(current)
+                current = empty()
+            current.update(dates)
+    if any(v for k, v in current.items() if k != "end_type"):
+        items.append(current)
+    if not items or not all(i["degree"] or i["institution"] for i in items):
+        return None
+    return new_section("education", title, items=items)
+
+
+_BODY_PARSERS = {
+    "paragraph": _paragraph,
+    "bullet_points": _bullet_points,
+    "experience": _experience,
+    "education": _education,
+    "project": _project,
+}
+
+
+def parse_resume_text(text: str) -> tuple[dict, list[dict]]:
+    """Parse resume text into the ``/parse-resume`` shape.
+
+    Returns ``(resume, unresolved)``. Every section is in ``resume``, in
+    document order; the ones the rules couldn't handle are plain paragraphs
+    of their raw text, and ``unresolved`` lists them as
+    ``{"index", "title", "text"}`` so the caller can have the model redo
+    just those. Resume-wide text with no headings at all is one unresolved
+    fragment.
+    """
+    lines = [ln.strip() for ln in (text or "").replace("\f", "\n").splitlines() if ln.strip()]
+    blocks: list[tuple[str, str | None, list[str]]] = []
+    header: list[str] = []
+    for i, line in enumerate(lines):
+        found = _heading(line) if i else None  # the first line is the name
+        if found:
+            blocks.append((found[0], found[1], []))
+        elif blocks:
+            blocks[-1][2].append(line)
+        else:
+            header.append(line)
+
+    name, title, contact, leftover = _parse_header(header)
+    resume = {"name": name, "title": title, "contact_info": contact, "sections": []}
+    unresolved: list[dict] = []
+    if leftover:
+        blocks.insert(0, ("Summary" if blocks else "", "paragraph" if blocks else None, leftover))
+
+    # A heading that comes back (a section split by a page break, say)
+    # continues the first block with that heading rather than starting a
+    # duplicate section.
+    merged: dict[str, tuple[str, str | None, list[str]]] = {}
+    for heading, type_, body in blocks:
+        key = heading.lower()
+        if key in merged:
+            merged[key][2].extend(body)
+        else:
+            merged[key] = (heading, type_, list(body))
+
+    for heading, type_, body in merged.values():
+        if not body:
+            continue
+        section = _BODY_PARSERS[type_](heading, body) if type_ else None
+        if section is None:
+            unresolved.append({"index": len(resume["sections"]), "title": heading,
+                               "text": "\n".join(body)})
+            section = _paragraph(heading, body)
+        resume["sections"].append(section)
+    return resume, unresolved
+
+
+def merge_resolved(resume: dict, unresolved: list[dict], sections: list) -> dict:
+    """Replace unresolved placeholder sections with the model's sections.
+
+    ``sections`` carry a ``fragment`` number (1-based, matching the order of
+    ``unresolved``). Fragments the model returned nothing for keep their
+    paragraph placeholder.
+    """
+    by_fragment: dict[int, list[dict]] = {}
+    for section in sections if isinstance(sections, list) else []:
+        fragment = section.get("fragment") if isinstance(section, dict) else None
+        clean = normalize_section(section)
+        if isinstance(fragment, int) and 1 <= fragment <= len(unresolved) and clean:
+            by_fragment.setdefault(fragment, []).append(clean)
+    replace = {u["index"]: by_fragment[n] for n, u in enumerate(unresolved, 1) if n in by_fragment}
+    merged = []
+    for i, section in enumerate(resume["sections"]):
+        merged += replace.get(i, [section])
+    return {**resume, "sections": merged}
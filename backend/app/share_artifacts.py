@@ -0,0 +1,103 @@
+"""Pre-rendered artifacts for publicly shared resumes.
+
+When sharing is turned on, and after every save of a shared resume, the
+public page (HTML) and the PDF are rendered once and stored in MongoDB under
+a content-derived version. ``GET /r/{token}`` reports that version as
+``artifact``; ``/r/{token}/artifacts/{version}.{html,pdf}`` then serves the
+stored bytes with immutable cache headers, so recruiter traffic never
+triggers a WeasyPrint run.
+
+Publishing runs in the background and is coalesced per account: autosave
+can fire every few seconds, but at most one publish per account runs at a
+time, followed by one more if saves arrived meanwhile. An unchanged resume
+(same version) is not re-rendered.
+"""
+import asyncio
+import hashlib
+import logging
+
+from app.database import db
+from app.resume_html import render_public_page, render_resume_html
+
+logger = logging.getLogger("uvicorn.error")
+
+ARTIFACT_TYPES = {"html": "text/html; charset=utf-8", "pdf": "application/pdf"}
+
+_running: dict[str, asyncio.Task] = {}
+_again: set[str] = set()
+_stats = {"published": 0, "unchanged": 0, "failed": 0}
+
+
+# app.pdf (WeasyPrint) is imported where it's used, so the resume and share
+# routes that schedule publishing load without WeasyPrint's native libraries.
+def _pdf_request(resume: dict):
+    from app.pdf import PDFRequest
+
+    settings = resume.get("pdf_settings") if isinstance(resume.get("pdf_settings"), dict) else {}
+    return PDFRequest(html=render_resume_html(resume, resume.get("template")), **settings)
+
+
+def artifact_version(page: str, req) -> str:
+    """Content hash of everything the artifacts are rendered from."""
+    from app.pdf import render_key
+
+    return hashlib.sha256((page + render_key(req)).encode("utf-8")).hexdigest()[:16]
+
+
+async def publish(email: str) -> str | None:
+    """Render and store the artifacts of ``email``'s shared resume unless
+    they are current. Returns the current version, or None if the resume
+    isn't shared."""
+    source = await db.share_source(email)
+    if source is None:
+        return None
+    token, resume = source
+    page = render_public_page(resume)
+    req = _pdf_request(resume)
+    version = artifact_version(page, req)
+    if resume.get("artifact") == version:
+        _stats["unchanged"] += 1
+        return version
+    from app.pdf import render_cached
+
+    pdf = await render_cached(req)
+    if not await db.put_share_artifact(email, token, version, {"html": page.encode("utf-8"), "pdf": pdf}):
+        return None
+    _stats["published"] += 1
+    return version
+
+
+async def _run(email: str):
+    try:
+        while True:
+            _again.discard(email)
+            try:
+                await publish(email)
+            except Exception as e:  # noqa: BLE001 - visitors fall back to live rendering
+                _stats["failed"] += 1
+                logger.warning("Could not publish share artifacts for %s: %s", email, e)
+            if email not in _again:
+                break
+    finally:
+        _running.pop(email, None)
+
+
+def schedule(email: str) -> None:
+    """Publish in the background (see the module docstring)."""
+    if email in _running:
+        _again.add(email)
+        return
+    _running[email] = asyncio.get_running_loop().create_task(_run(email))
+
+
+async def aclose():
+    """Cancel pending publishes (app shutdown)."""
+    tasks = list(_running.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _again.clear()
+
+
+def stats() -> dict:
+    return {**_stats, "running": len(_running)}
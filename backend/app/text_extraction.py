@@ -1,52 +1,195 @@
-"""Resume file text extraction with input validation."""
+"""Resume file text extraction with input validation.
+
+PDF uploads are extracted in parallel: the page range is split across the
+CPU worker pool and the per-page text is joined in page order, which is
+exactly what a single pdfminer pass would produce. The first pages are
+probed for a text layer before any layout analysis, so a scanned,
+image-only PDF is rejected without parsing the whole document.
+"""
+import asyncio
 import os
-import tempfile
+from io import BytesIO
 
 from fastapi import HTTPException, UploadFile
 
+from app.workers import cpu_pool, run_cpu
+
 ALLOWED_EXTENSIONS = {"pdf", "docx"}
 MAX_FILE_BYTES = 5 * 1024 * 1024  # 5 MB
+READ_CHUNK_BYTES = 64 * 1024
+
+PDF_PAGES_PER_JOB = max(1, int(os.getenv("PDF_PAGES_PER_JOB", "1")))
+PDF_PROBE_PAGES = max(1, int(os.getenv("PDF_PROBE_PAGES", "2")))
+# pdfminer layout analysis (defaults match pdfminer's). PDF_BOXES_FLOW=none
+# skips the costly text-box ordering pass, at some cost to reading order on
+# multi-column layouts.
+PDF_LINE_MARGIN = float(os.getenv("PDF_LINE_MARGIN", "0.5"))
+PDF_CHAR_MARGIN = float(os.getenv("PDF_CHAR_MARGIN", "2.0"))
+PDF_WORD_MARGIN = float(os.getenv("PDF_WORD_MARGIN", "0.1"))
+PDF_BOXES_FLOW = os.getenv("PDF_BOXES_FLOW", "0.5")
+
+NO_TEXT_DETAIL = (
+    "No extractable text: the PDF looks like a scanned image. "
+    "Upload a text-based PDF or a DOCX."
+)
 
 
 def _extension(filename: str) -> str:
     return filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
 
 
-def validate_upload(filename: str, data: bytes) -> str:
-    """Validate an uploaded resume and return its (lowercased) extension.
-
-    Raises HTTPException with a 4xx status on any invalid input.
-    """
+def _extension_or_400(filename: str) -> str:
     ext = _extension(filename or "")
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported file type '.{ext or '?'}'. Allowed types: PDF, DOCX.",
         )
+    return ext
+
+
+def validate_upload(filename: str, data: bytes) -> str:
+    """Validate an uploaded resume and return its (lowercased) extension.
+
+    Raises HTTPException with a 4xx status on any invalid input.
+    """
+    ext = _extension_or_400(filename)
     if not data:
         raise HTTPException(status_code=400, detail="Uploaded file is empty.")
     if len(data) > MAX_FILE_BYTES:
-        raise HTTPException(status_code=413, detail="File too large (max 5 MB).")
+        raise _too_large()
+    if _sniff(data) != ext:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File content is not a valid .{ext} file.",
+        )
     return ext
 
 
-def extract_text_from_file(file: UploadFile) -> str:
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail="File too large (max 5 MB).")
+
+
+def _sniff(data: bytes) -> str:
+    """File type from magic bytes: "pdf", "docx" (a zip container) or ""."""
+    # The PDF header may follow a little leading junk; readers accept it
+    # anywhere in the first 1 KB.
+    if b"%PDF-" in data[:1024]:
+        return "pdf"
+    if data.startswith(b"PK\x03\x04"):
+        return "docx"
+    return ""
+
+
+def _laparams():
+    from pdfminer.layout import LAParams
+
+    boxes_flow = None if PDF_BOXES_FLOW.lower() == "none" else float(PDF_BOXES_FLOW)
+    return LAParams(
+        line_margin=PDF_LINE_MARGIN,
+        char_margin=PDF_CHAR_MARGIN,
+        word_margin=PDF_WORD_MARGIN,
+        boxes_flow=boxes_flow,
+    )
+
+
+def extract_pdf_text(data: bytes, pages: range | None = None) -> str:
+    """Extract text from in-memory PDF bytes (e.g. a PDF we just rendered),
+    optionally only for the zero-based page numbers in ``pages``."""
+    from pdfminer.high_level import extract_text
+
+    with BytesIO(data) as buf:
+        return extract_text(buf, page_numbers=pages, laparams=_laparams()) or ""
+
+
+def probe_pdf(data: bytes, probe_pages: int = PDF_PROBE_PAGES) -> tuple[int, bool]:
+    """Return ``(page count, whether the first pages draw any text)``.
+
+    Runs the first ``probe_pages`` content streams through a device that only
+    notices text-drawing operators — no layout analysis — so it is cheap.
+    """
+    from pdfminer.pdfdevice import PDFDevice
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    class _TextSeen(PDFDevice):
+        seen = False
+
+        def render_string(self, textstate, seq, ncs, graphicstate):
+            if any(item for item in seq if isinstance(item, bytes)):
+                self.seen = True
+
+    with BytesIO(data) as buf:
+        pages = list(PDFPage.get_pages(buf))
+        rsrcmgr = PDFResourceManager()
+        device = _TextSeen(rsrcmgr)
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page in pages[:probe_pages]:
+            interpreter.process_page(page)
+            if device.seen:
+                break
+        return len(pages), device.seen
+
+
+def extract_text_from_bytes(data: bytes, ext: str) -> str:
+    """Extract plain text from validated PDF/DOCX bytes in one process.
+
+    CPU-bound (pdfminer layout analysis); runs in the worker pool. Both
+    readers work on the in-memory buffer, so nothing touches the disk.
+    """
+    if ext == "pdf":
+        return extract_pdf_text(data)
+    import docx2txt  # docx: a zip container, which zipfile reads from buf
+
+    with BytesIO(data) as buf:
+        return docx2txt.process(buf) or ""
+
+
+async def extract_upload_text(data: bytes, ext: str) -> str:
+    """Extract plain text from validated upload bytes using the worker pool.
+
+    PDFs are probed for a text layer (400 if there is none), then split into
+    page ranges of at least ``PDF_PAGES_PER_JOB`` pages, extracted
+    concurrently. There are never more ranges than pool workers, so one
+    long upload can't fill the pool's queue on its own.
+    """
+    if ext != "pdf":
+        return await run_cpu(extract_text_from_bytes, data, ext)
+    page_count, has_text = await run_cpu(probe_pdf, data)
+    if not has_text:
+        raise HTTPException(status_code=400, detail=NO_TEXT_DETAIL)
+    jobs = min(-(-page_count // PDF_PAGES_PER_JOB), cpu_pool.workers)
+    per_job = -(-page_count // jobs)
+    ranges = [range(start, min(start + per_job, page_count))
+              for start in range(0, page_count, per_job)]
+    if len(ranges) <= 1:
+        return await run_cpu(extract_pdf_text, data)
+    # pdfminer ends every page with a form feed, so joining the ranges in
+    # order gives the same text as one pass over the whole document.
+    parts = await asyncio.gather(*(run_cpu(extract_pdf_text, data, r) for r in ranges))
+    return "".join(parts)
+
+
+async def read_upload(file: UploadFile) -> tuple[bytes, str]:
+    """Read and validate an upload. Returns its bytes and extension.
+
+    The body is read in chunks and rejected with a 413 as soon as it passes
+    ``MAX_FILE_BYTES``, so an oversized upload is never read in full.
+    """
+    _extension_or_400(file.filename or "")
+    if file.size is not None and file.size > MAX_FILE_BYTES:
+        raise _too_large()
+    chunks, total = [], 0
+    while chunk := await file.read(READ_CHUNK_BYTES):
+        total += len(chunk)
+        if total > MAX_FILE_BYTES:
+            raise _too_large()
+        chunks.append(chunk)
+    data = b"".join(chunks)
+    return data, validate_upload(file.filename or "", data)
+
+
+async def extract_text_from_file(file: UploadFile) -> str:
     """Validate an upload and extract its plain text (PDF or DOCX)."""
-    data = file.file.read()
-    ext = validate_upload(file.filename or "", data)
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{ext}") as tmp:
-        tmp.write(data)
-        tmp_path = tmp.name
-
-    try:
-        if ext == "pdf":
-            from pdfminer.high_level import extract_text
-            text = extract_text(tmp_path)
-        else:  # docx
-            import docx2txt
-            text = docx2txt.process(tmp_path)
-    finally:
-        os.remove(tmp_path)
-
-    return text
+    data, ext = await read_upload(file)
+    return await extract_upload_text(data, ext)
@@ -0,0 +1,123 @@
+"""Shared process pool for CPU-bound work (WeasyPrint, pdfminer, python-docx).
+
+Every route is ``async def``, so running a multi-second render inline stalls
+the event loop and every other request (``/health`` included) waits behind
+it. Heavy work is submitted here instead and awaited.
+
+- **Bounded:** at most ``CPU_QUEUE_LIMIT`` jobs may be running or waiting.
+  Past that, callers get a 503 with ``Retry-After`` instead of piling up.
+- **Timed:** each job gets ``CPU_JOB_TIMEOUT`` seconds (or a per-call
+  override) before the caller gets a 504.
+- **Recycled:** a worker process exits after ``CPU_MAX_TASKS_PER_CHILD`` jobs
+  and is replaced, so Pango/WeasyPrint memory growth can't build up.
+
+Jobs cross a process boundary, so submit module-level functions with
+picklable arguments and return values (strings, bytes, dicts).
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+CPU_QUEUE_LIMIT = int(os.getenv("CPU_QUEUE_LIMIT", str(CPU_WORKERS * 4)))
+CPU_JOB_TIMEOUT = float(os.getenv("CPU_JOB_TIMEOUT", "60"))
+CPU_MAX_TASKS_PER_CHILD = int(os.getenv("CPU_MAX_TASKS_PER_CHILD", "50"))
+RETRY_AFTER_SECONDS = 5
+
+
+def _unavailable(detail: str, retry_after: int) -> HTTPException:
+    return HTTPException(status_code=503, detail=detail,
+                         headers={"Retry-After": str(retry_after)})
+
+
+class CpuPool:
+    """Lazy, bounded process pool.
+
+    The executor is created on first use so importing the app (tests, the
+    endpoint index) doesn't spawn processes.
+    """
+
+    def __init__(self, workers: int = CPU_WORKERS, queue_limit: int = CPU_QUEUE_LIMIT,
+                 timeout: float = CPU_JOB_TIMEOUT,
+                 max_tasks_per_child: int = CPU_MAX_TASKS_PER_CHILD):
+        self.workers = max(1, workers)
+        self.queue_limit = max(1, queue_limit)
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: ProcessPoolExecutor | None = None
+        # Jobs submitted and not yet finished. Released when the job itself
+        # finishes, not when the caller gives up, so a timed-out render still
+        # counts against the limit while it occupies a worker.
+        self._pending = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                max_tasks_per_child=self.max_tasks_per_child or None,
+            )
+        return self._executor
+
+    def _release(self, _future=None):
+        self._pending -= 1
+
+    async def run(self, fn, *args, timeout: float | None = None):
+        """Run ``fn(*args)`` in a worker process and return its result.
+
+        Raises HTTPException 503 (with Retry-After) when the queue is full or
+        the pool broke, and 504 when the job exceeds its timeout. Exceptions
+        raised by ``fn`` itself propagate unchanged.
+        """
+        if self._pending >= self.queue_limit:
+            raise _unavailable(
+                "Server is busy rendering other documents. Please retry shortly.",
+                RETRY_AFTER_SECONDS,
+            )
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._pool().submit(fn, *args)
+        except BrokenProcessPool:
+            self._executor = None  # a worker died hard; start fresh next time
+            raise _unavailable("Worker pool restarted. Please retry.", 1)
+        self._pending += 1
+
+        def _done(f):
+            try:
+                loop.call_soon_threadsafe(self._release, f)
+            except RuntimeError:  # loop already closed (shutdown/tests)
+                self._release(f)
+
+        future.add_done_callback(_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Document processing timed out.")
+        except BrokenProcessPool:
+            self._executor = None
+            raise _unavailable("Worker pool restarted. Please retry.", 1)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "queue_limit": self.queue_limit,
+            "started": self._executor is not None,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+cpu_pool = CpuPool()
+
+
+async def run_cpu(fn, *args, timeout: float | None = None):
+    """Run ``fn(*args)`` on the shared CPU pool. See ``CpuPool.run``."""
+    return await cpu_pool.run(fn, *args, timeout=timeout)
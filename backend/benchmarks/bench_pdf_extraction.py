@@ -0,0 +1,76 @@
+"""Upload text extraction: one pdfminer pass vs page ranges on the CPU pool.
+
+Run from ``backend/``:
+
+    python -m benchmarks.bench_pdf_extraction
+
+Builds text-heavy PDFs of increasing length and times a single
+``extract_pdf_text`` call against ``extract_upload_text`` (probe, then
+page ranges in parallel) on a fresh ``CpuPool``. The pool is warmed first
+so process start-up is not counted. The speedup is bounded by the number
+of cores; on a single core the parallel path only adds overhead.
+"""
+import asyncio
+import random
+import time
+
+from app import text_extraction as te
+from app.workers import CpuPool
+
+WORDS = "built led shipped reduced latency api service team data pipeline python react cloud".split()
+
+
+def make_pdf(n_pages: int, lines_per_page: int, rng: random.Random) -> bytes:
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(n_pages):
+        ops = ["BT /F1 9 Tf 11 TL 50 760 Td"]
+        for _ in range(lines_per_page):
+            ops.append(f"({' '.join(rng.choice(WORDS) for _ in range(14))}) '")
+        ops.append("ET")
+        stream = "\n".join(ops)
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out, offsets = b"%PDF-1.4\n", []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def bench(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    rng = random.Random(42)
+    pool = CpuPool()
+    te.cpu_pool, te.run_cpu = pool, pool.run  # route the engine's jobs to this pool
+    try:
+        asyncio.run(pool.run(pow, 2, 2))
+        print(f"{'pages':>6} {'single ms':>10} {'parallel ms':>12} {'speedup':>8}")
+        for n_pages in (1, 2, 4, 8):
+            data = make_pdf(n_pages, 60, rng)
+            assert asyncio.run(te.extract_upload_text(data, "pdf")) == te.extract_pdf_text(data)
+            single = bench(lambda: te.extract_pdf_text(data))
+            parallel = bench(lambda: asyncio.run(te.extract_upload_text(data, "pdf")))
+            print(f"{n_pages:>6} {single:>10.1f} {parallel:>12.1f} {single / parallel:>7.1f}x")
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
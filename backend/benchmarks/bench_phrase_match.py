@@ -0,0 +1,78 @@
+"""Expected-phrase lookup: per-phrase ``str.find`` loop vs ``PhraseMatcher``.
+
+Run from ``backend/``:
+
+    python -m benchmarks.bench_phrase_match
+
+Builds a synthetic resume text and samples expected phrases from it (plus a
+few that are absent), then times the loop, the matcher cold (compile + scan)
+and warm (scan only, as when the same phrase set is checked again and the
+compiled pattern comes from ``re``'s cache).
+"""
+import random
+import re
+import time
+
+from app.phrase_match import PhraseMatcher
+
+SYLLABLES = "ba be bi bo bu ka ke ki ko ku ra re ri ro ru ta te ti to tu na ne ni no nu".split()
+
+
+def _normalize(s: str) -> str:
+    return re.sub(r"\s+", " ", s or "").strip().lower()
+
+
+def make_text(n_words: int, rng: random.Random) -> str:
+    vocab = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))) for _ in range(3000)]
+    return " ".join(rng.choice(vocab) for _ in range(n_words))
+
+
+def sample_phrases(text: str, n: int, rng: random.Random) -> list[str]:
+    words = text.split()
+    out = []
+    for _ in range(n):
+        i = rng.randrange(len(words) - 8)
+        out.append(" ".join(words[i:i + rng.randint(2, 8)]))
+    out += [f"missing phrase {i}" for i in range(n // 10)]
+    return out
+
+
+def find_loop(norm: str, expected: list[str]) -> dict[str, int]:
+    return {n: norm.find(n) for n in (_normalize(e) for e in expected) if n}
+
+
+def matcher(norm: str, expected: list[str], compiled: PhraseMatcher | None = None) -> dict[str, int]:
+    m = compiled or PhraseMatcher(_normalize(e) for e in expected)
+    return {n: (pos[0] if pos else -1) for n, pos in m.scan(norm).items()}
+
+
+def matcher_cold(norm: str, expected: list[str]) -> dict[str, int]:
+    re.purge()  # drop re's compiled-pattern cache so the compile is timed too
+    return matcher(norm, expected)
+
+
+def bench(fn, *args, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'words':>7} {'phrases':>8} {'find loop ms':>13} {'cold ms':>8} {'warm ms':>8} {'warm speedup':>13}")
+    for n_words, n_phrases in ((800, 30), (2000, 200), (5000, 500), (20000, 2000)):
+        norm = _normalize(make_text(n_words, rng))
+        expected = sample_phrases(norm, n_phrases, rng)
+        assert find_loop(norm, expected) == matcher(norm, expected)
+        compiled = PhraseMatcher(_normalize(e) for e in expected)
+        a = bench(find_loop, norm, expected)
+        cold = bench(matcher_cold, norm, expected)
+        warm = bench(matcher, norm, expected, compiled)
+        print(f"{n_words:>7} {len(expected):>8} {a:>13.2f} {cold:>8.2f} {warm:>8.2f} {a / warm:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
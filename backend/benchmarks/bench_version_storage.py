@@ -0,0 +1,149 @@
+"""Version history: full snapshots vs compressed reverse deltas.
+
+Run from ``backend/``:
+
+    python -m benchmarks.bench_version_storage
+
+Replays synthetic editing sessions (mostly autosaves mid-typing, plus
+added/removed bullets and entries, section reorders and formatting
+changes) and lays the versions out the way ``Database.save_version`` does,
+without a database: the old layout (one full BSON snapshot per version) and
+the new one (compressed head, reverse patches, a keyframe every
+``VERSION_KEYFRAME_EVERY``). Reports the stored size of the retained
+history, bytes sent to MongoDB per save and per ``get_version``, and the
+worst-case rebuild time.
+"""
+import random
+import time
+
+import bson
+
+from app import database, jsonpatch
+from app.database import _pack, _unpack
+
+WORDS = ("built led shipped reduced latency api service team data pipeline python react "
+         "cloud owned migrated designed scaled customers revenue dashboards tests").split()
+
+
+def sentence(rng: random.Random, n: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def make_resume(rng: random.Random) -> dict:
+    fmt = {"font_size": 11, "font_weight": "normal", "alignment": "left", "font_family": "Georgia"}
+    experience = [{
+        "title": "Software Engineer", "subtitle": f"Company {i}", "start_month": "Jan",
+        "start_year": str(2016 + i), "end_type": "date", "end_month": "Dec", "end_year": str(2017 + i),
+        "bullet_points": [sentence(rng) for _ in range(4)], "formatting": dict(fmt),
+    } for i in range(3)]
+    return {
+        "name": "Jane Doe", "email_display": "jane@example.com", "phone": "+1 555 0100",
+        "sections": [
+            {"type": "paragraph", "title": "Summary", "content": sentence(rng, 40),
+             "title_formatting": dict(fmt), "content_formatting": dict(fmt)},
+            {"type": "experience", "title": "Experience", "items": experience,
+             "title_formatting": dict(fmt), "content_formatting": dict(fmt)},
+            {"type": "bullet_points", "title": "Skills", "items": [sentence(rng, 6) for _ in range(5)],
+             "title_formatting": dict(fmt), "content_formatting": dict(fmt)},
+            {"type": "education", "title": "Education", "items": [{
+                "degree": "BSc Computer Science", "institution": "State University",
+                "start_year": "2012", "end_year": "2016", "formatting": dict(fmt)}],
+             "title_formatting": dict(fmt), "content_formatting": dict(fmt)},
+        ],
+    }
+
+
+def edit(resume: dict, rng: random.Random) -> dict:
+    resume = _unpack(_pack(resume))  # deep copy
+    jobs = next(s for s in resume["sections"] if s["type"] == "experience")["items"]
+    roll = rng.random()
+    if roll < 0.6:  # typing in a bullet
+        bullets = rng.choice(jobs)["bullet_points"]
+        i = rng.randrange(len(bullets))
+        bullets[i] = bullets[i][:-1] + " " + " ".join(rng.choice(WORDS) for _ in range(2)) + "."
+    elif roll < 0.7:
+        summary = resume["sections"][0]
+        summary["content"] = summary["content"][:-1] + " " + rng.choice(WORDS) + "."
+    elif roll < 0.8:
+        rng.choice(jobs)["bullet_points"].append(sentence(rng))
+    elif roll < 0.85:
+        bullets = rng.choice(jobs)["bullet_points"]
+        if len(bullets) > 1:
+            bullets.pop(rng.randrange(len(bullets)))
+    elif roll < 0.92:
+        section = rng.choice(resume["sections"])
+        section["content_formatting"]["font_size"] = rng.choice([10, 10.5, 11, 12])
+    elif roll < 0.97 and len(jobs) < 6:
+        jobs.insert(0, {**jobs[0], "subtitle": f"Company {rng.randrange(100)}",
+                        "bullet_points": [sentence(rng)]})
+    elif roll >= 0.97:
+        a, b = rng.sample(range(1, len(resume["sections"])), 2)
+        resume["sections"][a], resume["sections"][b] = resume["sections"][b], resume["sections"][a]
+    return resume
+
+
+class DeltaHistory:
+    """The save_version / get_version layout for one bucket, in memory."""
+
+    def __init__(self, cap: int):
+        self.cap, self.docs, self.seq = cap, [], 0  # docs newest first
+
+    def save(self, snapshot: dict) -> int:
+        self.seq += 1
+        doc = {"_id": bson.ObjectId(), "snapshot_z": bson.Binary(_pack(snapshot)), "seq": self.seq}
+        sent = len(bson.encode(doc))
+        if self.docs and self.docs[0]["seq"] % database.VERSION_KEYFRAME_EVERY:
+            head = self.docs[0]
+            head["patch_z"] = bson.Binary(_pack(jsonpatch.diff(snapshot, _unpack(head.pop("snapshot_z")))))
+            sent += len(bson.encode({"$set": {"patch_z": head["patch_z"]}}))
+        self.docs = [doc] + self.docs[:self.cap - 1]
+        return sent
+
+    def get(self, index: int) -> tuple[dict, int]:
+        """Snapshot of the index-th newest version, and bytes read for it."""
+        chain, i = [], index
+        while "patch_z" in self.docs[i]:
+            chain.append(self.docs[i])
+            i -= 1
+        snapshot = _unpack(self.docs[i]["snapshot_z"])
+        for doc in chain[::-1]:
+            snapshot = jsonpatch.apply(snapshot, _unpack(doc["patch_z"]))
+        return snapshot, sum(len(bson.encode(d)) for d in chain + [self.docs[i]])
+
+    def stored(self) -> int:
+        return sum(len(bson.encode(d)) for d in self.docs)
+
+
+def main():
+    rng = random.Random(7)
+    cap = database.AUTO_VERSION_CAP
+    print(f"{'saves':>6} {'full KB':>8} {'delta KB':>9} {'ratio':>6} {'write B/save':>19} "
+          f"{'read B/get':>17} {'worst get ms':>12}")
+    for saves in (30, 100, 300):
+        resume = make_resume(rng)
+        history, full_docs, full_sent, delta_sent = DeltaHistory(cap), [], 0, 0
+        for _ in range(saves):
+            resume = edit(resume, rng)
+            doc = {"_id": bson.ObjectId(), "snapshot": resume, "seq": 0}
+            full_sent += len(bson.encode(doc))
+            full_docs = [doc] + full_docs[:cap - 1]
+            delta_sent += history.save(resume)
+
+        full_read, delta_read, worst = 0, 0, 0.0
+        for i, doc in enumerate(full_docs):
+            t0 = time.perf_counter()
+            snapshot, read = history.get(i)
+            worst = max(worst, time.perf_counter() - t0)
+            assert snapshot == doc["snapshot"]
+            full_read += len(bson.encode(doc))
+            delta_read += read
+        full_kb = sum(len(bson.encode(d)) for d in full_docs) / 1024
+        delta_kb = history.stored() / 1024
+        n = len(full_docs)
+        print(f"{saves:>6} {full_kb:>8.1f} {delta_kb:>9.1f} {full_kb / delta_kb:>5.1f}x "
+              f"{full_sent // saves:>8} -> {delta_sent // saves:>7} "
+              f"{full_read // n:>7} -> {delta_read // n:>6} {worst * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import time
+
+from app.cache import LRUCache
+
+
+def test_get_put_and_counters():
+    cache = LRUCache(max_items=10)
+    assert cache.get("a") is None
+    cache.put("a", b"1")
+    assert cache.get("a") == b"1"
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = LRUCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    cache.get("a")  # "b" is now the least recently used
+    cache.put("c", b"cccc")
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_value_larger_than_budget_is_not_stored():
+    cache = LRUCache(max_bytes=4)
+    cache.put("a", b"12345")
+    assert len(cache) == 0
+
+
+def test_ttl_expiry():
+    cache = LRUCache(ttl=0.01)
+    cache.put("a", "x")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
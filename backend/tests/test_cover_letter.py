@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.api.routes import cover_letter
+from app.api.routes.cover_letter import _FenceStripper
+
+
+def _non_streaming(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").strip()
+    return text
+
+
+def _streamed(text: str, size: int) -> str:
+    stripper = _FenceStripper()
+    out = "".join(stripper.feed(text[i:i + size]) for i in range(0, len(text), size))
+    return out + stripper.flush()
+
+
+@pytest.mark.parametrize("text", [
+    "Dear Hiring Manager,\n\nI am applying.\n\nJane Doe\n",
+    "```\nDear Hiring Manager,\nUse `code` here.\n```\n",
+    "  \n```text\nDear team,\n\nThanks.\n```",
+    "```b\na`  \n`",
+    "```\nSee `x`\t```  ",
+    "``not a fence",
+    "``",
+    "",
+])
+@pytest.mark.parametrize("size", [1, 2, 5, 1000])
+def test_streaming_strip_matches_non_streaming(text, size):
+    assert _streamed(text, size) == _non_streaming(text)
+
+
+def test_any_mid_stream_failure_becomes_an_error_event(monkeypatch):
+    async def fake_stream(prompt, **kwargs):
+        yield "Dear team,"
+        raise ValueError("malformed chunk")
+
+    monkeypatch.setattr(cover_letter, "stream_text", fake_stream)
+
+    async def collect():
+        response = await cover_letter.stream_cover_letter(jd="Engineer", resume={"name": "Jane"})
+        return [event async for event in response.body_iterator]
+
+    events = asyncio.run(collect())
+    assert events[0] == 'data: "Dear team,"\n\n'
+    assert events[-1].startswith("event: error\n")
+    assert "malformed chunk" in events[-1]
@@ -0,0 +1,422 @@
+"""Database tests. They run against MONGODB_TEST_URI (a throwaway database
+is created and dropped per test) or, failing that, an in-process fake from
+``mongomock_motor``; with neither available they are skipped."""
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app import database, jsonpatch
+from app.database import Database
+
+TEST_URI = os.getenv("MONGODB_TEST_URI")
+
+try:
+    from mongomock.collection import BulkOperationBuilder
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    AsyncMongoMockClient = None
+else:
+    # pymongo 4.11+ passes UpdateOne's ``sort`` option to bulk builders;
+    # mongomock doesn't know it yet. Accept it when unset.
+    _add_update = BulkOperationBuilder.add_update
+
+    def _add_update_with_sort(self, *args, sort=None, **kwargs):
+        if sort is not None:
+            raise NotImplementedError("mongomock: UpdateOne(sort=...)")
+        return _add_update(self, *args, **kwargs)
+
+    BulkOperationBuilder.add_update = _add_update_with_sort
+
+pytestmark = pytest.mark.skipif(
+    not TEST_URI and AsyncMongoMockClient is None,
+    reason="needs MONGODB_TEST_URI or mongomock_motor",
+)
+
+
+def _run(test):
+    async def main():
+        if TEST_URI:
+            from pymongo import AsyncMongoClient
+            client = AsyncMongoClient(TEST_URI)
+        else:
+            client = AsyncMongoMockClient()
+        name = f"buildit_test_{uuid.uuid4().hex[:8]}"
+        db = Database(client=client, db_name=name)
+        try:
+            await test(db)
+        finally:
+            await client.drop_database(name)
+            if TEST_URI:
+                await db.close()
+
+    asyncio.run(main())
+
+
+def test_save_and_get_resume():
+    async def test(db):
+        await db.save_resume("a@x.com", {"name": "Jane", "_id": "ignored"})
+        await db.save_resume("a@x.com", {"name": "Jane D"})
+        resume = await db.get_resume("a@x.com")
+        assert resume["name"] == "Jane D" and resume["email"] == "a@x.com"
+        assert await db.get_resume("nobody@x.com") is None
+
+    _run(test)
+
+
+def test_patch_resume_writes_only_the_edited_paths():
+    async def test(db):
+        rev = await db.save_resume("a@x.com", {"name": "Jane", "title": "Dev", "sections": [
+            {"type": "experience", "title": "Experience",
+             "items": [{"company": "Acme", "bullet_points": ["a", "b"]}]},
+        ]})
+        assert rev == 1
+        col = await db._collection()
+        updates = []
+        update_one = col.update_one
+
+        async def spy(filter, update, *args, **kwargs):
+            updates.append(update)
+            return await update_one(filter, update, *args, **kwargs)
+
+        async def collection():
+            return col
+
+        col.update_one = spy
+        db._collection = collection
+
+        rev = await db.patch_resume("a@x.com", 1, ops=[
+            {"op": "replace", "path": "/sections/0/items/0/bullet_points/1", "value": "b2"}])
+        assert rev == 2
+        assert set(updates[-1]["$set"]) == {"sections.0.items.0.bullet_points.1", "last_updated"}
+        assert updates[-1]["$inc"] == {"rev": 1}
+
+        rev = await db.patch_resume("a@x.com", 2, ops=[
+            {"op": "add", "path": "/sections/0/items/0/bullet_points/0", "value": "first"}])
+        assert set(updates[-1]["$set"]) == {"sections.0.items.0.bullet_points", "last_updated"}
+
+        rev = await db.patch_resume("a@x.com", rev, changes={"sections.0.title": "Work", "/title": None})
+        assert set(updates[-1]["$set"]) == {"sections.0.title", "last_updated"}
+        assert set(updates[-1]["$unset"]) == {"title"}
+
+        resume = await db.get_resume("a@x.com")
+        assert resume["rev"] == 4 and "title" not in resume
+        assert resume["sections"][0]["title"] == "Work"
+        assert resume["sections"][0]["items"][0]["bullet_points"] == ["first", "a", "b2"]
+        assert await db.patch_resume("nobody@x.com", 0, changes={"name": "x"}) is None
+
+    _run(test)
+
+
+def test_patch_resume_rejects_stale_revisions_and_server_fields():
+    async def test(db):
+        await db.save_resume("a@x.com", {"name": "Jane"})
+        await db.patch_resume("a@x.com", 1, changes={"name": "Jane D"})
+        with pytest.raises(database.StaleRevisionError) as stale:
+            await db.patch_resume("a@x.com", 1, changes={"name": "Jane X"})
+        assert stale.value.rev == 2
+        for ops in ([{"op": "replace", "path": "/email", "value": "b@x.com"}],
+                    [{"op": "add", "path": "/rev", "value": 9}],
+                    [{"op": "add", "path": "/$where", "value": 1}],
+                    [{"op": "replace", "path": "", "value": {}}],
+                    [{"op": "remove", "path": "/missing"}]):
+            with pytest.raises(jsonpatch.PatchError):
+                await db.patch_resume("a@x.com", 2, ops=ops)
+        resume = await db.get_resume("a@x.com")
+        assert resume["name"] == "Jane D" and resume["rev"] == 2
+        assert await db.save_resume("a@x.com", {"name": "Full", "rev": 99}) == 3
+
+    _run(test)
+
+
+def test_versions_dedupe_and_prune(monkeypatch):
+    monkeypatch.setattr(database, "AUTO_VERSION_CAP", 3)
+
+    async def test(db):
+        first = await db.save_version("a@x.com", {"name": "v0"})
+        assert await db.save_version("a@x.com", {"name": "v0"}) is None  # identical
+        for i in range(1, 5):
+            await db.save_version("a@x.com", {"name": f"v{i}"})
+        await db.save_version("a@x.com", {"name": "keep"}, source="load", protected=True)
+        versions = (await db.list_versions("a@x.com"))["versions"]
+        assert sum(not v["protected"] for v in versions) == 3
+        protected = [v for v in versions if v["protected"]]
+        assert len(protected) == 1
+        assert await db.get_version("a@x.com", first) is None  # pruned
+        kept = await db.get_version("a@x.com", protected[0]["id"])
+        assert kept["snapshot"] == {"name": "keep"}
+
+    _run(test)
+
+
+def test_lowered_cap_prunes_the_backlog_in_one_write(monkeypatch):
+    async def test(db):
+        for i in range(5):
+            await db.save_version("a@x.com", {"name": f"v{i}"})
+        await db.save_version("a@x.com", {"name": "kept"}, protected=True)
+        monkeypatch.setattr(database, "AUTO_VERSION_CAP", 2)
+        await db.save_version("a@x.com", {"name": "v5"})
+        versions = (await db.list_versions("a@x.com"))["versions"]
+        assert sum(not v["protected"] for v in versions) == 2
+        assert sum(v["protected"] for v in versions) == 1  # other bucket untouched
+
+    _run(test)
+
+
+def test_versions_are_stored_as_deltas_and_rebuilt(monkeypatch):
+    monkeypatch.setattr(database, "AUTO_VERSION_CAP", 12)
+    monkeypatch.setattr(database, "VERSION_KEYFRAME_EVERY", 4)
+
+    async def test(db):
+        resume = {"name": "Jane", "sections": [{"title": "Experience", "items": ["a", "b"]}]}
+        saved = {}
+        for i in range(15):
+            resume = {**resume, "sections": [{**resume["sections"][0],
+                                              "items": resume["sections"][0]["items"] + [f"bullet {i}"]}]}
+            saved[await db.save_version("a@x.com", resume)] = resume
+        docs = await (await db._versions()).find({"email": "a@x.com"}).sort("seq", -1).to_list(None)
+        assert len(docs) == 12
+        assert "snapshot_z" in docs[0] and "patch_z" not in docs[0]  # head
+        for doc in docs[1:]:
+            assert ("snapshot_z" in doc) == (doc["seq"] % 4 == 0)
+        for doc in docs:
+            version = await db.get_version("a@x.com", str(doc["_id"]))
+            assert version["snapshot"] == saved[str(doc["_id"])]
+
+    _run(test)
+
+
+def test_versions_written_before_delta_storage_still_load():
+    async def test(db):
+        col = await db._versions()
+        old = await col.insert_one({"email": "a@x.com", "snapshot": {"name": "old"}, "source": "auto",
+                                    "protected": False, "hash": "x", "created_at": datetime(2024, 1, 1)})
+        new = await db.save_version("a@x.com", {"name": "new"})
+        await db.save_version("a@x.com", {"name": "newer"})
+        assert (await db.get_version("a@x.com", str(old.inserted_id)))["snapshot"] == {"name": "old"}
+        assert (await db.get_version("a@x.com", new))["snapshot"] == {"name": "new"}
+        assert len((await db.list_versions("a@x.com"))["versions"]) == 3
+
+    _run(test)
+
+
+def test_versions_written_before_delta_storage_are_pruned_first(monkeypatch):
+    monkeypatch.setattr(database, "AUTO_VERSION_CAP", 3)
+
+    async def test(db):
+        col = await db._versions()
+        await col.insert_one({"email": "a@x.com", "snapshot": {"name": "old"}, "source": "auto",
+                              "protected": False, "hash": "x", "created_at": datetime(2024, 1, 1)})
+        names = []
+        for i in range(4):
+            await db.save_version("a@x.com", {"name": f"v{i}"})
+            versions = (await db.list_versions("a@x.com"))["versions"]
+            names.append([(await db.get_version("a@x.com", v["id"]))["snapshot"]["name"] for v in versions])
+        assert names == [["v0", "old"], ["v1", "v0", "old"], ["v2", "v1", "v0"], ["v3", "v2", "v1"]]
+
+    _run(test)
+
+
+def test_version_listing_pages_filters_and_projects():
+    async def test(db):
+        ids = []
+        for i in range(7):
+            ids.append(await db.save_version("a@x.com", {"name": f"v{i}"}, protected=i % 3 == 0))
+        seen, cursor = [], None
+        while True:
+            page = await db.list_versions("a@x.com", limit=3, cursor=cursor)
+            assert len(page["versions"]) <= 3
+            seen += [v["id"] for v in page["versions"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == ids[::-1]
+
+        page = await db.list_versions("a@x.com", protected=True, fields=["id"])
+        assert page == {"versions": [{"id": ids[i]} for i in (6, 3, 0)], "next_cursor": None}
+        assert (await db.list_versions("a@x.com", source="manual"))["versions"] == []
+        with pytest.raises(ValueError):
+            await db.list_versions("a@x.com", cursor="not-a-cursor")
+
+        assert await db.get_version("a@x.com", ids[0], fields=["created_at"]) == {
+            "created_at": (await db.get_version("a@x.com", ids[0]))["created_at"]}
+        assert (await db.get_version("a@x.com", ids[0], fields=["snapshot.name"]))["snapshot"] == {"name": "v0"}
+
+    _run(test)
+
+
+def test_share_flow():
+    async def test(db):
+        assert await db.set_share("a@x.com") is None  # no resume yet
+        await db.save_resume("a@x.com", {"name": "Jane"})
+        state = await db.set_share("a@x.com", enabled=True)
+        shared = await db.get_shared_resume(state["token"])
+        assert shared["name"] == "Jane" and "email" not in shared
+        await db.set_share("a@x.com", enabled=False)
+        assert await db.get_shared_resume(state["token"]) is None
+        assert (await db.get_share_state("a@x.com"))["token"] == state["token"]
+
+    _run(test)
+
+
+def test_read_cache_serves_hits_and_invalidates_on_writes():
+    async def test(db):
+        await db.save_resume("a@x.com", {"name": "Jane"})
+        first = await db.get_resume_entry("a@x.com")
+        assert json.loads(first.body)["name"] == "Jane"
+        assert await db.get_resume_entry("a@x.com") is first  # hit
+        assert await db.get_resume_entry("nobody@x.com") is None
+
+        await db.save_resume("a@x.com", {"name": "Jane D"})
+        second = await db.get_resume_entry("a@x.com")
+        assert json.loads(second.body)["name"] == "Jane D" and second.etag != first.etag
+
+        state = await db.set_share("a@x.com")
+        shared = await db.get_shared_entry(state["token"])
+        assert "email" not in json.loads(shared.body)
+        assert await db.get_shared_entry(state["token"]) is shared
+        await db.save_resume("a@x.com", {"name": "Jane Doe"})
+        assert json.loads((await db.get_shared_entry(state["token"])).body)["name"] == "Jane Doe"
+        new = await db.set_share("a@x.com", regenerate=True)
+        assert await db.get_shared_entry(state["token"]) is None  # old link is dead at once
+        assert await db.get_shared_entry(new["token"]) is not None
+
+        stats = db.read_cache.stats()
+        assert stats["hits"] == 2 and stats["invalidations"] == 5
+
+    _run(test)
+
+
+def test_read_cache_does_not_store_reads_that_raced_a_write():
+    async def test(db):
+        await db.save_resume("a@x.com", {"name": "old"})
+        get_resume = db.get_resume
+
+        async def slow_get_resume(email):
+            resume = await get_resume(email)
+            await db.save_resume(email, {"name": "new"})  # lands mid-read
+            return resume
+
+        db.get_resume = slow_get_resume
+        assert json.loads((await db.get_resume_entry("a@x.com")).body)["name"] == "old"
+        db.get_resume = get_resume
+        assert json.loads((await db.get_resume_entry("a@x.com")).body)["name"] == "new"
+
+    _run(test)
+
+
+def test_cached_json_answers_304_for_a_matching_etag():
+    from starlette.requests import Request
+
+    from app.api.routes.resume import cached_json
+    from app.database import CachedDoc
+
+    entry = CachedDoc(b'{"name":"Jane"}', '"abc"')
+
+    def request(tag=None):
+        headers = [(b"if-none-match", tag.encode())] if tag else []
+        return Request({"type": "http", "method": "GET", "headers": headers})
+
+    fresh = cached_json(request(), entry)
+    assert fresh.status_code == 200 and fresh.body == entry.body and fresh.headers["etag"] == '"abc"'
+    assert cached_json(request('"old", "abc"'), entry).status_code == 304
+    assert cached_json(request('"old"'), entry).status_code == 200
+
+
+def test_share_artifacts_are_versioned_and_cleaned_up():
+    async def test(db):
+        await db.save_resume("a@x.com", {"name": "Jane"})
+        token = (await db.set_share("a@x.com"))["token"]
+        assert await db.share_source("nobody@x.com") is None
+        assert (await db.share_source("a@x.com"))[0] == token
+
+        for version in ("v1", "v2", "v3"):
+            assert await db.put_share_artifact("a@x.com", token, version, {"html": b"<p>", "pdf": b"%PDF"})
+        assert await db.get_share_artifact(token, "v3", "pdf") == b"%PDF"
+        assert await db.get_share_artifact(token, "v2", "html") == b"<p>"  # previous one kept
+        assert await db.get_share_artifact(token, "v1", "pdf") is None
+        public = await db.get_shared_resume(token)
+        assert public["artifact"] == "v3" and "share_artifact" not in public
+
+        # A client echoing back a stale field can't repoint the link.
+        await db.save_resume("a@x.com", {"name": "Jane D", "share_artifact": "v1"})
+        assert (await db.get_shared_resume(token))["artifact"] == "v3"
+
+        new = (await db.set_share("a@x.com", regenerate=True))["token"]
+        assert await db.get_share_artifact(token, "v3", "pdf") is None
+        assert "artifact" not in await db.get_shared_resume(new)
+        # A publish that finishes after the link changed keeps nothing.
+        assert not await db.put_share_artifact("a@x.com", token, "v4", {"html": b"", "pdf": b""})
+        assert await db.get_share_artifact(token, "v4", "pdf") is None
+
+        assert await db.put_share_artifact("a@x.com", new, "v5", {"html": b"", "pdf": b"%PDF"})
+        await db.set_share("a@x.com", enabled=False)
+        assert await db.get_share_artifact(new, "v5", "pdf") is None
+
+    _run(test)
+
+
+def test_indexes_are_idempotent():
+    async def test(db):
+        await db.connect()
+        await db._db().resume_versions.create_index([("email", 1), ("created_at", -1)],
+                                                   name="email_1_created_at_-1")
+        assert await db.ensure_indexes() == {}
+        assert await db.ensure_indexes() == {}
+        names = set(await db._db().resume_versions.index_information())
+        assert {"email_1_created_at_-1__id_-1", "email_1_protected_1_seq_-1"} <= names
+        assert not names & set(database.SUPERSEDED_INDEXES["resume_versions"])
+
+    _run(test)
+
+
+def _stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+@pytest.mark.skipif(not TEST_URI, reason="explain plans need a real mongod (MONGODB_TEST_URI)")
+def test_every_query_uses_an_index():
+    async def test(db):
+        await db.save_resume("a@x.com", {"name": "Jane"})
+        await db.save_version("a@x.com", {"name": "v1"})
+        resumes, versions, artifacts = await db._collection(), await db._versions(), await db._artifacts()
+        from bson import ObjectId
+
+        # The filter/sort shapes Database issues.
+        queries = [
+            resumes.find({"email": "a@x.com"}),
+            resumes.find({"share_token": "t", "share_enabled": True}),
+            versions.find({"email": "a@x.com"}).sort([("created_at", -1), ("_id", -1)]).limit(21),
+            versions.find({"email": "a@x.com", "$or": [
+                {"created_at": {"$lt": datetime.now()}},
+                {"created_at": datetime.now(), "_id": {"$lt": ObjectId()}},
+            ]}).sort([("created_at", -1), ("_id", -1)]).limit(21),
+            # save_version's reads (see Database._write_version).
+            versions.find({"email": "a@x.com"}, {"hash": 1}).sort([("created_at", -1), ("_id", -1)]).limit(1),
+            versions.find({"email": "a@x.com", "protected": False, "seq": {"$exists": True}},
+                          {"seq": 1, "snapshot_z": 1}).sort("seq", -1).limit(1),
+            versions.find({"email": "a@x.com", "protected": False, "seq": {"$exists": True}},
+                          {"_id": 1}).sort("seq", -1).skip(29).limit(100),
+            versions.find({"email": "a@x.com", "protected": False, "seq": {"$exists": False}},
+                          {"_id": 1}).sort([("created_at", -1), ("_id", -1)]).skip(28).limit(100),
+            versions.find({"email": "a@x.com", "protected": False, "seq": {"$gt": 1}}).sort("seq", 1).limit(10),
+            versions.find({"_id": ObjectId(), "email": "a@x.com"}),
+            artifacts.find({"_id": "t:v"}),
+            artifacts.find({"token": "t", "_id": {"$nin": ["t:v"]}}),
+        ]
+        for cursor in queries:
+            plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+            stages = set(_stages(plan))
+            assert "COLLSCAN" not in stages, plan
+            assert stages & {"IXSCAN", "IDHACK", "EXPRESS_IXSCAN", "EXPRESS_IDHACK"}, plan
+            assert "SORT" not in stages, plan  # sorts come from the index too
+
+    _run(test)
@@ -0,0 +1,53 @@
+import asyncio
+import re
+
+from app.api.routes import improve_bullet as ib
+
+
+def _batch(*bullets, jd=""):
+    return ib.BulletBatch(bullets=[ib.BulletIn(bullet=b) for b in bullets], jd=jd)
+
+
+def _fake_model(monkeypatch, answer):
+    prompts = []
+
+    async def fake(prompt, **kwargs):
+        prompts.append(prompt)
+        return answer(prompt)
+
+    monkeypatch.setattr(ib, "generate_json_async", fake)
+    return prompts
+
+
+def _numbered(prompt):
+    return re.findall(r"^\d+\. (.+)$", prompt, re.M)
+
+
+def test_results_align_with_input(monkeypatch):
+    prompts = _fake_model(monkeypatch, lambda p: {"improved": [f'"Led {b}"' for b in _numbered(p)]})
+    result = asyncio.run(ib.improve_bullets(_batch("a", "", "b"), request=None))
+    assert len(prompts) == 1
+    assert result == {"improved": ["Led a", "", "Led b"], "unchanged": [1]}
+
+
+def test_unusable_items_keep_their_original(monkeypatch):
+    _fake_model(monkeypatch, lambda p: {"improved": ['""', None, "Led three"]})
+    result = asyncio.run(ib.improve_bullets(_batch("one", "two", "three"), request=None))
+    assert result == {"improved": ["one", "two", "Led three"], "unchanged": [0, 1]}
+
+
+def test_a_miscounted_answer_is_not_misaligned(monkeypatch):
+    # The model merged the first two bullets: positions no longer line up.
+    _fake_model(monkeypatch, lambda p: {"improved": ["Led one and two", "Led three"]})
+    result = asyncio.run(ib.improve_bullets(_batch("one", "two", "three"), request=None))
+    assert result == {"improved": ["one", "two", "three"], "unchanged": [0, 1, 2]}
+
+
+def test_bullets_are_packed_under_the_token_budget(monkeypatch):
+    monkeypatch.setattr(ib, "BATCH_TOKEN_BUDGET", ib.estimate_tokens(ib.BATCH_PROMPT) + 150)
+    prompts = _fake_model(monkeypatch, lambda p: {"improved": ["ok"] * len(_numbered(p))})
+    bullets = [f"bullet {i} " + "x" * 200 for i in range(6)]
+    result = asyncio.run(ib.improve_bullets(_batch(*bullets), request=None))
+    assert 1 < len(prompts) < 6
+    assert sum(len(_numbered(p)) for p in prompts) == 6
+    assert result["improved"] == ["ok"] * 6
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from app.jsonpatch import PatchError, apply, diff
+
+
+def test_small_edit_gives_small_patch():
+    a = {"sections": [{"items": ["one", "two", "three"]}, {"title": "Skills"}]}
+    b = {"sections": [{"items": ["one", "two!", "three"]}, {"title": "Skills"}]}
+    assert diff(a, b) == [{"op": "replace", "path": "/sections/0/items/1", "value": "two!"}]
+
+
+def test_insert_in_the_middle_does_not_shift_everything():
+    a = list("abcdefgh")
+    b = list("abcXdefgh")
+    assert diff(a, b) == [{"op": "add", "path": "/3", "value": "X"}]
+    assert diff(b, a) == [{"op": "remove", "path": "/3"}]
+
+
+def test_keys_with_special_characters_round_trip():
+    a = {"a/b": 1, "c~d": [1]}
+    b = {"a/b": 2, "c~d": [1, 2], "new": None}
+    assert apply(a, diff(a, b)) == b
+
+
+def _mutate(value, rng):
+    if isinstance(value, dict) and value and rng.random() < 0.7:
+        key = rng.choice(list(value))
+        return {**value, key: _mutate(value[key], rng)} if rng.random() < 0.8 else \
+            {k: v for k, v in value.items() if k != key}
+    if isinstance(value, list) and value and rng.random() < 0.7:
+        i = rng.randrange(len(value))
+        roll = rng.random()
+        if roll < 0.5:
+            return value[:i] + [_mutate(value[i], rng)] + value[i + 1:]
+        if roll < 0.75:
+            return value[:i] + value[i + 1:]
+        return value[:i] + [rng.choice(["x", 1, {"k": "v"}, []])] + value[i:]
+    return rng.choice(["text", 42, None, True, [1, 2], {"n": {"m": 1}}])
+
+
+def test_diff_then_apply_round_trips_random_documents():
+    rng = random.Random(3)
+    doc = {"name": "Jane", "sections": [{"items": ["a", "b", {"k": [1, 2]}]}, {"t": "x"}]}
+    for _ in range(300):
+        new = _mutate(doc, rng)
+        assert apply(doc, diff(doc, new)) == new
+        doc = new
+
+
+def test_rfc6902_move_copy_and_test():
+    doc = {"a": [1, 2], "b": {}}
+    ops = [
+        {"op": "test", "path": "/a/0", "value": 1},
+        {"op": "copy", "from": "/a", "path": "/b/c"},
+        {"op": "move", "from": "/a/1", "path": "/a/-"},
+        {"op": "add", "path": "/a/-", "value": 3},
+    ]
+    assert apply(doc, ops) == {"a": [1, 2, 3], "b": {"c": [1, 2]}}
+    assert doc == {"a": [1, 2], "b": {}}  # input untouched
+
+
+@pytest.mark.parametrize("ops", [
+    [{"op": "test", "path": "/a", "value": 2}],
+    [{"op": "remove", "path": "/missing"}],
+    [{"op": "replace", "path": "/a/0", "value": 1}],
+    [{"op": "add", "path": "/list/5", "value": 1}],
+    [{"op": "add", "path": "/list/\u00b2", "value": 1}],  # "²" is a digit, but not an index
+    [{"op": "test", "path": "/a", "value": True}],
+    [{"op": "frobnicate", "path": "/a"}],
+])
+def test_invalid_operations_raise(ops):
+    with pytest.raises(PatchError):
+        apply({"a": 1, "list": []}, ops)
+
+
+def test_diff_tells_booleans_from_numbers():
+    assert diff({"a": True, "b": [0]}, {"a": 1, "b": [False]}) == [
+        {"op": "replace", "path": "/a", "value": 1},
+        {"op": "replace", "path": "/b/0", "value": False},
+    ]
@@ -1,5 +1,8 @@
+import asyncio
+
 import pytest
 
+from app import llm
 from app.llm import _extract_json
 
 
@@ -24,3 +27,171 @@ def test_empty_response_raises():
 def test_no_json_object_raises():
     with pytest.raises(ValueError):
         _extract_json("Sorry, I cannot help with that.")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_llm_state(monkeypatch):
+    monkeypatch.setattr(llm, "response_cache", llm.ResponseCache(persist=False))
+    monkeypatch.setattr(llm, "_breakers", {})
+
+
+def _fake_providers(monkeypatch, *fns):
+    monkeypatch.setattr(llm, "_providers", lambda kind: [(f"P{i}", fn) for i, fn in enumerate(fns)])
+
+
+def test_async_json_falls_back_to_next_provider(monkeypatch):
+    async def broken(prompt):
+        raise RuntimeError("429 quota")
+
+    async def ok(prompt):
+        return '{"ok": true}'
+
+    _fake_providers(monkeypatch, broken, ok)
+    assert asyncio.run(llm.generate_json_async("p")) == {"ok": True}
+
+
+def test_async_timeout_moves_on(monkeypatch):
+    async def hangs(prompt):
+        await asyncio.sleep(5)
+
+    async def ok(prompt):
+        return " done "
+
+    _fake_providers(monkeypatch, hangs, ok)
+    assert asyncio.run(llm.generate_text_async("p", timeout=0.05)) == "done"
+
+
+def test_async_all_fail_raises(monkeypatch):
+    async def hangs(prompt):
+        await asyncio.sleep(5)
+
+    _fake_providers(monkeypatch, hangs)
+    with pytest.raises(RuntimeError, match="All LLM providers failed"):
+        asyncio.run(llm.generate_text_async("p", timeout=0.05))
+
+
+def test_disconnect_cancels_call(monkeypatch):
+    cancelled = []
+
+    async def slow(prompt):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    class GoneRequest:
+        async def is_disconnected(self):
+            return True
+
+    _fake_providers(monkeypatch, slow)
+    monkeypatch.setattr(llm, "DISCONNECT_POLL_SECONDS", 0.01)
+    with pytest.raises(llm.ClientDisconnected):
+        asyncio.run(llm.generate_text_async("p", request=GoneRequest()))
+    assert cancelled == [True]
+
+
+def test_cached_answer_skips_providers_unless_regenerating(monkeypatch):
+    calls = []
+
+    async def counting(prompt):
+        calls.append(prompt)
+        return f'{{"n": {len(calls)}}}'
+
+    _fake_providers(monkeypatch, counting)
+    assert asyncio.run(llm.generate_json_async("same   prompt")) == {"n": 1}
+    # Whitespace-only differences normalize to the same key.
+    assert asyncio.run(llm.generate_json_async("same prompt")) == {"n": 1}
+    assert asyncio.run(llm.generate_json_async("same prompt", cache=False)) == {"n": 2}
+    assert asyncio.run(llm.generate_json_async("same prompt")) == {"n": 2}
+    assert len(calls) == 2
+
+
+async def _collect(agen):
+    return [chunk async for chunk in agen]
+
+
+def test_stream_falls_back_before_first_chunk(monkeypatch):
+    async def broken(prompt):
+        raise RuntimeError("429 quota")
+        yield  # pragma: no cover - makes this an async generator
+
+    async def ok(prompt):
+        for part in ("Dear ", "team"):
+            yield part
+
+    _fake_providers(monkeypatch, broken, ok)
+    assert asyncio.run(_collect(llm.stream_text("p"))) == ["Dear ", "team"]
+    # The completed letter is cached and replayed in one piece.
+    assert asyncio.run(_collect(llm.stream_text("p"))) == ["Dear team"]
+
+
+def test_empty_stream_is_not_cached(monkeypatch):
+    answers = iter([[], ["Dear ", "team"]])
+
+    async def provider(prompt):
+        for part in next(answers):
+            yield part
+
+    _fake_providers(monkeypatch, provider)
+    assert asyncio.run(_collect(llm.stream_text("p"))) == []
+    assert asyncio.run(_collect(llm.stream_text("p"))) == ["Dear ", "team"]
+
+
+def test_stream_failure_after_first_chunk_is_raised(monkeypatch):
+    async def flaky(prompt):
+        yield "Dear "
+        raise RuntimeError("connection reset")
+
+    async def never_used(prompt):
+        yield "other"
+
+    _fake_providers(monkeypatch, flaky, never_used)
+    with pytest.raises(RuntimeError, match="connection reset"):
+        asyncio.run(_collect(llm.stream_text("p")))
+
+
+class _QuotaError(Exception):
+    class response:
+        headers = {"retry-after": "30"}
+
+
+def test_breaker_skips_provider_after_repeated_failures(monkeypatch):
+    calls = []
+
+    async def broken(prompt):
+        calls.append(prompt)
+        raise RuntimeError("503 unavailable")
+
+    async def ok(prompt):
+        return "fine"
+
+    _fake_providers(monkeypatch, broken, ok)
+    for i in range(llm.LLM_BREAKER_THRESHOLD + 2):
+        assert asyncio.run(llm.generate_text_async(f"p{i}")) == "fine"
+    assert len(calls) == llm.LLM_BREAKER_THRESHOLD
+    stats = llm.breaker_stats()["P0"]
+    assert stats["state"] == "open"
+    assert stats["trips"] == 1
+
+
+def test_breaker_honors_retry_after_and_half_open_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm.time, "monotonic", lambda: now[0])
+    breaker = llm.CircuitBreaker(threshold=5, cooldown=10)
+
+    breaker.failure(_QuotaError("429"))
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    now[0] += 31
+    assert breaker.allow()  # the half-open probe
+    assert not breaker.allow()  # everyone else waits for its verdict
+    breaker.failure(RuntimeError("still down"))
+    assert breaker.state == "open"
+
+    now[0] += 11
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["trips"] == 2
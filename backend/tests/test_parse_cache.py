@@ -0,0 +1,82 @@
+import asyncio
+import io
+
+from fastapi import Response, UploadFile
+
+from app.api.routes import resume as rs
+
+
+def _upload(data=b"%PDF-1.4 resume", name="cv.pdf"):
+    return UploadFile(io.BytesIO(data), filename=name)
+
+
+def _fakes(monkeypatch):
+    calls = {"extract": 0, "model": 0}
+
+    async def fake_extract(data, ext):
+        calls["extract"] += 1
+        return "Jane Doe\nEngineer"
+
+    async def fake_model(prompt, **kwargs):
+        calls["model"] += 1
+        return {"name": "Jane Doe", "sections": []}
+
+    monkeypatch.setattr(rs, "extract_upload_text", fake_extract)
+    monkeypatch.setattr(rs, "generate_json_async", fake_model)
+    monkeypatch.setattr(rs, "parse_cache", rs.ParseCache(persist=False))
+    return calls
+
+
+def test_reupload_skips_extraction_and_model(monkeypatch):
+    calls = _fakes(monkeypatch)
+    first = asyncio.run(rs.parse_resume(request=None, response=Response(), mode="llm", file=_upload()))
+    second = asyncio.run(rs.parse_resume(request=None, response=Response(), mode="llm", file=_upload()))
+    assert first == second == {"name": "Jane Doe", "sections": []}
+    assert calls == {"extract": 1, "model": 1}
+
+
+def test_regenerate_reuses_text_but_calls_the_model(monkeypatch):
+    calls = _fakes(monkeypatch)
+    asyncio.run(rs.parse_resume(request=None, response=Response(), mode="llm", file=_upload()))
+    asyncio.run(rs.parse_resume(request=None, response=Response(), mode="llm", file=_upload(), regenerate=True))
+    assert calls == {"extract": 1, "model": 2}
+
+
+def test_different_bytes_are_a_miss(monkeypatch):
+    calls = _fakes(monkeypatch)
+    asyncio.run(rs.parse_resume(request=None, response=Response(), mode="llm", file=_upload()))
+    asyncio.run(rs.parse_resume(request=None, response=Response(), mode="llm", file=_upload(b"%PDF-1.4 other")))
+    assert calls == {"extract": 2, "model": 2}
+
+
+def test_failed_fragment_call_is_not_cached(monkeypatch):
+    calls = _fakes(monkeypatch)
+    text = "Jane Doe\n\nEXPERIENCE\nEngineer | Acme  2020 - Present\n• Shipped\n\nVOLUNTEERING\nTaught kids."
+
+    async def fake_extract(data, ext):
+        return text
+
+    answers = iter([RuntimeError("All LLM providers failed."),
+                    {"sections": [{"fragment": 1, "type": "paragraph", "title": "Volunteering",
+                                   "content": "Taught kids to code."}]}])
+
+    async def flaky_model(prompt, **kwargs):
+        calls["model"] += 1
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(rs, "extract_upload_text", fake_extract)
+    monkeypatch.setattr(rs, "generate_json_async", flaky_model)
+
+    response = Response()
+    first = asyncio.run(rs.parse_resume(request=None, response=response, mode="auto", file=_upload()))
+    assert response.headers["X-Unresolved-Sections"] == "1"
+    assert first["sections"][1]["content"] == "Taught kids."
+
+    response = Response()
+    second = asyncio.run(rs.parse_resume(request=None, response=response, mode="auto", file=_upload()))
+    assert "X-Unresolved-Sections" not in response.headers
+    assert second["sections"][1]["content"] == "Taught kids to code."
+    assert calls["model"] == 2
@@ -1,5 +1,8 @@
+import asyncio
+
 from fastapi.testclient import TestClient
 
+from app import pdf
 from app.main import app
 
 client = TestClient(app)
@@ -27,3 +30,24 @@ def test_parse_resume_rejects_bad_extension():
         files={"file": ("resume.txt", b"hello", "text/plain")},
     )
     assert resp.status_code == 400
+
+
+def test_cancelled_first_caller_does_not_fail_the_others():
+    runs = 0
+
+    async def make():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+        return b"%PDF"
+
+    async def main():
+        first = asyncio.create_task(pdf._single_flight("k", make))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(pdf._single_flight("k", make)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == [b"%PDF"] * 3
+    assert runs == 1 and pdf._inflight == {}
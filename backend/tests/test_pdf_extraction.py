@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import text_extraction as te
+from app.workers import CpuPool
+
+
+def _pdf(pages: list[str]) -> bytes:
+    """A minimal PDF with one line of Helvetica text per page ("" = no text)."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET" if text else "0 0 m 10 10 l S"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out, offsets = b"%PDF-1.4\n", []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+@pytest.fixture(autouse=True)
+def _inline_workers(monkeypatch):
+    jobs = []
+
+    async def run_inline(fn, *args, **kwargs):
+        jobs.append(args[1:])
+        return fn(*args)
+
+    monkeypatch.setattr(te, "run_cpu", run_inline)
+    monkeypatch.setattr(te, "cpu_pool", CpuPool(workers=3))
+    return jobs
+
+
+def test_parallel_extraction_matches_a_single_pass(_inline_workers):
+    data = _pdf([f"Page {i} text" for i in range(5)])
+    text = asyncio.run(te.extract_upload_text(data, "pdf"))
+    assert text == te.extract_pdf_text(data)
+    assert [t.strip() for t in text.split("\f")[:5]] == [f"Page {i} text" for i in range(5)]
+    # One probe plus one job per worker: pages [0, 1], [2, 3], [4].
+    assert _inline_workers[1:] == [(range(0, 2),), (range(2, 4),), (range(4, 5),)]
+
+
+def test_image_only_pdf_fails_fast(_inline_workers):
+    data = _pdf(["", "", "", "late text"])
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(te.extract_upload_text(data, "pdf"))
+    assert exc.value.status_code == 400
+    assert "No extractable text" in exc.value.detail
+    assert len(_inline_workers) == 1  # only the probe ran
+
+
+def test_probe_counts_pages():
+    assert te.probe_pdf(_pdf(["a", "", "b"])) == (3, True)
+    assert te.probe_pdf(_pdf(["", ""])) == (2, False)
@@ -0,0 +1,48 @@
+import random
+
+from app.phrase_match import PhraseMatcher
+
+
+def _all_positions(text: str, phrase: str) -> list[int]:
+    out, i = [], text.find(phrase)
+    while i != -1:
+        out.append(i)
+        i = text.find(phrase, i + 1)
+    return out
+
+
+def test_finds_every_position_including_prefixes_and_overlaps():
+    text = "senior software developer, software dev (a.b) aaa"
+    phrases = ["software", "software developer", "ware", "dev", "a.b", "aa"]
+    hits = PhraseMatcher(phrases).scan(text)
+    for p in phrases:
+        assert hits[p] == _all_positions(text, p)
+
+
+def test_missing_phrase_has_no_positions():
+    hits = PhraseMatcher(["python", "rust"]).scan("python and go")
+    assert hits == {"python": [0], "rust": []}
+
+
+def test_empty_phrase_set():
+    assert PhraseMatcher([]).scan("anything") == {}
+
+
+def test_matches_find_on_random_text():
+    rng = random.Random(7)
+    words = ["ab", "abc", "b", "ca", "cab", "bca"]
+    text = " ".join(rng.choice(words) for _ in range(300))
+    phrases = {" ".join(rng.choice(words) for _ in range(rng.randint(1, 3))) for _ in range(60)}
+    hits = PhraseMatcher(phrases).scan(text)
+    for p in phrases:
+        assert hits[p] == _all_positions(text, p)
+
+
+def test_long_phrases_are_matched_too():
+    bullet = "Led the migration of " + "legacy billing services " * 42  # ~1,000 characters
+    text = f"{bullet} and {bullet}"
+    hits = PhraseMatcher([bullet, "Led the migration", bullet + "!"]).scan(text)
+    assert len(bullet) >= 1000
+    assert hits[bullet] == _all_positions(text, bullet)
+    assert hits["Led the migration"] == _all_positions(text, "Led the migration")
+    assert hits[bullet + "!"] == []
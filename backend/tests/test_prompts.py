@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from app import prompts
+
+FMT = {"alignment": "left", "font_size": 14, "font_weight": "normal"}
+SECTION = {"type": "experience", "title": "Experience", "content": "", "title_formatting": FMT,
+           "content_formatting": FMT, "items": [
+               {"position": "Dev", "company": "Acme", "start_month": "", "end_type": "None",
+                "bullet_points": ["Built APIs", "Led a team"]},
+           ]}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_stats(monkeypatch):
+    monkeypatch.setattr(prompts, "_stats", type(prompts._stats)(prompts._stats.default_factory))
+
+
+def test_compact_drops_presentation_and_empty_fields():
+    assert json.loads(prompts.compact(SECTION)) == {
+        "type": "experience", "title": "Experience", "items": [
+            {"position": "Dev", "company": "Acme", "end_type": "None", "bullet_points": ["Built APIs", "Led a team"]},
+        ]}
+
+
+def test_restore_puts_stripped_fields_back():
+    answer = {"type": "experience", "title": "Work", "items": [
+        {"position": "Senior Dev", "company": "Acme", "bullet_points": ["Built fast APIs"]},
+    ]}
+    restored = prompts.restore(SECTION, answer)
+    assert restored["title"] == "Work"
+    assert restored["title_formatting"] == FMT and restored["content"] == ""
+    item = restored["items"][0]
+    assert item["position"] == "Senior Dev" and item["start_month"] == ""
+    assert item["bullet_points"] == ["Built fast APIs"]
+
+
+def test_build_trims_background_in_priority_order_and_records_savings():
+    resume = {"name": "Jane", "formatting": {"x": 1}, "sections": [
+        {"type": "experience", "title": "Experience", "title_formatting": FMT, "items": [
+            {"position": f"Job {i}", "bullet_points": [f"bullet {i}.{j} " + "x" * 60 for j in range(8)]}
+            for i in range(5)
+        ]},
+        {"type": "bullet_points", "title": "Skills", "items": ["Python"] * 50},
+    ]}
+    template = "Write a letter.\n{jd}\n{resume}"
+    untrimmed = prompts.build("letter", template, budget=10_000, jd="JD", resume=resume)
+    prompt = prompts.build("letter", template, budget=250, trim=("resume",), jd="JD", resume=resume)
+
+    assert prompts.estimate_tokens(prompt) < prompts.estimate_tokens(untrimmed)
+    sent = json.loads(prompt.split("\n", 2)[2])
+    jobs = sent["sections"][0]["items"]
+    # Bullets were cut and old entries dropped before the experience section
+    # itself could go; the skills list was dropped last.
+    assert len(jobs) == 3 and all(len(j["bullet_points"]) <= 2 for j in jobs)
+    assert [s["title"] for s in sent["sections"]] == ["Experience"]
+
+    stats = prompts.token_stats()["letter"]
+    assert stats["calls"] == 2 and stats["trimmed"] == 1
+    assert stats["tokens"] < stats["baseline_tokens"]
+
+
+def test_untrimmable_fields_are_never_altered():
+    section = {"type": "paragraph", "content": "y" * 4000}
+    prompt = prompts.build("rewrite", "{jd}\n{section}", budget=100, clip=("jd",), jd="j" * 4000, section=section)
+    assert "y" * 4000 in prompt
+    assert "j" * 4000 not in prompt
@@ -0,0 +1,48 @@
+import asyncio
+
+from app.api.routes import proofread as pr
+
+
+def _resume(*bullets):
+    return {"sections": [{"type": "experience", "items": [{"bullet_points": list(bullets)}]}]}
+
+
+def _fake_model(monkeypatch, answer):
+    prompts = []
+
+    async def fake(prompt, **kwargs):
+        prompts.append(prompt)
+        return answer(prompt)
+
+    monkeypatch.setattr(pr, "generate_json_async", fake)
+    monkeypatch.setattr(pr, "_fragment_cache", pr.LRUCache(max_items=100))
+    return prompts
+
+
+def test_only_changed_fragments_are_sent(monkeypatch):
+    prompts = _fake_model(monkeypatch, lambda p: {"issues": []})
+    asyncio.run(pr.proofread(_resume("Built a API", "Led the team"), request=None))
+    asyncio.run(pr.proofread(_resume("Built an API", "Led the team"), request=None))
+    assert len(prompts) == 2
+    assert "Built an API" in prompts[1]
+    assert "Led the team" not in prompts[1]
+
+
+def test_issues_map_back_to_their_fragment(monkeypatch):
+    _fake_model(monkeypatch, lambda p: {"issues": [
+        {"fragment": 2, "original": "teh", "suggestion": "the", "reason": "typo"},
+        # Wrong fragment number, but the snippet exists in fragment 1.
+        {"fragment": 2, "original": "a API", "suggestion": "an API"},
+        # Not in the text at all: dropped.
+        {"fragment": 1, "original": "nonexistent", "suggestion": "x"},
+    ]})
+    result = asyncio.run(pr.proofread(_resume("Built a API", "Led teh team"), request=None))
+    assert [(i["fragment"], i["original"]) for i in result["issues"]] == [(0, "a API"), (1, "teh")]
+
+
+def test_large_resumes_are_chunked(monkeypatch):
+    prompts = _fake_model(monkeypatch, lambda p: {"issues": []})
+    bullets = [f"Bullet number {i} " + "x" * 200 for i in range(40)]
+    asyncio.run(pr.proofread(_resume(*bullets), request=None))
+    assert len(prompts) > 1
+    assert sum(p.count("Bullet number") for p in prompts) == 40
@@ -0,0 +1,79 @@
+import copy
+import time
+
+from app.resume_diff import diff_resumes
+
+
+def _resume(n_jobs: int = 3, n_bullets: int = 4) -> dict:
+    return {
+        "name": "Jane Doe",
+        "sections": [
+            {"type": "paragraph", "title": "Summary", "content": "Engineer.", "items": []},
+            {"type": "experience", "title": "Experience", "content": "", "items": [
+                {"title": "Engineer", "subtitle": f"Co {i}", "start_year": str(2015 + i),
+                 "bullet_points": [f"Did thing {i}.{b}" for b in range(n_bullets)]}
+                for i in range(n_jobs)
+            ]},
+            {"type": "bullet_points", "title": "Skills", "content": "", "items": ["Python", "Go"]},
+        ],
+    }
+
+
+def test_identical_resumes_have_no_changes():
+    old = _resume()
+    assert diff_resumes(old, copy.deepcopy(old)) == {"fields": {}, "sections": [], "unchanged_sections": 3}
+
+
+def test_bullet_level_changes():
+    old = _resume()
+    new = copy.deepcopy(old)
+    bullets = new["sections"][1]["items"][1]["bullet_points"]
+    bullets.insert(1, "Shipped it.")
+    bullets[3] = "Did thing 1.2, faster."
+    new["sections"][1]["items"][2]["start_year"] = "2018"
+    new["name"] = "Jane D"
+
+    diff = diff_resumes(old, new)
+    assert diff["fields"] == {"name": {"old": "Jane Doe", "new": "Jane D"}}
+    assert diff["unchanged_sections"] == 2
+    [section] = diff["sections"]
+    assert section["status"] == "changed" and section["title"] == "Experience"
+    assert section["fields"] == {}
+    job1, job2 = section["items"]
+    assert job1["bullets"] == [
+        {"status": "added", "new_index": 1, "text": "Shipped it."},
+        {"status": "changed", "old_index": 2, "new_index": 3,
+         "old": "Did thing 1.2", "new": "Did thing 1.2, faster."},
+    ]
+    assert job2["fields"] == {"start_year": {"old": "2017", "new": "2018"}} and job2["bullets"] == []
+
+
+def test_section_added_removed_and_moved():
+    old = _resume()
+    new = copy.deepcopy(old)
+    new["sections"] = [
+        {"type": "education", "title": "Education", "items": []},
+        new["sections"][2], new["sections"][1],  # summary removed, skills moved up
+    ]
+    statuses = {(c["status"], c["title"]) for c in diff_resumes(old, new)["sections"]}
+    assert statuses == {("added", "Education"), ("removed", "Summary"), ("moved", "Skills")}
+
+
+def test_plain_bullet_items_and_renamed_sections():
+    old = _resume()
+    new = copy.deepcopy(old)
+    new["sections"][2]["title"] = "Technical skills"
+    new["sections"][2]["items"] = ["Python", "Rust", "Go"]
+    [section] = diff_resumes(old, new)["sections"]
+    assert section["fields"] == {"title": {"old": "Skills", "new": "Technical skills"}}
+    assert section["items"] == [{"status": "added", "new_index": 1, "value": "Rust"}]
+
+
+def test_large_resume_diffs_quickly():
+    old = _resume(n_jobs=40, n_bullets=12)
+    new = copy.deepcopy(old)
+    new["sections"][1]["items"][20]["bullet_points"][5] += " (edited)"
+    t0 = time.perf_counter()
+    diff = diff_resumes(old, new)
+    assert time.perf_counter() - t0 < 0.1
+    assert len(diff["sections"][0]["items"]) == 1
@@ -0,0 +1,42 @@
+from app.resume_html import format_date_range, render_public_page, render_resume_html
+
+
+def test_date_ranges():
+    assert format_date_range({"start_month": "March", "start_year": "2022", "end_type": "Present"}) == \
+        "March 2022 - Present"
+    assert format_date_range({"start_year": "2020", "end_type": "Specific Month", "end_year": "2023"}) == \
+        "2020 - 2023"
+    assert format_date_range({"start_month": "May", "start_year": "2025", "end_type": "None"}) == "May 2025"
+    assert format_date_range({"start_year": "None"}) == ""
+
+
+def test_sections_render_and_content_is_escaped():
+    html = render_resume_html({
+        "name": "Jane <script>",
+        "contact_info": "jane@x.com | https://janedoe.dev",
+        "sections": [
+            {"type": "paragraph", "title": "Summary", "content": "A & B"},
+            {"type": "experience", "title": "Experience", "items": [
+                {"position": "Engineer", "company": "Acme", "start_year": "2020", "end_type": "Present",
+                 "bullet_points": ["Shipped <things>", "  "]},
+            ]},
+            {"type": "project", "title": "Projects", "items": [
+                {"name": "Site", "github": "github.com/jane/site", "tech": "Next.js", "bullet_points": []},
+            ]},
+            {"type": "unknown", "title": "Ignored"},
+        ],
+    }, "modern")
+    assert "Jane &lt;script&gt;" in html and "<script>" not in html
+    assert '<a href="https://janedoe.dev" target="_blank"' in html
+    assert '<p class="para">A &amp; B</p>' in html
+    assert '<span class="org">, Acme</span><span class="dates">2020 - Present</span>' in html
+    assert "<li>Shipped &lt;things&gt;</li></ul>" in html and "<li>  </li>" not in html
+    assert 'href="https://github.com/jane/site"' in html and "Stack: Next.js" in html
+    assert "Ignored" not in html
+    assert "#2563eb" in html  # modern template CSS
+
+
+def test_unknown_template_falls_back_and_page_is_standalone():
+    page = render_public_page({"name": "Jane", "template": "nope", "sections": []})
+    assert page.startswith("<!DOCTYPE html>") and "<title>Jane – Resume</title>" in page
+    assert "Arial, Helvetica" in page  # original template
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from app.api.routes import resume as rs
+from app.resume_parser import date_fields, merge_resolved, parse_resume_text
+
+RESUME = """JANE DOE
+Senior Software Engineer
+jane.doe@example.com | +1 (555) 123-4567 | linkedin.com/in/janedoe
+
+SUMMARY
+Backend engineer with 8 years of experience building
+distributed systems.
+
+EXPERIENCE
+Senior Software Engineer | Acme Corp 03/2022 - Present
+• Led the billing migration, reducing
+incidents by 40%
+Software Engineer, Globex  Jan 2019 – Feb 2022
+• Shipped the search API
+
+PROJECTS
+Resume Builder | React, FastAPI  2023
+• Built a resume editor
+Stack: Python, Mongo
+
+EDUCATION
+B.S. Computer Science, Stanford University  2014 - 2018
+
+TECHNICAL SKILLS
+Languages: Python, Go | TypeScript
+
+VOLUNTEERING
+Taught kids to code on weekends.
+"""
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("03/2022 - Present", ("March", "2022", "", "", "Present")),
+    ("03/2022 - 03/2023", ("March", "2022", "March", "2023", "Specific Month")),
+    ("2020 - 2023", ("", "2020", "", "2023", "Specific Month")),
+    ("May 2025", ("May", "2025", "", "", "None")),
+    ("Sept. 2019 to current", ("September", "2019", "", "", "Present")),
+    ("no date here", ("", "", "", "", "None")),
+])
+def test_date_normalization_follows_the_prompt(text, expected):
+    f = date_fields(text)
+    assert (f["start_month"], f["start_year"], f["end_month"], f["end_year"], f["end_type"]) == expected
+
+
+def test_parses_header_and_known_sections():
+    resume, unresolved = parse_resume_text(RESUME)
+    assert resume["name"] == "JANE DOE"
+    assert resume["title"] == "Senior Software Engineer"
+    assert resume["contact_info"] == "jane.doe@example.com | +1 (555) 123-4567 | linkedin.com/in/janedoe"
+    types = [s["type"] for s in resume["sections"]]
+    assert types == ["paragraph", "experience", "project", "education", "bullet_points", "paragraph"]
+
+    jobs = resume["sections"][1]["items"]
+    assert [(j["position"], j["company"], j["end_type"]) for j in jobs] == [
+        ("Senior Software Engineer", "Acme Corp", "Present"),
+        ("Software Engineer", "Globex", "Specific Month"),
+    ]
+    assert jobs[0]["bullet_points"] == ["Led the billing migration, reducing incidents by 40%"]
+    project = resume["sections"][2]["items"][0]
+    assert (project["name"], project["tech"], project["start_year"]) == ("Resume Builder", "Python, Mongo", "2023")
+    school = resume["sections"][3]["items"][0]
+    assert (school["degree"], school["institution"]) == ("B.S. Computer Science", "Stanford University")
+    assert resume["sections"][4]["items"] == ["Languages: Python, Go, TypeScript"]
+
+    assert unresolved == [{"index": 5, "title": "VOLUNTEERING", "text": "Taught kids to code on weekends."}]
+
+
+def test_repeated_heading_keeps_all_of_its_content():
+    text = RESUME + "\nPROJECTS\nGadget | Go  2021\n• Made gadget\n\nVOLUNTEERING\nMentored interns.\n"
+    resume, unresolved = parse_resume_text(text)
+    assert [s["title"] for s in resume["sections"]].count("PROJECTS") == 1
+    projects = next(s for s in resume["sections"] if s["title"] == "PROJECTS")["items"]
+    assert [p["name"] for p in projects] == ["Resume Builder", "Gadget"]
+    assert projects[1]["bullet_points"] == ["Made gadget"]
+    # An unparsed section that repeats goes to the model as one fragment.
+    assert unresolved[-1]["text"] == "Taught kids to code on weekends.\nMentored interns."
+
+
+def test_scrambled_skill_columns_are_left_to_the_model():
+    _, unresolved = parse_resume_text("Jane\n\nSKILLS\nBackend:\nFrontend:\nPython, Go\nReact")
+    assert [u["title"] for u in unresolved] == ["SKILLS"]
+
+
+def test_merge_replaces_placeholders_in_order():
+    resume, unresolved = parse_resume_text(RESUME)
+    merged = merge_resolved(resume, unresolved, [
+        {"fragment": 1, "type": "bullet_points", "title": "Volunteering", "items": ["Taught kids to code"]},
+        {"fragment": 9, "type": "paragraph", "content": "ignored"},
+    ])
+    assert merged["sections"][5]["type"] == "bullet_points"
+    assert merged["sections"][5]["content_formatting"]["font_size"] == 14
+    assert len(merged["sections"]) == 6
+
+
+def _fake_model(monkeypatch, answer):
+    prompts = []
+
+    async def fake(prompt, **kwargs):
+        prompts.append(prompt)
+        return answer
+
+    monkeypatch.setattr(rs, "generate_json_async", fake)
+    monkeypatch.setattr(rs, "parse_cache", rs.ParseCache(persist=False))
+    return prompts
+
+
+def test_hybrid_sends_only_unresolved_fragments(monkeypatch):
+    prompts = _fake_model(monkeypatch, {"sections": [
+        {"fragment": 1, "type": "paragraph", "title": "Volunteering", "content": "Taught kids."},
+    ]})
+    parsed, failed = asyncio.run(rs._parse_hybrid(RESUME, request=None, regenerate=False, local_only=False))
+    assert len(prompts) == 1 and failed == []
+    assert "Taught kids to code" in prompts[0]
+    assert "Acme Corp" not in prompts[0]
+    assert parsed["sections"][5]["content"] == "Taught kids."
+
+
+def test_local_only_never_calls_the_model(monkeypatch):
+    prompts = _fake_model(monkeypatch, {})
+    parsed, _ = asyncio.run(rs._parse_hybrid(RESUME, request=None, regenerate=False, local_only=True))
+    assert prompts == []
+    assert parsed["sections"][5]["content"] == "Taught kids to code on weekends."
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.api.routes import rewrite_resume as rr
+
+RESUME = {
+    "name": "Jane",
+    "sections": [
+        {"type": "paragraph", "title": "Summary", "content": "Engineer.", "items": [],
+         "title_formatting": {"font_size": 16}},
+        {"type": "experience", "title": "Experience", "content": "", "items": [
+            {"position": "Dev", "company": "Acme", "start_year": "2020", "end_type": "Present",
+             "bullet_points": ["Built things"]},
+        ]},
+        {"type": "bullet_points", "title": "Skills", "content": "", "items": ["Python"]},
+    ],
+}
+
+
+def _fake_model(monkeypatch, answer, delay=0.0):
+    async def fake(prompt, **kwargs):
+        await asyncio.sleep(delay)
+        return answer(prompt)
+
+    monkeypatch.setattr(rr, "generate_json_async", fake)
+
+
+def _rewrite(resume=RESUME):
+    response = Response()
+    result = asyncio.run(rr.rewrite_resume_ai(request=None, response=response, jd="Go role",
+                                              resume=resume))
+    return result, response.headers.get("X-Unchanged-Sections")
+
+
+def _answer(prompt):
+    if "Summary" in prompt:
+        return {"type": "paragraph", "title": "Summary", "content": "Go engineer.", "items": []}
+    if "Experience" in prompt:
+        return {"type": "experience", "title": "Experience", "items": [
+            {"position": "Go Dev", "company": "Acme", "start_year": "1999", "bullet_points": ["Built Go things"]},
+        ]}
+    raise RuntimeError("provider down")
+
+
+def test_sections_are_rewritten_and_failures_keep_the_original(monkeypatch):
+    _fake_model(monkeypatch, _answer)
+    result, unchanged = _rewrite()
+    summary, experience, skills = result["sections"]
+    assert summary["content"] == "Go engineer."
+    assert summary["title_formatting"] == {"font_size": 16}
+    job = experience["items"][0]
+    assert (job["position"], job["start_year"], job["end_type"]) == ("Go Dev", "2020", "Present")
+    assert skills == RESUME["sections"][2]
+    assert unchanged == "2"
+    assert result["name"] == "Jane"
+
+
+def test_structurally_invalid_rewrite_is_rejected(monkeypatch):
+    _fake_model(monkeypatch, lambda p: {"items": []} if "Experience" in p else {"content": "ok"})
+    result, unchanged = _rewrite()
+    assert result["sections"][1] == RESUME["sections"][1]
+    assert unchanged == "1"
+
+
+def test_sections_run_concurrently(monkeypatch):
+    _fake_model(monkeypatch, lambda p: {}, delay=0.2)
+    start = time.perf_counter()
+    _rewrite()
+    assert time.perf_counter() - start < 0.4
+
+
+def test_all_sections_failing_is_a_502(monkeypatch):
+    def down(prompt):
+        raise RuntimeError("provider down")
+
+    _fake_model(monkeypatch, down)
+    with pytest.raises(HTTPException) as exc:
+        _rewrite()
+    assert exc.value.status_code == 502
@@ -1,7 +1,10 @@
+import asyncio
+import io
+
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, UploadFile
 
-from app.text_extraction import MAX_FILE_BYTES, validate_upload
+from app.text_extraction import MAX_FILE_BYTES, READ_CHUNK_BYTES, read_upload, validate_upload
 
 
 def test_valid_pdf():
@@ -34,3 +37,33 @@ def test_oversized_file():
     with pytest.raises(HTTPException) as exc:
         validate_upload("resume.pdf", b"x" * (MAX_FILE_BYTES + 1))
     assert exc.value.status_code == 413
+
+
+def test_content_must_match_extension():
+    with pytest.raises(HTTPException) as exc:
+        validate_upload("resume.pdf", b"PK\x03\x04 zip")
+    assert exc.value.status_code == 400
+
+
+class _CountingFile(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_oversized_upload_is_not_read_in_full():
+    body = _CountingFile(b"%PDF-" + b"x" * (3 * MAX_FILE_BYTES))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(read_upload(UploadFile(body, filename="resume.pdf")))
+    assert exc.value.status_code == 413
+    assert body.bytes_read <= MAX_FILE_BYTES + READ_CHUNK_BYTES
+
+
+def test_read_upload_returns_bytes_and_type():
+    data = b"%PDF-1.4 " + b"x" * (2 * READ_CHUNK_BYTES)
+    assert asyncio.run(read_upload(UploadFile(io.BytesIO(data), filename="cv.pdf"))) == (data, "pdf")
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.workers import CpuPool
+
+
+def _run(pool: CpuPool, coro):
+    try:
+        return asyncio.run(coro)
+    finally:
+        pool.shutdown()
+
+
+def test_runs_job_in_worker():
+    pool = CpuPool(workers=1, queue_limit=2)
+    assert _run(pool, pool.run(pow, 2, 10)) == 1024
+
+
+def test_job_exception_propagates():
+    pool = CpuPool(workers=1, queue_limit=2)
+    with pytest.raises(ValueError):
+        _run(pool, pool.run(int, "not a number"))
+
+
+def test_full_queue_returns_503_with_retry_after():
+    pool = CpuPool(workers=1, queue_limit=1)
+
+    async def scenario():
+        slow = asyncio.create_task(pool.run(time.sleep, 1))
+        await asyncio.sleep(0)  # let the first job claim the only slot
+        try:
+            await pool.run(pow, 2, 2)
+        finally:
+            slow.cancel()
+
+    with pytest.raises(HTTPException) as exc:
+        _run(pool, scenario())
+    assert exc.value.status_code == 503
+    assert "Retry-After" in exc.value.headers
+
+
+def test_timeout_returns_504():
+    pool = CpuPool(workers=1, queue_limit=2)
+    with pytest.raises(HTTPException) as exc:
+        _run(pool, pool.run(time.sleep, 2, timeout=0.2))
+    assert exc.value.status_code == 504
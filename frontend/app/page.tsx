@@ -18,11 +18,13 @@ import VersionHistory from "@/components/VersionHistory"
 import ImportJson from "@/components/ImportJson"
 import ShareDialog from "@/components/ShareDialog"
 import PreviewModal from "@/components/PreviewModal"
+import SaveConflictDialog from "@/components/SaveConflictDialog"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
 import { useToast } from "@/hooks/use-toast"
 import { computeAtsScore } from "@/lib/ats"
 import { DEFAULT_TEMPLATE } from "@/lib/resumeTemplates"
 import { downloadResumePdf, fetchResumePdfBlobUrl } from "@/lib/resumeExport"
+import { loadResume, SaveConflictError, type SavedResume, saveResume } from "@/lib/resumePatch"
 import { createVersion } from "@/lib/versions"
 import { type ResumeData, defaultResumeData } from "@/types/resume"
 
@@ -60,6 +62,8 @@ export default function ResumeBuilder() {
   const [importOpen, setImportOpen] = useState(false)
   const [shareOpen, setShareOpen] = useState(false)
   const [previewOpen, setPreviewOpen] = useState(false)
+  // Autosave hit a newer save from elsewhere; paused until the user chooses.
+  const [conflict, setConflict] = useState(false)
 
   // In-memory undo/redo stacks.
   const [past, setPast] = useState<ResumeData[]>([])
@@ -68,6 +72,9 @@ export default function ResumeBuilder() {
   const editedRef = useRef(false)
   const lastEditAt = useRef(0)
   const lastAutoVersionAt = useRef(0)
+  // The resume as the server last acknowledged it; autosave sends only the
+  // edits made since (see lib/resumePatch).
+  const savedRef = useRef<SavedResume | null>(null)
   const autoLoadedFor = useRef<string | null>(null)
 
   const template = resumeData.template ?? DEFAULT_TEMPLATE
@@ -113,8 +120,11 @@ export default function ResumeBuilder() {
     autoLoadedFor.current = email
     ;(async () => {
       try {
-        const res = await fetch(`${BACKEND}/api/resume/${encodeURIComponent(email)}`)
-        if (res.ok) loadResumeData(await res.json())
+        const saved = await loadResume(email)
+        if (saved) {
+          savedRef.current = saved
+          loadResumeData(saved.data)
+        }
       } catch {
         /* leave the current resume as-is on failure */
       }
@@ -169,32 +179,60 @@ export default function ResumeBuilder() {
   // Debounced autosave — only when signed in and the user has actually edited.
   // Fires 1.5s after the last edit, and drops a throttled durable snapshot.
   useEffect(() => {
-    if (!email || !editedRef.current) return
+    if (!email || !editedRef.current || conflict) return
     const timer = setTimeout(async () => {
       setSaveStatus("saving")
       try {
-        const res = await fetch(`${BACKEND}/api/resume/${encodeURIComponent(email)}`, {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify(resumeData),
-        })
-        if (res.ok) {
-          editedRef.current = false
-          setSaveStatus("saved")
-          const now = Date.now()
-          if (now - lastAutoVersionAt.current > AUTO_VERSION_INTERVAL_MS) {
-            lastAutoVersionAt.current = now
-            createVersion(email, resumeData, "auto", false)
-          }
+        savedRef.current = await saveResume(email, resumeData, savedRef.current)
+        editedRef.current = false
+        setSaveStatus("saved")
+        const now = Date.now()
+        if (now - lastAutoVersionAt.current > AUTO_VERSION_INTERVAL_MS) {
+          lastAutoVersionAt.current = now
+          createVersion(email, resumeData, "auto", false)
+        }
+      } catch (e) {
+        if (e instanceof SaveConflictError) {
+          setSaveStatus("idle")
+          setConflict(true)
         } else {
           setSaveStatus("error")
         }
-      } catch {
-        setSaveStatus("error")
       }
     }, 1500)
     return () => clearTimeout(timer)
-  }, [resumeData, email])
+  }, [resumeData, email, conflict])
+
+  // Conflict, option 1: take the other save. loadResumeData keeps the local
+  // edits in version history first.
+  const handleReloadSaved = async () => {
+    setConflict(false)
+    if (!email) return
+    try {
+      const saved = await loadResume(email)
+      if (saved) {
+        savedRef.current = saved
+        loadResumeData(saved.data)
+        setSaveStatus("saved")
+      }
+    } catch {
+      setSaveStatus("error")
+    }
+  }
+
+  // Conflict, option 2: keep these edits and replace the other save.
+  const handleOverwriteSaved = async () => {
+    setConflict(false)
+    if (!email) return
+    setSaveStatus("saving")
+    try {
+      savedRef.current = await saveResume(email, resumeData)
+      editedRef.current = false
+      setSaveStatus("saved")
+    } catch {
+      setSaveStatus("error")
+    }
+  }
 
   // Manual "Save" from the toolbar = save now + a protected checkpoint.
   const handleManualSave = useCallback(async () => {
@@ -204,12 +242,7 @@ export default function ResumeBuilder() {
     }
     setSaveStatus("saving")
     try {
-      const res = await fetch(`${BACKEND}/api/resume/${encodeURIComponent(email)}`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify(resumeData),
-      })
-      if (!res.ok) throw new Error("save failed")
+      savedRef.current = await saveResume(email, resumeData)
       await createVersion(email, resumeData, "manual", true)
       lastAutoVersionAt.current = Date.now()
       editedRef.current = false
@@ -263,11 +296,7 @@ export default function ResumeBuilder() {
     loadResumeData(snapshot) // snapshots the current resume to history first
     if (email) {
       try {
-        await fetch(`${BACKEND}/api/resume/${encodeURIComponent(email)}`, {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify(snapshot),
-        })
+        savedRef.current = await saveResume(email, snapshot)
         setSaveStatus("saved")
       } catch {
         setSaveStatus("error")
@@ -377,6 +406,7 @@ export default function ResumeBuilder() {
       <VersionHistory open={historyOpen} onOpenChange={setHistoryOpen} email={email} onRestore={handleRestore} />
       <ImportJson open={importOpen} onOpenChange={setImportOpen} onImport={loadResumeData} />
       <ShareDialog open={shareOpen} onOpenChange={setShareOpen} email={email} />
+      <SaveConflictDialog open={conflict} onReload={handleReloadSaved} onOverwrite={handleOverwriteSaved} />
       <PreviewModal
         open={previewOpen}
         onOpenChange={setPreviewOpen}
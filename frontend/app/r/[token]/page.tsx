@@ -3,7 +3,7 @@
 import { Button } from "@/components/ui/button"
 import { downloadResumeDocx, fetchResumePdfBlobUrl } from "@/lib/resumeExport"
 import { DEFAULT_TEMPLATE } from "@/lib/resumeTemplates"
-import { getPublicResume } from "@/lib/share"
+import { fetchSharedPdfBlobUrl, getPublicResume } from "@/lib/share"
 import type { ResumeData } from "@/types/resume"
 import { AlertTriangle, FileDown, FileText, Loader2 } from "lucide-react"
 import { useParams } from "next/navigation"
@@ -21,7 +21,7 @@ export default function PublicResumePage() {
   const [docxLoading, setDocxLoading] = useState(false)
   const urlRef = useRef<string | null>(null)
 
-  // Fetch the shared resume, then render it to a real PDF for the viewer.
+  // Fetch the shared resume, then load (or render) the real PDF for the viewer.
   useEffect(() => {
     if (!token) return
     let cancelled = false
@@ -34,7 +34,12 @@ export default function PublicResumePage() {
           return
         }
         setResume(data)
-        const url = await fetchResumePdfBlobUrl(data, data.template ?? DEFAULT_TEMPLATE)
+        // Use the pre-rendered PDF when it has been published; render live otherwise.
+        const url = data.artifact
+          ? await fetchSharedPdfBlobUrl(token, data.artifact).catch(() =>
+              fetchResumePdfBlobUrl(data, data.template ?? DEFAULT_TEMPLATE),
+            )
+          : await fetchResumePdfBlobUrl(data, data.template ?? DEFAULT_TEMPLATE)
         if (cancelled) {
           window.URL.revokeObjectURL(url)
           return
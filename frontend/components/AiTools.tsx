@@ -54,14 +54,36 @@ export default function AiTools({
     setLoadingCoverLetter(true)
     setCoverLetterError(null)
     try {
-      const res = await fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL}/api/generate-cover-letter-ai`, {
+      // Server-sent events: each `data:` line is a JSON-encoded text chunk,
+      // so the letter appears as it is written.
+      const res = await fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL}/api/generate-cover-letter-ai/stream`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ jd: jobDescription, resume: resumeData }),
       })
-      if (!res.ok) throw new Error("Failed to generate cover letter")
-      const data = await res.json()
-      setCoverLetter(data.cover_letter || "")
+      if (!res.ok || !res.body) throw new Error("Failed to generate cover letter")
+      setCoverLetter("")
+      const reader = res.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ""
+      for (;;) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const events = buffer.split("\n\n")
+        buffer = events.pop() ?? ""
+        for (const event of events) {
+          const lines = event.split("\n")
+          const name = lines.find((l) => l.startsWith("event: "))?.slice(7)
+          const data = lines.find((l) => l.startsWith("data: "))?.slice(6)
+          if (!data) continue
+          if (name === "error") throw new Error(JSON.parse(data).detail || "Failed to generate cover letter")
+          if (!name) {
+            const chunk: string = JSON.parse(data)
+            setCoverLetter((prev) => prev + chunk)
+          }
+        }
+      }
     } catch (err: any) {
       setCoverLetterError(err.message || "Unknown error")
     } finally {
@@ -51,10 +51,18 @@ export default function FileUpload({ onResumeLoaded, setIsLoading }: FileUploadP
       if (response.ok) {
         const parsedData = await response.json()
         onResumeLoaded(parsedData)
-        toast({
-          title: "Success",
-          description: "Resume parsed and autofilled! Please review and edit as needed.",
-        })
+        // Sections the AI couldn't be reached for come back as plain text.
+        if (response.headers.get("X-Unresolved-Sections")) {
+          toast({
+            title: "Partially parsed",
+            description: "Some sections were imported as plain text. Upload the file again to retry them.",
+          })
+        } else {
+          toast({
+            title: "Success",
+            description: "Resume parsed and autofilled! Please review and edit as needed.",
+          })
+        }
       } else {
         throw new Error("Failed to parse resume")
       }
@@ -0,0 +1,40 @@
+"use client"
+
+import {
+  AlertDialog,
+  AlertDialogAction,
+  AlertDialogCancel,
+  AlertDialogContent,
+  AlertDialogDescription,
+  AlertDialogFooter,
+  AlertDialogHeader,
+  AlertDialogTitle,
+} from "@/components/ui/alert-dialog"
+
+interface SaveConflictDialogProps {
+  open: boolean
+  onReload: () => void
+  onOverwrite: () => void
+}
+
+// Shown when autosave finds the resume was saved from another tab or device
+// since this one loaded it. Autosave stays paused until the user picks.
+export default function SaveConflictDialog({ open, onReload, onOverwrite }: SaveConflictDialogProps) {
+  return (
+    <AlertDialog open={open}>
+      <AlertDialogContent>
+        <AlertDialogHeader>
+          <AlertDialogTitle>Resume changed elsewhere</AlertDialogTitle>
+          <AlertDialogDescription>
+            This resume was saved from another tab or device. Load that version (your edits here are kept in version
+            history), or keep your edits and replace it.
+          </AlertDialogDescription>
+        </AlertDialogHeader>
+        <AlertDialogFooter>
+          <AlertDialogCancel onClick={onOverwrite}>Keep my edits</AlertDialogCancel>
+          <AlertDialogAction onClick={onReload}>Load saved version</AlertDialogAction>
+        </AlertDialogFooter>
+      </AlertDialogContent>
+    </AlertDialog>
+  )
+}
@@ -71,7 +71,7 @@ export default function SaveGenerate({ resumeData, isLoading, setIsLoading, temp
       const response = await fetch(`${process.env.NEXT_PUBLIC_BACKEND_URL}/api/ats-check`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ html, expected }),
+        body: JSON.stringify({ html, expected, ...resumeData.pdf_settings }),
       })
       if (!response.ok) throw new Error("ATS check failed")
       setAtsReport(await response.json())
@@ -47,6 +47,8 @@ export default function VersionHistory({ open, onOpenChange, email, onRestore }:
   const { toast } = useToast()
   const [versions, setVersions] = useState<VersionMeta[]>([])
   const [loadingList, setLoadingList] = useState(false)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [selected, setSelected] = useState<VersionDetail | null>(null)
   const [loadingPreview, setLoadingPreview] = useState(false)
 
@@ -55,11 +57,28 @@ export default function VersionHistory({ open, onOpenChange, email, onRestore }:
     setSelected(null)
     setLoadingList(true)
     listVersions(email)
-      .then(setVersions)
+      .then((page) => {
+        setVersions(page.versions)
+        setNextCursor(page.next_cursor)
+      })
       .catch(() => toast({ title: "Error", description: "Could not load version history.", variant: "destructive" }))
       .finally(() => setLoadingList(false))
   }, [open, email, toast])
 
+  const loadMore = async () => {
+    if (!email || !nextCursor) return
+    setLoadingMore(true)
+    try {
+      const page = await listVersions(email, nextCursor)
+      setVersions((prev) => [...prev, ...page.versions])
+      setNextCursor(page.next_cursor)
+    } catch {
+      toast({ title: "Error", description: "Could not load older versions.", variant: "destructive" })
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const selectVersion = async (id: string) => {
     if (!email) return
     setLoadingPreview(true)
@@ -120,6 +139,17 @@ export default function VersionHistory({ open, onOpenChange, email, onRestore }:
                     </button>
                   </li>
                 ))}
+                {nextCursor && (
+                  <li>
+                    <button
+                      onClick={loadMore}
+                      disabled={loadingMore}
+                      className="flex w-full items-center justify-center px-3 py-2 text-sm text-muted-foreground hover:bg-accent"
+                    >
+                      {loadingMore ? <Loader2 className="h-4 w-4 animate-spin" /> : "Load older versions"}
+                    </button>
+                  </li>
+                )}
               </ul>
             )}
           </div>
@@ -0,0 +1,132 @@
+import type { ResumeData } from "@/types/resume"
+
+const BACKEND = process.env.NEXT_PUBLIC_BACKEND_URL
+
+// Maintained by the backend (app/database.py SERVER_KEYS); never patched.
+const SERVER_KEYS = new Set(["_id", "email", "rev", "last_updated", "share_token", "share_enabled", "share_artifact"])
+
+export type PatchOp =
+  | { op: "add" | "replace"; path: string; value: unknown }
+  | { op: "remove"; path: string }
+
+/** What the server last acknowledged: the resume as saved and its revision. */
+export interface SavedResume {
+  rev: number
+  data: ResumeData
+}
+
+/** The server's resume changed since `base` (another tab or device saved).
+ *  Saving anyway would overwrite that, so the caller has to decide. */
+export class SaveConflictError extends Error {
+  constructor(public rev: number | null) {
+    super("The resume was changed elsewhere")
+  }
+}
+
+const escape = (key: string | number) => String(key).replace(/~/g, "~0").replace(/\//g, "~1")
+
+const isObject = (v: unknown): v is Record<string, unknown> =>
+  typeof v === "object" && v !== null && !Array.isArray(v)
+
+function equal(a: unknown, b: unknown): boolean {
+  if (a === b) return true
+  if (Array.isArray(a) && Array.isArray(b)) {
+    return a.length === b.length && a.every((v, i) => equal(v, b[i]))
+  }
+  if (isObject(a) && isObject(b)) {
+    const keys = Object.keys(a)
+    return keys.length === Object.keys(b).length && keys.every((k) => k in b && equal(a[k], b[k]))
+  }
+  return false
+}
+
+/** JSON Patch turning `src` into `dst`; same algorithm as the backend's
+ *  `jsonpatch.diff` (lists trim their common prefix/suffix), so typing in
+ *  one bullet is one small `replace`. */
+export function diff(src: unknown, dst: unknown, path = ""): PatchOp[] {
+  if (equal(src, dst)) return []
+  if (isObject(src) && isObject(dst)) {
+    const ops: PatchOp[] = []
+    for (const key of Object.keys(src)) {
+      if (src[key] !== undefined && dst[key] === undefined) ops.push({ op: "remove", path: `${path}/${escape(key)}` })
+    }
+    for (const [key, value] of Object.entries(dst)) {
+      if (value === undefined) continue // dropped by JSON.stringify
+      const child = `${path}/${escape(key)}`
+      if (src[key] === undefined) ops.push({ op: "add", path: child, value })
+      else ops.push(...diff(src[key], value, child))
+    }
+    return ops
+  }
+  if (Array.isArray(src) && Array.isArray(dst)) {
+    let start = 0
+    while (start < src.length && start < dst.length && equal(src[start], dst[start])) start++
+    let endSrc = src.length
+    let endDst = dst.length
+    while (endSrc > start && endDst > start && equal(src[endSrc - 1], dst[endDst - 1])) {
+      endSrc--
+      endDst--
+    }
+    const ops: PatchOp[] = []
+    const paired = Math.min(endSrc - start, endDst - start)
+    for (let i = 0; i < paired; i++) ops.push(...diff(src[start + i], dst[start + i], `${path}/${start + i}`))
+    let at = start + paired
+    for (const value of dst.slice(start + paired, endDst)) ops.push({ op: "add", path: `${path}/${at++}`, value })
+    for (let i = start + paired; i < endSrc; i++) ops.push({ op: "remove", path: `${path}/${at}` })
+    return ops
+  }
+  return [{ op: "replace", path, value: dst }]
+}
+
+/** Edits since the last save, without the server-maintained fields. */
+export function resumeOps(saved: ResumeData, current: ResumeData): PatchOp[] {
+  const strip = (data: ResumeData) =>
+    Object.fromEntries(Object.entries(data as unknown as Record<string, unknown>).filter(([k]) => !SERVER_KEYS.has(k)))
+  return diff(strip(saved), strip(current))
+}
+
+async function putResume(email: string, data: ResumeData): Promise<SavedResume> {
+  const res = await fetch(`${BACKEND}/api/resume/${encodeURIComponent(email)}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(data),
+  })
+  if (!res.ok) throw new Error("save failed")
+  return { rev: (await res.json()).rev, data }
+}
+
+/** The stored resume with its revision, or null if there is none. */
+export async function loadResume(email: string): Promise<SavedResume | null> {
+  const res = await fetch(`${BACKEND}/api/resume/${encodeURIComponent(email)}`)
+  if (!res.ok) return null
+  const data = await res.json()
+  return { rev: typeof data.rev === "number" ? data.rev : 0, data }
+}
+
+/** Save `data`. With a `base` (the last acknowledged save) only the edits
+ *  since then are sent as a PATCH. If the server has moved on (409) this
+ *  throws `SaveConflictError` and writes nothing; if the patch fails for any
+ *  other reason the whole resume is saved instead. Without a `base` the whole
+ *  resume is saved (last writer wins). Throws if the save fails. */
+export async function saveResume(email: string, data: ResumeData, base?: SavedResume | null): Promise<SavedResume> {
+  if (base) {
+    const ops = resumeOps(base.data, data)
+    if (ops.length === 0) return { rev: base.rev, data }
+    try {
+      const res = await fetch(`${BACKEND}/api/resume/${encodeURIComponent(email)}`, {
+        method: "PATCH",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ rev: base.rev, ops }),
+      })
+      if (res.ok) return { rev: (await res.json()).rev, data }
+      if (res.status === 409) {
+        const detail = (await res.json().catch(() => null))?.detail
+        throw new SaveConflictError(typeof detail?.rev === "number" ? detail.rev : null)
+      }
+    } catch (e) {
+      if (e instanceof SaveConflictError) throw e
+      /* fall through to a full save */
+    }
+  }
+  return putResume(email, data)
+}
@@ -42,3 +42,16 @@ export async function getPublicResume(token: string) {
   if (!res.ok) throw new Error("Failed to load shared resume")
   return res.json()
 }
+
+/** URL of a pre-rendered artifact of a shared resume (`artifact` on the
+ *  public resume). Versioned by content, so browsers cache it for good. */
+export function artifactUrl(token: string, version: string, kind: "html" | "pdf"): string {
+  return `${BACKEND}/api/r/${encodeURIComponent(token)}/artifacts/${encodeURIComponent(version)}.${kind}`
+}
+
+/** Object URL for the shared resume's pre-rendered PDF. Callers own revoking it. */
+export async function fetchSharedPdfBlobUrl(token: string, version: string): Promise<string> {
+  const res = await fetch(artifactUrl(token, version, "pdf"))
+  if (!res.ok) throw new Error("Failed to load shared PDF")
+  return window.URL.createObjectURL(await res.blob())
+}
@@ -15,6 +15,12 @@ export interface VersionDetail extends VersionMeta {
   snapshot: ResumeData
 }
 
+export interface VersionPage {
+  versions: VersionMeta[]
+  /** Pass back as `cursor` for the next (older) page; null on the last one. */
+  next_cursor: string | null
+}
+
 /** Store a point-in-time copy of the resume. Fire-and-forget friendly:
  *  swallows network errors so version-keeping never blocks the user. */
 export async function createVersion(
@@ -34,8 +40,10 @@ export async function createVersion(
   }
 }
 
-export async function listVersions(email: string): Promise<VersionMeta[]> {
-  const res = await fetch(`${BACKEND}/api/resume/${encodeURIComponent(email)}/versions`)
+export async function listVersions(email: string, cursor?: string | null, limit = 20): Promise<VersionPage> {
+  const params = new URLSearchParams({ limit: String(limit) })
+  if (cursor) params.set("cursor", cursor)
+  const res = await fetch(`${BACKEND}/api/resume/${encodeURIComponent(email)}/versions?${params}`)
   if (!res.ok) throw new Error("Failed to load version history")
   return res.json()
 }
@@ -45,3 +53,21 @@ export async function getVersion(email: string, id: string): Promise<VersionDeta
   if (!res.ok) throw new Error("Failed to load version")
   return res.json()
 }
+
+export interface VersionDiff {
+  from: string
+  to: string
+  /** Changed top-level fields (name, contact info, ...). */
+  fields: Record<string, { old: unknown; new: unknown }>
+  /** Changed, added, removed or moved sections only; see app/resume_diff.py. */
+  sections: Array<Record<string, unknown> & { status: "added" | "removed" | "moved" | "changed"; title: string }>
+  unchanged_sections: number
+}
+
+/** What changed from version `id` to `against` (another version id, or the current resume). */
+export async function diffVersion(email: string, id: string, against = "current"): Promise<VersionDiff> {
+  const params = new URLSearchParams({ against })
+  const res = await fetch(`${BACKEND}/api/resume/${encodeURIComponent(email)}/versions/${id}/diff?${params}`)
+  if (!res.ok) throw new Error("Failed to compare versions")
+  return res.json()
+}